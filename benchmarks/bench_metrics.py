@@ -0,0 +1,111 @@
+#!/bin/python3
+"""Per-tick cost of the old per-dict metrics loop vs. the MetricsEngine, with and without rolling metrics.
+
+Usage: python3 benchmarks/bench_metrics.py [symbols] [ticks]
+"""
+
+import os
+import collections
+import math
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypticker.metrics import MetricsEngine
+
+
+def calculate_volatility(high, low):
+    if high and low:
+        return (high - low) / low * 100
+    return None
+
+
+def calculate_percent_change(last, open_price):
+    if last and open_price:
+        return ((last - open_price) / open_price) * 100
+    return None
+
+
+def legacy_rows(all_tickers, selected_symbols, rate):
+    """The loop update_table used before the metrics engine."""
+    data_list = []
+    for symbol in selected_symbols:
+        ticker = all_tickers.get(symbol)
+        if ticker:
+            high = ticker['high'] * rate
+            low = ticker['low'] * rate
+            last = ticker['last'] * rate
+            open_price = ticker['open'] * rate
+            vwap = (ticker.get('vwap') or 0) * rate
+            data_list.append({
+                "symbol": symbol,
+                "price_eur": last,
+                "volatility": calculate_volatility(high, low),
+                "percent_change": calculate_percent_change(last, open_price),
+                "open_price": open_price,
+                "vwap": vwap,
+                "high": high,
+                "low": low,
+            })
+    return data_list
+
+
+def legacy_rolling(window=60):
+    """The old loop plus the rolling metrics recomputed from a window on every tick."""
+    history = collections.defaultdict(lambda: collections.deque(maxlen=window + 1))
+
+    def rows(all_tickers, selected_symbols, rate):
+        data_list = legacy_rows(all_tickers, selected_symbols, rate)
+        for data in data_list:
+            prices = history[data["symbol"]]
+            prices.append(data["price_eur"])
+            window_prices = list(prices)[-window:]
+            returns = [math.log(b / a) for a, b in zip(prices, list(prices)[1:])]
+            data["realized_vol"] = math.sqrt(sum(r * r for r in returns)) * 100
+            data["zscore"] = (data["price_eur"] - statistics.fmean(window_prices)) / (statistics.pstdev(window_prices) or 1)
+        return data_list
+
+    return rows
+
+
+def make_ticks(symbols, ticks):
+    prices = {symbol: random.uniform(0.01, 1000) for symbol in symbols}
+    for tick in range(ticks):
+        batch = {}
+        for symbol in symbols:
+            price = prices[symbol] = prices[symbol] * random.uniform(0.998, 1.002)
+            batch[symbol] = {"timestamp": tick * 1000 + 1, "last": price, "open": price * 0.98,
+                             "high": price * 1.05, "low": price * 0.95, "vwap": price * 0.99}
+        yield batch
+
+
+def measure(render, batches, symbols):
+    start = time.perf_counter()
+    for batch in batches:
+        sorted(render(batch, symbols, 0.92), key=lambda x: x["volatility"] or 0, reverse=True)
+    return (time.perf_counter() - start) / len(batches) * 1e3
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    random.seed(1)
+    symbols = [f"C{i:04d}/USDT" for i in range(count)]
+    batches = list(make_ticks(symbols, ticks))
+
+    legacy = measure(legacy_rows, batches, symbols)
+    recomputed = measure(legacy_rolling(), batches, symbols)
+    base = measure(MetricsEngine(rolling=False).update, batches, symbols)
+    incremental = measure(MetricsEngine().update, batches, symbols)
+    print(f"{count} Symbole, {ticks} Ticks")
+    print(f"  alte Schleife (ohne Rolling-Metriken):       {legacy:8.3f} ms/Tick")
+    print(f"  alte Schleife + Rolling-Metriken neu berech.: {recomputed:8.3f} ms/Tick")
+    print(f"  MetricsEngine (nur Basisspalten):            {base:8.3f} ms/Tick")
+    print(f"  MetricsEngine (inkrementell, alle Spalten):  {incremental:8.3f} ms/Tick")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/bin/python3
+"""Benchmark the full fetch -> metrics -> sort -> render path from a replayed capture.
+
+For 10/100/1000 symbols a synthetic capture is generated (or pass --capture
+to replay a real one recorded with --record) and driven through TickerCore
+and TableView as fast as possible. Reports ticks/s, p50/p99 tick latency and
+peak Python memory; the memory is traced in a separate pass, so it does not
+slow down the timed ticks. Renders into a real Treeview when a display is
+available, otherwise into an in-memory tree (``--no-tk`` forces that).
+
+Usage: python3 benchmarks/bench_pipeline.py [--ticks N] [--capture FILE] [--no-tk]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypticker.core import TickerCore, headers, row_keys
+from crypticker.fx import FxService
+from crypticker.replay import ReplayExchange, write_capture
+from crypticker.view import TableView
+
+MEMORY_TICKS = 20  # Ticks of the traced pass; the peak is reached after the first few
+
+
+class MemoryTree:
+    """Minimal in-memory stand-in for ttk.Treeview when there is no display."""
+
+    def __init__(self):
+        self.items = []
+        self.values = {}
+
+    def insert(self, parent, index, iid, values, tags=()):
+        self.items.append(iid)
+        self.values[iid] = list(values)
+
+    def delete(self, iid):
+        self.items.remove(iid)
+        del self.values[iid]
+
+    def set(self, iid, column, value):
+        self.values[iid][headers.index(column)] = value
+
+    def detach(self, *iids):
+        detached = set(iids)
+        self.items = [iid for iid in self.items if iid not in detached]
+
+    def move(self, iid, parent, index):
+        if iid in self.items:
+            self.items.remove(iid)
+        self.items.insert(index, iid)
+
+    def item(self, iid, **kwargs):
+        pass
+
+
+def synthetic_capture(path, count, ticks):
+    rng = random.Random(count)
+    symbols = [f"C{i:04d}/USDT" for i in range(count)]
+    prices = {symbol: rng.uniform(0.01, 1000) for symbol in symbols}
+    markets = {symbol: {"base": symbol.split("/")[0], "quote": "USDT", "active": True} for symbol in symbols}
+    records = [(0.0, "load_markets", (), markets)]
+    for tick in range(ticks):
+        batch = {"EUR/USDT": {"symbol": "EUR/USDT", "timestamp": tick * 1000 + 1, "last": 1.08}}
+        for symbol in symbols:
+            price = prices[symbol] = prices[symbol] * rng.uniform(0.998, 1.002)
+            batch[symbol] = {"symbol": symbol, "timestamp": tick * 1000 + 1, "last": price, "open": price * 0.98,
+                             "high": price * rng.uniform(1.01, 1.1), "low": price * 0.95, "vwap": price * 0.99,
+                             "bid": price * 0.9995, "ask": price * 1.0005, "baseVolume": rng.uniform(1, 1e6)}
+        records.append((tick * 1.0, "fetch_tickers", (), batch))
+    write_capture(path, records)
+    return symbols
+
+
+def make_tree(use_tk):
+    if not use_tk:
+        return None, MemoryTree()
+    try:
+        import tkinter as tk
+        from tkinter import ttk
+        root = tk.Tk()
+    except Exception:
+        return None, MemoryTree()
+    root.withdraw()
+    tree = ttk.Treeview(root, columns=headers, show="headings")
+    tree.pack()
+    return root, tree
+
+
+def run_ticks(capture, symbols, ticks, use_tk, traced=False):
+    """Drive ``ticks`` ticks through a fresh pipeline.
+
+    Returns the per-tick latencies (ms), the renderer and, when ``traced``,
+    the peak memory of the ticks (the loaded capture is not counted).
+    """
+    exchange = ReplayExchange(capture, speed=0, loop=True)
+    core = TickerCore(exchange, fx=FxService("EUR"))
+    root, tree = make_tree(use_tk)
+    view = TableView(tree, headers, row_keys)
+
+    latencies = []
+    peak = None
+    if traced:
+        tracemalloc.start()
+    for _ in range(ticks):
+        tick_start = time.perf_counter()
+        view.apply(core.fetch_rows(symbols))
+        if root is not None:
+            root.update_idletasks()
+        latencies.append((time.perf_counter() - tick_start) * 1000)
+    if traced:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    if root is not None:
+        root.destroy()
+    return latencies, "Tk" if root is not None else "Speicher", peak
+
+
+def run(capture, symbols, ticks, use_tk):
+    """Time the ticks untraced, then measure the peak memory in a separate traced pass.
+
+    tracemalloc slows every allocation down (about 8x at 1000 symbols), so
+    timing under it would not be comparable with other runs.
+    """
+    start = time.perf_counter()
+    latencies, renderer, _ = run_ticks(capture, symbols, ticks, use_tk)
+    elapsed = time.perf_counter() - start
+    _, _, peak = run_ticks(capture, symbols, min(ticks, MEMORY_TICKS), use_tk, traced=True)
+
+    latencies.sort()
+    return {
+        "ticks_per_s": ticks / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "peak_kib": peak / 1024,
+        "renderer": renderer,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=100)
+    parser.add_argument("--capture", help="Aufzeichnung statt synthetischer Daten verwenden")
+    parser.add_argument("--no-tk", action="store_true", help="In einen In-Memory-Baum rendern")
+    args = parser.parse_args()
+
+    print(f"{'Symbole':>8} {'Ticks/s':>9} {'p50 (ms)':>9} {'p99 (ms)':>9} {'Peak (KiB)':>11}  Renderer")
+    if args.capture:
+        exchange = ReplayExchange(args.capture, speed=0)
+        sizes = [(args.capture, [s for s in exchange.load_markets() if s.endswith("/USDT")])]
+    else:
+        directory = tempfile.mkdtemp(prefix="crypticker-bench-")
+        sizes = []
+        for count in (10, 100, 1000):
+            path = os.path.join(directory, f"capture-{count}.jsonl.gz")
+            sizes.append((path, synthetic_capture(path, count, min(args.ticks, 50))))
+
+    for path, symbols in sizes:
+        result = run(path, symbols, args.ticks, not args.no_tk)
+        print(f"{len(symbols):>8} {result['ticks_per_s']:>9.1f} {result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+              f"{result['peak_kib']:>11.0f}  {result['renderer']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/bin/python3
+"""Measure what a snapshot client costs compared to a full snapshot per tick.
+
+A local ``SnapshotServer`` publishes synthetic snapshots in which a share of
+the rows changes per tick (the rest keeps its values, like quiet pairs
+between two polls). A ``SnapshotClient`` follows it; the rows it rebuilds
+from the deltas must equal the published ones. Reports bytes per update
+for full snapshots and deltas, and the publish -> client latency.
+
+Usage: python3 benchmarks/bench_share.py [--ticks N] [--changed 0.1]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypticker.core import row_keys
+from crypticker.share import SnapshotClient, SnapshotServer, encode, msgpack
+
+
+def make_rows(rng, count):
+    return [{key: f"C{i:04d}/USDT" if key == "symbol" else rng.uniform(1, 1000) for key in row_keys}
+            for i in range(count)]
+
+
+def run(count, ticks, changed):
+    rng = random.Random(count)
+    rows = make_rows(rng, count)
+    server = SnapshotServer(port=0)
+    server.start()
+    received = []
+    arrived = threading.Event()
+
+    def on_rows(client_rows):
+        received.append((time.perf_counter(), client_rows))
+        arrived.set()
+
+    client = SnapshotClient(server.url, on_rows, wait=5)
+    full_bytes = []
+    latencies = []
+    try:
+        server.publish(rows, "USDT", 1.0)
+        initial_bytes = len(encode(server.message()))
+        client.start()
+        arrived.wait(5)
+        for _ in range(ticks):
+            arrived.clear()
+            for row in rng.sample(rows, max(1, int(count * changed))):
+                row["price"] = row["price"] * rng.uniform(0.99, 1.01)
+                row["volatility"] = rng.uniform(0, 20)
+            rows.sort(key=lambda row: row["volatility"], reverse=True)
+            published = time.perf_counter()
+            server.publish(rows, "USDT", 1.0)
+            full_bytes.append(len(encode(server.message())))
+            if not arrived.wait(5):
+                raise RuntimeError("client did not receive the update")
+            latencies.append((received[-1][0] - published) * 1000)
+        assert received[-1][1] == rows, "client rows differ from the published rows"
+    finally:
+        client.stop()
+        server.stop()
+
+    delta_bytes = (client.bytes_received - initial_bytes) / ticks
+    return statistics.mean(full_bytes), delta_bytes, statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=50)
+    parser.add_argument("--changed", type=float, default=0.1, help="Anteil der Zeilen, die sich pro Tick ändern")
+    args = parser.parse_args()
+
+    print(f"Format: {'msgpack' if msgpack is not None else 'JSON'}")
+    print(f"{'Symbole':>8} {'Voll (B)':>10} {'Delta (B)':>10} {'Anteil':>7} {'p50 (ms)':>9}")
+    for count in (10, 100, 1000):
+        full, delta, latency = run(count, args.ticks, args.changed)
+        print(f"{count:>8} {full:>10.0f} {delta:>10.0f} {delta / full:>7.0%} {latency:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
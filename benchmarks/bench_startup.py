@@ -0,0 +1,153 @@
+#!/bin/python3
+"""Measure the cold start of crypticker-2.1.py.
+
+Two measurements, each in fresh interpreters:
+
+* Imports: the modules the GUI loads before its window opens (its top-level
+  imports, read from the script), against the heavy ones it now defers
+  (ccxt, PIL, asyncio, urllib.request, the snapshot sharing; missing ones are
+  skipped).
+* Startup: the GUI is started with ``--startup-report`` against a synthetic
+  replay capture in an empty directory, once cold (no market cache, no
+  scaled logo) and then warm. It prints when the window, the exchange, the
+  markets and the logo were ready. Needs a display, otherwise skipped.
+
+Usage: python3 benchmarks/bench_startup.py [--runs N]
+"""
+
+import argparse
+import ast
+import importlib.util
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from crypticker.replay import write_capture
+
+GUI_SCRIPT = os.path.join(ROOT, "crypticker-2.1.py")
+DEFERRED_IMPORTS = ["ccxt", "PIL.Image", "PIL.ImageTk", "asyncio", "urllib.request", "concurrent.futures",
+                    "crypticker.share"]
+MILESTONES = ("window", "exchange", "markets", "ready", "logo")
+
+
+def gui_imports():
+    """Modules the GUI script imports at the top level, i.e. before its window opens.
+
+    ``from package import name`` also lists ``package.name`` if that is a
+    submodule (``from tkinter import ttk``).
+    """
+    with open(GUI_SCRIPT, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and not node.level:
+            modules.append(node.module)
+            modules += [f"{node.module}.{alias.name}" for alias in node.names
+                        if is_submodule(f"{node.module}.{alias.name}")]
+    return list(dict.fromkeys(modules))
+
+
+def is_submodule(name):
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ImportError:
+        return False
+
+
+def import_time(modules):
+    """Seconds a fresh interpreter needs to import ``modules`` (missing ones are skipped)."""
+    code = (
+        "import importlib, time\n"
+        "start = time.perf_counter()\n"
+        f"for name in {modules!r}:\n"
+        "    try:\n"
+        "        importlib.import_module(name)\n"
+        "    except ImportError:\n"
+        "        pass\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=ROOT, check=True)
+    return float(result.stdout)
+
+
+def available(module):
+    code = f"import importlib.util, sys; sys.exit(importlib.util.find_spec({module.split('.')[0]!r}) is None)"
+    return subprocess.run([sys.executable, "-c", code]).returncode == 0
+
+
+def synthetic_capture(path, count=2000):
+    symbols = [f"C{i:04d}/USDT" for i in range(count)]
+    markets = {symbol: {"base": symbol.split("/")[0], "quote": "USDT", "active": True} for symbol in symbols}
+    write_capture(path, [(0.0, "load_markets", (), markets)])
+
+
+def start_gui(directory, capture):
+    """Run the GUI once in ``directory``; return its milestones or None without a display."""
+    result = subprocess.run(
+        [sys.executable, GUI_SCRIPT, "--startup-report", "--replay", capture, "--speed", "0"],
+        capture_output=True, text=True, cwd=directory, timeout=60,
+    )
+    for line in reversed(result.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    if "display" in result.stderr.lower():
+        return None
+    raise RuntimeError(result.stderr.strip() or "no startup report")
+
+
+def report(label, runs):
+    cells = []
+    for name in MILESTONES:
+        values = [run[name] for run in runs if name in run]
+        cells.append(f"{statistics.median(values) * 1000:>9.0f}" if values else f"{'-':>9}")
+    print(f"{label:<6}" + "".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    imports = gui_imports()
+    deferred = [name for name in DEFERRED_IMPORTS if available(name)]
+    eagerly = [name for name in deferred if name in imports]
+    if eagerly:
+        print(f"Warnung: beim Start importiert, obwohl aufgeschoben: {', '.join(eagerly)}")
+    gui = statistics.median(import_time(imports) for _ in range(args.runs))
+    eager = statistics.median(import_time(imports + deferred) for _ in range(args.runs))
+    print(f"Imports bis zum Fenster:   {gui * 1000:7.0f} ms")
+    print(f"Mit allen Imports vorab:   {eager * 1000:7.0f} ms  ({', '.join(deferred)})")
+
+    cold, warm = [], []
+    for _ in range(args.runs):
+        directory = tempfile.mkdtemp(prefix="crypticker-bench-")
+        try:
+            shutil.copy(os.path.join(ROOT, "logo.png"), directory)
+            capture = os.path.join(directory, "markets.jsonl.gz")
+            synthetic_capture(capture)
+            first = start_gui(directory, capture)
+            if first is None:
+                print("Kein Display: GUI-Start übersprungen.")
+                return
+            cold.append(first)
+            warm.append(start_gui(directory, capture))
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    print()
+    print(f"{'ms':<6}" + "".join(f"{name:>9}" for name in MILESTONES))
+    report("kalt", cold)
+    report("warm", warm)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/bin/python3
+"""Measure Tk time per tick: delete-all/insert-all vs. incremental TableView.
+
+Needs a display (or Xvfb). Usage: python3 benchmarks/bench_treeview.py [ticks]
+"""
+
+import os
+import random
+import sys
+import time
+import tkinter as tk
+from tkinter import ttk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypticker.view import TableView
+
+HEADERS = ["Symbol", "Preis", "Volatilität", "% Change", "Eröffnung", "VWAP", "Hoch", "Tief"]
+KEYS = ["symbol", "price", "volatility", "percent_change", "open_price", "vwap", "high", "low"]
+
+
+def make_rows(n):
+    rows = []
+    for i in range(n):
+        price = random.uniform(0.01, 1000)
+        rows.append({
+            "symbol": f"C{i:04d}/USDT",
+            "price": price,
+            "volatility": random.uniform(0, 20),
+            "percent_change": random.uniform(-10, 10),
+            "open_price": price * 0.98,
+            "vwap": price * 0.99,
+            "high": price * 1.05,
+            "low": price * 0.95,
+        })
+    return rows
+
+
+def next_tick(rows):
+    """Move a few prices, like a real tick does, and re-sort by volatility."""
+    for row in random.sample(rows, max(1, len(rows) // 10)):
+        row["price"] *= random.uniform(0.999, 1.001)
+        row["volatility"] += random.uniform(-0.05, 0.05)
+    return sorted(rows, key=lambda x: x["volatility"] or 0, reverse=True)
+
+
+def legacy_render(tree, sorted_data):
+    for item in tree.get_children():
+        tree.delete(item)
+    for data in sorted_data:
+        tree.insert("", "end", values=[data["symbol"]] + [
+            f"{data[key]:.6f}" if data[key] else "N/A" for key in KEYS[1:]
+        ])
+
+
+def run(root, n, ticks, incremental):
+    tree = ttk.Treeview(root, columns=HEADERS, show="headings")
+    tree.pack()
+    view = TableView(tree, HEADERS, KEYS)
+    render = view.apply if incremental else lambda rows: legacy_render(tree, rows)
+    random.seed(n)
+    rows = make_rows(n)
+    render(next_tick(rows))
+    root.update()
+
+    total = 0.0
+    for _ in range(ticks):
+        sorted_rows = next_tick(rows)
+        start = time.perf_counter()
+        render(sorted_rows)
+        root.update_idletasks()
+        total += time.perf_counter() - start
+    tree.destroy()
+    return total / ticks * 1000
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    root = tk.Tk()
+    root.withdraw()
+    print(f"{'Zeilen':>7} {'alt (ms/Tick)':>14} {'neu (ms/Tick)':>14} {'Faktor':>7}")
+    for n in (10, 100, 1000):
+        legacy = run(root, n, ticks, incremental=False)
+        incremental = run(root, n, ticks, incremental=True)
+        print(f"{n:>7} {legacy:>14.3f} {incremental:>14.3f} {legacy / incremental:>6.1f}x")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,222 +1,737 @@
 #!/bin/python3
 
-import ccxt
+import time
+STARTED = time.perf_counter()  # Startup milestones are measured from here
+
 import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
-import threading
-import time
-import os
+from tkinter import filedialog
+from tkinter import simpledialog
+import argparse
+import atexit
 import json
-from PIL import Image, ImageTk
+import threading
+from crypticker.alerts import FIELDS, OPS, AlertEngine, LogSink, WebhookSink, format_alert, format_rule
+from crypticker.assets import is_fresh, scale_image
+from crypticker.candles import CandleCache
+from crypticker.core import (DEFAULT_SYMBOLS, TickerCore, create_exchange, depth_headers, depth_keys,
+                             display_headers, headers, rolling_headers, row_keys)
+from crypticker.fx import FxService
+from crypticker.history import HistoryStore
+from crypticker.market_cache import MarketCache
+from crypticker.metrics import MetricsEngine
+from crypticker.orderbook import BookManager
+from crypticker.pipeline import UiPump
+from crypticker.portfolio import Portfolio, parse_number
+from crypticker.ratelimit import RateLimiter
+from crypticker.replay import RecordingExchange, ReplayExchange
+from crypticker.scheduler import UpdateScheduler
+from crypticker.search import SymbolIndex
+from crypticker.view import TableView
+from crypticker.watchlists import Watchlists
+from crypticker.widgets import CandleChart, Debouncer, TickerTable, VirtualCheckList
 
 PROGRAM_TITLE = "MegaTUX-Crypticker"
-CACHE_FILE = "cached_symbols.json"
-
-headers = [
-    "Symbol",
-    "Preis (EUR)",
-    "Volatilität (%)",
-    "% Change",
-    "Eröffnungspreis (EUR)",
-    "Durchschnittlicher Kaufpreis (EUR)",
-    "Tageshoch (EUR)",
-    "Tagestief (EUR)"
-]
-
-is_running = False
-update_thread = None
-USDT_to_EUR = 1
-search_active = False
-cached_symbols = []
+MARKET_CACHE_FILE = "market_cache.json"
+MARKET_CHECK_MS = 10 * 60 * 1000  # How often to check whether the market cache is stale
+AGGREGATE_EXCHANGES = ["binance", "kraken", "bitstamp"]
+AGGREGATE_TIMEOUT = 3.0  # Seconds per venue before it is reported as timed out
+HISTORY_DIR = "history"
+HISTORY_CAPACITY = 3600  # Ticks per symbol kept in memory
+HISTORY_RETENTION_DAYS = 7
+METRICS_WINDOW = 60  # Ticks used for realized volatility and z-score
+METRICS_EMA_SPAN = 20
+METRICS_ROLLING = False  # Show realized volatility, EMA and z-score from the start
+DISPLAY_CURRENCY = "EUR"
+FX_TTL = 60.0  # Seconds before the conversion rate is fetched again
+FX_MAX_AGE = 300.0  # Seconds before rows are marked as converted with a stale rate
+STATUS_REFRESH_MS = 1000
+PROFILE_TICKS = 20  # Ticks captured by the "Profil" button
+ALERTS_FILE = "alerts.json"
+ALERT_LOG_FILE = "alerts.log"
+ALERT_WEBHOOK_URL = None  # e.g. "http://127.0.0.1:8080/alerts" to POST every alert
+ALERT_POPUP_MS = 10000  # How long an alert popup stays open
+PORTFOLIO_FILE = "portfolio.json"
+WATCHLISTS_FILE = "watchlists.json"
+CANDLE_TIMEFRAME = "1m"
+CANDLE_LIMIT = 120  # Candles kept per symbol (sparkline and detail chart)
+CANDLE_CACHE_SYMBOLS = 200  # Least recently used symbols beyond this are evicted
+CANDLE_REFRESH_S = 60.0
+SPARKLINE_WIDTH = 120
+ORDER_BOOK_LIMIT = 500  # Price levels per snapshot, enough for the ±1% depth of most pairs
+RECORD_FILE = None  # Set by --record: capture the exchange responses
+REPLAY_FILE = None  # Set by --replay: play a capture instead of the exchange
+REPLAY_SPEED = 1.0
+LOGO_FILE = "logo.png"
+LOGO_CACHE_FILE = "logo_100.png"  # Pre-scaled copy, loaded by Tk without PIL
+LOGO_WIDTH = 100
+STARTUP_REPORT = False  # Set by --startup-report: print the milestones as JSON and quit
+SERVE_PORT = None  # Set by --serve: publish the snapshots for other instances on this local port
+SERVE_DEFAULT_PORT = 8765  # --serve without a port, same as crypticker.share.DEFAULT_PORT
+CONNECT_URL = None  # Set by --connect: take the snapshots from another instance instead of the exchange
+
+market_cache = MarketCache(MARKET_CACHE_FILE, "binance")
+symbol_index = None
+core = None
+history = HistoryStore(HISTORY_DIR, capacity=HISTORY_CAPACITY, retention_days=HISTORY_RETENTION_DAYS)
+feed = None
+book_feed = None  # Depth stream of the order-book mode
+scheduler = None
+share_server = None
+share_client = None
+comparison_schedulers = set()
+candle_cache = None
+candle_scheduler = None
+chart_windows = {}  # Symbol -> open CandleCharts
+alerts = AlertEngine(ALERTS_FILE)
+portfolio = Portfolio(PORTFOLIO_FILE)
+watchlists = Watchlists(WATCHLISTS_FILE, DEFAULT_SYMBOLS)
+tables = {}  # Watchlist name -> TickerTable (one notebook tab each)
+notebook = None
+latest_rows = ()  # Rows of the newest snapshot, for tabs that catch up when shown
+coin_list = None
+exchange = None  # Created in the background, see load_exchange
+startup_times = {}  # Milestone -> seconds since STARTED
 
 def get_exchange():
-    """Initialize the Binance exchange with ccxt."""
-    try:
-        exchange = ccxt.binance()
-        return exchange
-    except Exception as e:
-        messagebox.showerror("Fehler", f"Fehler beim Initialisieren der Börse: {e}")
-        exit()
+    """Initialize the Binance exchange with ccxt (or the capture given by --replay)."""
+    if REPLAY_FILE:
+        exchange = ReplayExchange(REPLAY_FILE, speed=REPLAY_SPEED)
+    else:
+        exchange = create_exchange("binance")
+    if RECORD_FILE:
+        exchange = RecordingExchange(exchange, RECORD_FILE)
+        atexit.register(exchange.close)
+    return exchange
 
-def load_cached_symbols():
-    """Load cached symbols from a file if available."""
-    global cached_symbols
-    if os.path.exists(CACHE_FILE):
+def load_exchange(pump, on_ready):
+    """Import ccxt and create the exchange off the GUI thread, then call ``on_ready(exchange)`` on it."""
+    def load():
         try:
-            with open(CACHE_FILE, "r") as f:
-                cached_symbols = json.load(f)
+            loaded = get_exchange()
         except Exception as e:
-            print(f"Fehler beim Laden des Cache: {e}")
+            pump.post(lambda e=e: exchange_failed(e))
+            return
+        pump.post(lambda: on_ready(loaded))
 
-def save_cached_symbols(symbols):
-    """Save symbols to a cache file."""
-    try:
-        with open(CACHE_FILE, "w") as f:
-            json.dump(symbols, f)
-    except Exception as e:
-        print(f"Fehler beim Speichern des Cache: {e}")
+    threading.Thread(target=load, daemon=True).start()
 
-def list_all_symbols(exchange):
-    """Show all available trading pairs on Binance."""
-    global cached_symbols
-    try:
-        if not cached_symbols:
-            markets = exchange.load_markets()
-            cached_symbols = sorted([symbol for symbol in markets.keys() if symbol.endswith("/USDT")])
-            save_cached_symbols(cached_symbols)
-        return cached_symbols
-    except Exception as e:
-        messagebox.showerror("Fehler", f"Fehler beim Abrufen der Symbole: {e}")
-        return []
+def exchange_failed(error):
+    messagebox.showerror("Fehler", f"Fehler beim Initialisieren der Börse: {error}")
+    root.destroy()
+
+def mark_startup(name):
+    """Record when a startup milestone was first reached."""
+    startup_times.setdefault(name, round(time.perf_counter() - STARTED, 3))
+
+def get_venue_exchange(exchange_id):
+    """Create an exchange for the multi-exchange comparison."""
+    exchange = create_exchange(exchange_id)
+    exchange.enableRateLimit = True
+    return exchange
+
+def get_feed():
+    """Create the push-based ticker feed used in streaming mode."""
+    # Imported on first use, asyncio is not needed for polling
+    from crypticker.feed import CcxtProFeed
+    return CcxtProFeed("binance")
+
+def get_book_feed(books):
+    """Create the depth-diff stream that keeps the books of the order-book mode current."""
+    from crypticker.feed import BinanceDepthFeed
+    return BinanceDepthFeed(books)
+
+def refresh_markets(exchange, pump, on_updated):
+    """Refresh the market cache in the background once its TTL has expired."""
+    def done(error):
+        if error is None:
+            # Build the new search index off the GUI thread, it is swapped in with the update
+            index = SymbolIndex(market_cache.symbols)
+            pump.post(lambda: on_updated(index))
+        elif not market_cache.symbols:
+            pump.post(lambda: messagebox.showerror("Fehler", f"Fehler beim Abrufen der Symbole: {error}"))
+        else:
+            print(f"Fehler beim Aktualisieren der Märkte: {error}")
+
+    market_cache.refresh_if_stale(exchange, done)
 
-def fetch_ticker_data(exchange, symbol):
-    """Fetch the ticker data for a specific symbol."""
+def read_interval(interval_var):
+    """Read the refresh interval from the entry field (GUI thread only)."""
     try:
-        ticker = exchange.fetch_ticker(symbol)
-        return ticker
-    except Exception:
-        return None
-
-def calculate_volatility(high, low):
-    """Calculate the volatility in percent based on the day's high and low."""
-    if high and low:
-        return (high - low) / low * 100
+        interval = interval_var.get()
+        if interval > 0:
+            return interval
+    except tk.TclError:
+        pass
+    messagebox.showerror("Fehler", "Bitte geben Sie ein gültiges Intervall (Sekunden > 0) ein.")
     return None
 
-def calculate_percent_change(last, open_price):
-    """Calculate the percentage price change."""
-    if last and open_price:
-        return ((last - open_price) / open_price) * 100
-    return None
+def start_update_process(exchange, selected_symbols, pump, interval_var):
+    """Start the data retrieval process."""
+    if CONNECT_URL:
+        start_client_process(selected_symbols)
+        return
+    if stream_var.get():
+        start_stream_process(selected_symbols, pump)
+        return
 
-def update_table(exchange, selected_symbols, tree):
-    """Update the table with cryptocurrency data and sort by volatility."""
-    global USDT_to_EUR
+    interval = read_interval(interval_var)
+    if interval is None:
+        return
+    scheduler.set_interval(interval)
+    scheduler.set_symbols(selected_symbols)
+    scheduler.start()
+    start_candle_updates(selected_symbols)
 
-    if search_active:
-        return  # Skip update if search is active
+def start_candle_updates(selected_symbols):
+    """Keep the candles of the selection fresh on their own, slower cadence."""
+    candle_scheduler.set_symbols(selected_symbols)
+    candle_scheduler.start()
 
-    try:
-        ticker = exchange.fetch_ticker("USDT/EUR")
-        USDT_to_EUR = ticker['last']
-    except Exception:
-        USDT_to_EUR = 1
-
-    data_list = []
-
-    all_tickers = exchange.fetch_tickers(selected_symbols)
-    
-    for symbol in selected_symbols:
-        ticker = all_tickers.get(symbol)
-        if ticker:
-            high = ticker['high'] * USDT_to_EUR
-            low = ticker['low'] * USDT_to_EUR
-            last = ticker['last'] * USDT_to_EUR
-            open_price = ticker['open'] * USDT_to_EUR
-            vwap = (ticker.get('vwap') or 0) * USDT_to_EUR
-            volatility = calculate_volatility(high, low)
-            percent_change = calculate_percent_change(last, open_price)
-
-            data_list.append({
-                "symbol": symbol,
-                "price_eur": last,
-                "volatility": volatility,
-                "percent_change": percent_change,
-                "open_price": open_price,
-                "vwap": vwap,
-                "high": high,
-                "low": low,
-            })
-
-    # Sort data by volatility (highest first)
-    sorted_data = sorted(data_list, key=lambda x: x["volatility"] or 0, reverse=True)
-
-    # Update table
-    for item in tree.get_children():
-        tree.delete(item)
-
-    for data in sorted_data:
-        tree.insert("", "end", values=[
-            data["symbol"],
-            f"{data['price_eur']:.6f}" if data["price_eur"] else "N/A",
-            f"{data['volatility']:.6f}" if data["volatility"] else "N/A",
-            f"{data['percent_change']:.6f}" if data["percent_change"] else "N/A",
-            f"{data['open_price']:.6f}" if data["open_price"] else "N/A",
-            f"{data['vwap']:.6f}" if data["vwap"] else "N/A",
-            f"{data['high']:.6f}" if data["high"] else "N/A",
-            f"{data['low']:.6f}" if data["low"] else "N/A",
-        ])
-
-def start_update_process(exchange, selected_symbols, tree, interval_var):
-    """Start the data retrieval process in a separate thread."""
-    global is_running, update_thread
-
-    def run():
-        while is_running:
-            if not search_active and selected_symbols:
-                update_table(exchange, selected_symbols, tree)
-            time.sleep(interval_var.get())
-
-    if not is_running:
-        is_running = True
-        update_thread = threading.Thread(target=run, daemon=True)
-        update_thread.start()
+def apply_candles(changed):
+    """Redraw the sparklines and open charts after new candles arrived (GUI thread only)."""
+    tables[watchlists.active].sparklines.schedule()
+    for symbol in changed:
+        charts = chart_windows.get(symbol)
+        if not charts:
+            continue
+        series = candle_cache.get(symbol)
+        if series is None:
+            # Evicted from the cache in the meantime, the charts keep their candles until it is back
+            fetch_chart_candles(symbol)
+            continue
+        for chart in charts:
+            chart.set_candles(series.candles)
+
+def fetch_chart_candles(symbol):
+    """Fetch the candles of ``symbol`` in the background and redraw its charts."""
+    def fetch():
+        try:
+            if candle_cache.fetch(symbol):
+                pump.post(lambda: apply_candles({symbol}))
+        except Exception as e:
+            print(f"Fehler beim Abrufen der Kerzen für {symbol}: {e}")
+    threading.Thread(target=fetch, daemon=True).start()
+
+def open_chart_window(symbol):
+    """Candlestick chart of one symbol, updated whenever new candles arrive."""
+    if CONNECT_URL:
+        messagebox.showinfo("Kerzen", "Im Client-Modus sind keine Kerzen verfügbar.")
+        return
+    window = tk.Toplevel(root)
+    window.title(f"{PROGRAM_TITLE} - {symbol} ({CANDLE_TIMEFRAME}, {symbol.split('/')[-1]})")
+    window.geometry("800x400")
+    chart = CandleChart(window)
+    chart.pack(fill=tk.BOTH, expand=True)
+    chart_windows.setdefault(symbol, set()).add(chart)
+
+    series = candle_cache.get(symbol)
+    if series is not None:
+        chart.set_candles(series.candles)
+    fetch_chart_candles(symbol)
+
+    def close():
+        chart_windows.get(symbol, set()).discard(chart)
+        window.destroy()
+
+    window.protocol("WM_DELETE_WINDOW", close)
+
+def start_stream_process(selected_symbols, pump):
+    """Start the streaming feed; every push hands fresh rows to the GUI thread."""
+    global feed
+
+    scheduler.stop()
+    if feed is None:
+        stream = feed = get_feed()
+        stream.add_listener(history.append_tickers)
+        stream.add_listener(lambda changed: publish_rows(core.rows_from_tickers(stream.snapshot(), selected_symbols)))
+    feed.subscribe(core.feed_symbols(selected_symbols))
+    feed.start()
+    start_candle_updates(selected_symbols)
+
+def start_client_process(selected_symbols):
+    """Client mode: follow the snapshots another instance publishes instead of polling the exchange.
+
+    Nothing else talks to the exchange in this mode, so there are no candles.
+    """
+    global share_client
+    if share_client is None:
+        # Imported on first use, it pulls in urllib.request and the http/email packages
+        from crypticker.share import SnapshotClient
+
+        client = share_client = SnapshotClient(
+            CONNECT_URL,
+            lambda rows: publish_rows(rows, client.currency, client.rate),
+            on_error=lambda e: print(f"Fehler beim Abrufen der Daten von {CONNECT_URL}: {e}"),
+        )
+    share_client.set_symbols(selected_symbols)
+    share_client.start()
+
+def publish_rows(rows, currency=None, rate=None):
+    """Check the alert rules against fresh rows and hand the rows to the GUI thread (and to the clients).
+
+    ``currency`` and ``rate`` come with rows taken from another instance, which
+    converts into its own display currency.
+    """
+    if currency:
+        if rate:
+            core.fx.set_rate(currency, rate)
+        if currency != core.fx.currency:
+            pump.post(lambda: change_currency(currency, selected_symbols))
+    alerts.evaluate(rows, currency or core.fx.currency)
+    portfolio.update(rows)
+    pump.submit(rows)
+    if share_server is not None:
+        share_server.publish(rows, core.fx.currency, core.fx.rate()[0])
+
+def show_alert_popup(alert):
+    """Small window with the alert text that closes itself (GUI thread only)."""
+    popup = tk.Toplevel(root)
+    popup.title(f"{PROGRAM_TITLE} - Alarm")
+    popup.configure(bg="#2c2f33")
+    popup.attributes("-topmost", True)
+    tk.Label(popup, text=format_alert(alert), bg="#2c2f33", fg="white", font=("Arial", 12), padx=15, pady=10).pack()
+    tk.Button(popup, text="OK", command=popup.destroy, bg="#7289da", fg="white").pack(pady=(0, 10))
+    popup.after(ALERT_POPUP_MS, popup.destroy)
+
+def open_alerts_window(selected_symbols):
+    """Dialog to add and remove alert rules; changes are saved right away."""
+    window = tk.Toplevel(root)
+    window.title(f"{PROGRAM_TITLE} - Alarme")
+    window.configure(bg="#2c2f33")
+
+    rule_list = tk.Listbox(window, width=60, height=10, bg="#23272a", fg="white")
+    rule_list.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+    rule_ids = []
+
+    def refresh():
+        rule_list.delete(0, tk.END)
+        rule_ids[:] = sorted(alerts.rules)
+        for rule_id in rule_ids:
+            rule = alerts.rules[rule_id]
+            state = " (ausgelöst)" if rule_id in alerts.fired else ""
+            rule_list.insert(tk.END, f"{format_rule(rule)}{state}")
+
+    def save():
+        try:
+            alerts.save()
+        except Exception as e:
+            messagebox.showerror("Fehler", f"Fehler beim Speichern der Alarme: {e}", parent=window)
+
+    form = tk.Frame(window, bg="#2c2f33")
+    form.pack(fill=tk.X, padx=5, pady=5)
+    symbol_var = tk.StringVar(value=selected_symbols[0] if selected_symbols else "")
+    field_labels = {label: field for field, label in FIELDS.items()}
+    op_labels = {label: op for op, label in OPS.items()}
+    field_var = tk.StringVar(value=FIELDS["price"])
+    op_var = tk.StringVar(value=OPS["above"])
+    threshold_var = tk.StringVar()
+    # Pick from the known pairs or type one, it is checked against the markets on adding
+    ttk.Combobox(form, textvariable=symbol_var, values=market_cache.symbols, width=14).pack(side=tk.LEFT, padx=2)
+    tk.OptionMenu(form, field_var, *field_labels).pack(side=tk.LEFT, padx=2)
+    tk.OptionMenu(form, op_var, *op_labels).pack(side=tk.LEFT, padx=2)
+    tk.Entry(form, textvariable=threshold_var, width=10).pack(side=tk.LEFT, padx=2)
+
+    def add():
+        try:
+            threshold = float(threshold_var.get().replace(",", "."))
+        except ValueError:
+            messagebox.showerror("Fehler", "Bitte einen gültigen Schwellenwert eingeben.", parent=window)
+            return
+        symbol = symbol_var.get().strip().upper()
+        if not symbol:
+            return
+        if market_cache.markets and symbol not in market_cache.markets:
+            messagebox.showerror("Fehler", f"{symbol} ist kein Handelspaar der Börse.", parent=window)
+            return
+        # Price thresholds are in the currency shown right now and stay in it
+        alerts.add(symbol, field_labels[field_var.get()], op_labels[op_var.get()], threshold,
+                   currency=core.fx.currency)
+        save()
+        refresh()
+        # The symbol is fetched from now on, also when no watchlist has it
+        update_selection(selected_symbols)
+
+    def remove():
+        for index in rule_list.curselection():
+            alerts.remove(rule_ids[index])
+        save()
+        refresh()
+        update_selection(selected_symbols)
+
+    tk.Button(form, text="Hinzufügen", command=add, bg="#7289da", fg="white").pack(side=tk.LEFT, padx=2)
+    tk.Button(form, text="Entfernen", command=remove, bg="#7289da", fg="white").pack(side=tk.LEFT, padx=2)
+    refresh()
 
 def stop_update_process():
     """Stop the data retrieval process."""
-    global is_running
-    is_running = False
-
-def restart_update_process(exchange, selected_symbols, tree, interval_var):
-    """Restart the data retrieval process."""
-    stop_update_process()
-    start_update_process(exchange, selected_symbols, tree, interval_var)
-
-def toggle_symbol(symbol, var, selected_symbols, tree, exchange, interval_var):
-    """Toggle a symbol in the selection and update the table."""
-    if var.get():
-        selected_symbols.append(symbol)
+    global feed
+    scheduler.stop()
+    candle_scheduler.stop()
+    if feed is not None:
+        feed.stop()
+        feed = None
+    if share_client is not None:
+        share_client.stop()
+
+def fetch_order_book(symbol, limit):
+    """Order-book snapshot from the exchange (or the replay) the core uses."""
+    return core.exchange.fetch_order_book(symbol, limit)
+
+def visible_columns():
+    """Table columns on screen; the rolling and depth columns only show while switched on."""
+    columns = headers if core.metrics.rolling else [header for header in headers if header not in rolling_headers]
+    return columns + depth_headers if core.books is not None else columns
+
+def toggle_rolling(enabled):
+    """Switch the rolling metrics; while off, a tick only computes the base columns."""
+    core.metrics.set_rolling(enabled)
+    for table in tables.values():
+        table.tree["displaycolumns"] = visible_columns()
+    if feed is None:
+        scheduler.trigger()
+
+def toggle_depth(enabled):
+    """Switch the order-book mode: keep local books of the selection and show the depth columns.
+
+    Live books follow the depth diffs in polling and streaming mode alike; a
+    replay refreshes them from the recorded snapshots on every tick.
+    """
+    global book_feed
+    if book_feed is not None:
+        book_feed.stop()
+        book_feed = None
+    if not enabled:
+        core.books = None
+    elif REPLAY_FILE:
+        core.books = BookManager(fetch_order_book, limit=ORDER_BOOK_LIMIT)
+    else:
+        core.books = BookManager(fetch_order_book, limit=ORDER_BOOK_LIMIT, streamed=True)
+        book_feed = get_book_feed(core.books)
+        sync_books(selected_symbols)
+        book_feed.start()
+    for table in tables.values():
+        table.tree["displaycolumns"] = visible_columns()
+    if feed is None:
+        scheduler.trigger()
+
+def change_currency(currency, selected_symbols):
+    """Switch the display currency; the next tick fetches the new rate in its batch."""
+    core.fx.set_currency(currency)
+    for table in tables.values():
+        table.set_headings(headers + depth_headers, display_headers(currency, headers + depth_headers))
+    if feed is not None:
+        feed.subscribe(core.feed_symbols(selected_symbols))
     else:
-        if symbol in selected_symbols:
-            selected_symbols.remove(symbol)
-    restart_update_process(exchange, selected_symbols, tree, interval_var)
+        scheduler.trigger()
 
-def filter_symbols(search_var, scrollable_frame, all_symbols, selected_symbols):
-    """Filter the displayed symbols based on the input in the search field."""
-    global search_active
-    search_text = search_var.get().lower()
+def toggle_symbol(symbol, var, selected_symbols, pump, exchange, interval_var):
+    """Toggle a symbol in the active watchlist and update the table."""
+    watchlists.set_selected(watchlists.active, symbol, var.get())
+    save_watchlists()
+    update_selection(selected_symbols)
+    tables[watchlists.active].show(latest_rows)
 
-    # Wenn das Suchfeld leer ist, wird das Coin-Menü nicht gefüllt
-    if search_text == "":
-        for widget in scrollable_frame.winfo_children():
-            widget.destroy()  # Löscht alle Widgets
+def select_symbol(symbol, selected_symbols):
+    """Make sure a symbol is fetched, e.g. so a new position gets priced."""
+    if symbol not in selected_symbols:
+        update_selection(selected_symbols)
+
+def fetch_extra():
+    """Symbols fetched beyond the watchlists: held positions, alert rules and those clients asked for."""
+    alert_symbols = sorted({rule.symbol for rule in alerts.rules.values()})
+    return list(portfolio.positions) + alert_symbols + (share_server.wanted() if share_server is not None else [])
+
+def update_selection(selected_symbols):
+    """Rebuild the fetched symbols in place: all watchlists plus the held positions, each once."""
+    selected_symbols[:] = watchlists.symbols(extra=fetch_extra())
+    sync_selection(selected_symbols)
+
+def save_watchlists():
+    try:
+        watchlists.save()
+    except Exception as e:
+        messagebox.showerror("Fehler", f"Fehler beim Speichern der Watchlisten: {e}")
+
+def sync_selection(selected_symbols):
+    """Hand the changed selection to the feed or scheduler and the other consumers."""
+    core.select(selected_symbols)
+    if share_client is not None:
+        share_client.set_symbols(selected_symbols)
+    if feed is not None:
+        # Streaming: keep the connection and only resubscribe
+        feed.subscribe(core.feed_symbols(selected_symbols))
+    else:
+        # Coalesced by the scheduler, a running one fetches the new set right away
+        scheduler.set_symbols(selected_symbols)
+    candle_scheduler.set_symbols(selected_symbols)
+    for comparison in comparison_schedulers:
+        comparison.set_symbols(selected_symbols)
+    sync_books(selected_symbols)
+
+def sync_books(selected_symbols):
+    """Keep the streamed order books on the fetched symbols."""
+    if book_feed is not None:
+        core.books.watch(selected_symbols)
+        book_feed.subscribe(selected_symbols)
+
+def format_venue_status(status):
+    """Summarize the per-venue state of the last comparison fetch."""
+    parts = []
+    for venue, state in status.items():
+        if state.ok:
+            parts.append(f"{venue}: {state.latency * 1000:.0f} ms")
+        else:
+            parts.append(f"{venue}: {'Zeitüberschreitung' if state.error == 'timeout' else state.error}")
+    return " | ".join(parts)
+
+def format_budget(limiter, scheduler):
+    """Describe the request-weight budget and the effective refresh rate."""
+    budget = limiter.budget
+    text = f"Gewicht: {budget.used}/{budget.limit} ({budget.used / budget.limit:.0%})"
+    backoff = limiter.backoff_remaining()
+    if backoff:
+        return f"{text} · Pause nach Fehler: noch {backoff:.0f} s"
+    if scheduler.running and scheduler.effective_interval > scheduler.interval:
+        text += f" · gedrosselt auf {scheduler.effective_interval:.1f} s"
+    return text
+
+def open_comparison_window(selected_symbols, interval_var):
+    """Show the selected pairs across several exchanges with best bid/ask and spread."""
+    interval = read_interval(interval_var)
+    if interval is None:
         return
 
-    search_active = True  # Aktiviert den Suchmodus
+    window = tk.Toplevel(root)
+    window.title(f"{PROGRAM_TITLE} - Börsenvergleich")
+    window.geometry("1000x300")
+    window.configure(bg="#2c2f33")
+
+    venues = AGGREGATE_EXCHANGES
+    columns = ["Symbol", "Bester Bid (USDT)", "Börse (Bid)", "Bester Ask (USDT)", "Börse (Ask)", "Spread (%)"]
+    columns += [f"{venue} (USDT)" for venue in venues]
+    keys = ["symbol", "best_bid", "bid_venue", "best_ask", "ask_venue", "spread"] + [f"last:{venue}" for venue in venues]
+
+    status_var = tk.StringVar(value="Lade Börsen...")
+    tk.Label(window, textvariable=status_var, bg="#2c2f33", fg="white", font=("Arial", 10), anchor="w").pack(fill=tk.X, padx=5)
+
+    comparison_tree = ttk.Treeview(window, columns=columns, show="headings")
+    comparison_tree.pack(fill=tk.BOTH, expand=True)
+    for column in columns:
+        comparison_tree.heading(column, text=column)
+        comparison_tree.column(column, width=120)
+    view = TableView(comparison_tree, columns, keys, formatters={"bid_venue": str, "ask_venue": str})
+
+    from crypticker.aggregate import Aggregator
+    aggregator = Aggregator({venue: (lambda venue=venue: get_venue_exchange(venue)) for venue in venues},
+                            timeout=AGGREGATE_TIMEOUT)
+
+    def apply(snapshot):
+        view.apply(snapshot.rows)
+        status_var.set(format_venue_status(aggregator.status))
+
+    comparison_pump = UiPump(window, apply)
+    comparison_pump.start()
+    comparison = UpdateScheduler(
+        aggregator.fetch_rows, comparison_pump.submit,
+        on_error=lambda e: print(f"Fehler beim Börsenvergleich: {e}"), interval=interval,
+    )
+    comparison.set_symbols(selected_symbols)
+    comparison.start()
+    comparison_schedulers.add(comparison)
+
+    def close():
+        comparison_schedulers.discard(comparison)
+        comparison.stop()
+        comparison_pump.stop()
+        aggregator.close()
+        window.destroy()
+
+    window.protocol("WM_DELETE_WINDOW", close)
+
+def build_symbol_index(pump, on_built):
+    """Index the cached symbols on a worker thread; ``on_built(index)`` runs on the GUI thread."""
+    symbols = market_cache.symbols
+
+    def build():
+        index = SymbolIndex(symbols)
+        pump.post(lambda: on_built(index))
+
+    threading.Thread(target=build, daemon=True).start()
+
+def set_symbol_index(index):
+    """Swap in a search index built off the GUI thread (GUI thread only).
+
+    An index of a symbol list that has been replaced in the meantime is dropped.
+    """
+    global symbol_index
+    if index.symbols is market_cache.symbols:
+        symbol_index = index
+
+def filter_symbols(search_var, coin_list):
+    """Show the symbols matching the search field, best matches first."""
+    # Wenn das Suchfeld leer ist, wird das Coin-Menü nicht gefüllt
+    # Until the first index is built nothing matches; it filters again once it is there
+    coin_list.set_items(symbol_index.search(search_var.get()) if symbol_index is not None else [])
+
+def create_status_panel(parent, instruments, pump):
+    """Collapsible panel with per-stage timings, counters and the pipeline state."""
+    panel = tk.Frame(parent, bg="#2c2f33")
+    body = tk.Frame(panel, bg="#23272a")
+    status_var = tk.StringVar()
+
+    def toggle():
+        if body.winfo_ismapped():
+            body.pack_forget()
+            toggle_button.config(text="▸ Status")
+        else:
+            body.pack(fill=tk.X)
+            toggle_button.config(text="▾ Status")
+            refresh()
+
+    def refresh():
+        if not body.winfo_ismapped():
+            return
+        lines = instruments.summary_lines()
+        lines.append("Pipeline: " + "  ".join(f"{name}={value}" for name, value in pump.snapshots.stats().items()))
+        if instruments.profile is not None:
+            lines.append(f"Profil läuft, noch {instruments.profile.remaining} Ticks")
+        elif instruments.last_profile_files:
+            lines.append("Profil gespeichert: " + ", ".join(instruments.last_profile_files))
+        status_var.set("\n".join(lines))
+        body.after(STATUS_REFRESH_MS, refresh)
+
+    def dump():
+        path = instruments.dump(time.strftime("instrumentation-%Y%m%d-%H%M%S.json"),
+                                extra={"pipeline": pump.snapshots.stats()})
+        messagebox.showinfo("Info", f"Messwerte gespeichert: {path}")
+
+    def profile():
+        instruments.start_profile(PROFILE_TICKS)
+        refresh()
+
+    toggle_button = tk.Button(panel, text="▸ Status", command=toggle, bg="#2c2f33", fg="white", relief="flat", anchor="w")
+    toggle_button.pack(fill=tk.X)
+    tk.Label(body, textvariable=status_var, bg="#23272a", fg="white", font=("Courier", 9), justify=tk.LEFT,
+             anchor="w").pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+    tk.Button(body, text="Als JSON speichern", command=dump, bg="#7289da", fg="white").pack(side=tk.TOP, padx=5, pady=2)
+    tk.Button(body, text=f"Profil ({PROFILE_TICKS} Ticks)", command=profile, bg="#7289da", fg="white").pack(side=tk.TOP, padx=5, pady=2)
+    return panel
+
+def format_signed(value):
+    return f"{value:+.2f}" if value is not None else "N/A"
+
+def create_portfolio_panel(parent, selected_symbols):
+    """Collapsible positions table with totals; returns the panel and its refresh function."""
+    panel = tk.Frame(parent, bg="#2c2f33")
+    body = tk.Frame(panel, bg="#23272a")
+    columns = ["Symbol", "Menge", "Ø Kaufpreis", "Preis", "Wert", "G/V", "G/V (%)"]
+    keys = ["symbol", "quantity", "average_price", "price", "value", "pnl", "pnl_percent"]
+    positions_tree = ttk.Treeview(body, columns=columns, show="headings", height=5)
+    for column in columns:
+        positions_tree.heading(column, text=column)
+        positions_tree.column(column, width=100)
+    view = TableView(positions_tree, columns, keys, formatters={
+        "quantity": lambda value: f"{value:.8g}", "pnl": format_signed, "pnl_percent": format_signed,
+    })
+    totals_var = tk.StringVar()
+    shown = {"generation": None, "rate": None, "realized": 0.0}
+
+    def toggle():
+        if body.winfo_ismapped():
+            body.pack_forget()
+            toggle_button.config(text="▸ Portfolio")
+        else:
+            body.pack(fill=tk.X)
+            toggle_button.config(text="▾ Portfolio")
+            refresh()
 
-    # Alle Symbole anzeigen, die dem Suchtext entsprechen
-    for widget in scrollable_frame.winfo_children():
-        widget.destroy()  # Löscht alle vorherigen Widgets
+    def refresh():
+        """Redraw the revalued positions only, everything after edits or a rate change."""
+        rate = core.fx.rate()[0] or 0.0
+        if shown["generation"] != portfolio.generation or shown["rate"] != rate:
+            portfolio.take_dirty()
+            view.apply(portfolio.rows(rate=rate))
+            shown.update(generation=portfolio.generation, rate=rate, realized=portfolio.realized)
+        else:
+            dirty = portfolio.take_dirty()
+            if dirty:
+                view.update_rows(portfolio.rows(dirty, rate))
+        currency = core.fx.currency
+        totals_var.set(
+            f"Wert: {portfolio.value * rate:.2f} {currency}   "
+            f"Unrealisiert: {format_signed(portfolio.pnl * rate)}   "
+            f"Realisiert: {format_signed(shown['realized'] * rate)}"
+        )
 
-    for symbol in all_symbols:
-        if search_text in symbol.lower():
-            var = tk.BooleanVar(value=(symbol in selected_symbols))
-            checkbox = tk.Checkbutton(
-                scrollable_frame,
-                text=symbol,
-                variable=var,
-                command=lambda s=symbol, v=var: toggle_symbol(s, v, selected_symbols, tree, exchange, interval_var),
-                bg="#36393f" if symbol in selected_symbols else "#2c2f33",
-                fg="white",
-                selectcolor="#7289da",
-                font=("Arial", 10)
-            )
-            checkbox.pack(fill=tk.X, padx=2, pady=1)
+    def changed():
+        try:
+            portfolio.save()
+        except Exception as e:
+            messagebox.showerror("Fehler", f"Fehler beim Speichern des Portfolios: {e}")
+        refresh()
+
+    def edit_position():
+        window = tk.Toplevel(root)
+        window.title(f"{PROGRAM_TITLE} - Position")
+        window.configure(bg="#2c2f33")
+        selection = positions_tree.selection()
+        position = portfolio.positions.get(selection[0]) if selection else None
+        fields = [("Symbol", position.symbol if position else ""),
+                  ("Menge", f"{position.quantity:.8g}" if position else ""),
+                  ("Einstandswert gesamt (USDT)", f"{position.cost:.2f}" if position else "")]
+        variables = []
+        for row, (label, value) in enumerate(fields):
+            tk.Label(window, text=label, bg="#2c2f33", fg="white").grid(row=row, column=0, sticky="w", padx=5, pady=2)
+            variables.append(tk.StringVar(value=value))
+            tk.Entry(window, textvariable=variables[-1]).grid(row=row, column=1, padx=5, pady=2)
+
+        def save():
+            symbol = variables[0].get().strip().upper()
+            try:
+                quantity, cost = parse_number(variables[1].get()), parse_number(variables[2].get())
+            except ValueError:
+                messagebox.showerror("Fehler", "Bitte gültige Zahlen eingeben.", parent=window)
+                return
+            if not symbol:
+                return
+            portfolio.set_position(symbol, quantity, cost)
+            select_symbol(symbol, selected_symbols)
+            window.destroy()
+            changed()
+
+        tk.Button(window, text="Speichern", command=save, bg="#7289da", fg="white").grid(row=len(fields), column=1, sticky="e", padx=5, pady=5)
 
-    search_active = False  # Deaktiviert den Suchmodus nach Abschluss der Anzeige
+    def import_trades():
+        path = filedialog.askopenfilename(title="Trades importieren", filetypes=[("CSV", "*.csv"), ("Alle Dateien", "*")])
+        if not path:
+            return
+        try:
+            count = portfolio.import_trades(path)
+        except Exception as e:
+            messagebox.showerror("Fehler", f"Fehler beim Importieren der Trades: {e}")
+            return
+        for symbol in portfolio.positions:
+            select_symbol(symbol, selected_symbols)
+        changed()
+        messagebox.showinfo("Info", f"{count} Trades importiert.")
 
+    def remove():
+        for symbol in positions_tree.selection():
+            portfolio.remove(symbol)
+        changed()
 
+    toggle_button = tk.Button(panel, text="▸ Portfolio", command=toggle, bg="#2c2f33", fg="white", relief="flat", anchor="w")
+    toggle_button.pack(fill=tk.X)
+    buttons = tk.Frame(body, bg="#23272a")
+    buttons.pack(side=tk.RIGHT, fill=tk.Y, padx=5)
+    tk.Button(buttons, text="Position...", command=edit_position, bg="#7289da", fg="white").pack(fill=tk.X, pady=2)
+    tk.Button(buttons, text="Trades importieren", command=import_trades, bg="#7289da", fg="white").pack(fill=tk.X, pady=2)
+    tk.Button(buttons, text="Entfernen", command=remove, bg="#7289da", fg="white").pack(fill=tk.X, pady=2)
+    positions_tree.pack(fill=tk.X, padx=5)
+    tk.Label(body, textvariable=totals_var, bg="#23272a", fg="white", font=("Arial", 10), anchor="w").pack(fill=tk.X, padx=5)
+    return panel, lambda: body.winfo_ismapped() and refresh()
 
 def show_loading_message(root, message_var):
     """Display a loading message."""
@@ -228,9 +743,120 @@ def hide_loading_message(loading_label):
     """Hide the loading message."""
     loading_label.destroy()
 
+def load_logo(label):
+    """Show the pre-scaled logo; a missing or outdated copy is rebuilt in the background first."""
+    def show():
+        try:
+            image = tk.PhotoImage(file=LOGO_CACHE_FILE)
+        except tk.TclError as e:
+            print(f"Could not load logo image: {e}")
+            return
+        label.config(image=image)
+        label.image = image  # Keep a reference to avoid garbage collection
+        mark_startup("logo")
+
+    if is_fresh(LOGO_CACHE_FILE, LOGO_FILE):
+        show()
+        return
+
+    def scale():
+        try:
+            scale_image(LOGO_FILE, LOGO_CACHE_FILE, LOGO_WIDTH)
+        except Exception as e:
+            print(f"Could not load logo image: {e}")
+            return
+        pump.post(show)
+
+    threading.Thread(target=scale, daemon=True).start()
+
+def add_watchlist_tab(name):
+    """Create the tab of a watchlist; it draws its rows once it is shown."""
+    table = TickerTable(notebook, watchlists.lists[name], headers + depth_headers, visible_columns(),
+                        row_keys + depth_keys, candle_cache.get, on_open=open_chart_window,
+                        sparkline_width=SPARKLINE_WIDTH)
+    table.set_headings(headers + depth_headers, display_headers(core.fx.currency, headers + depth_headers))
+    tables[name] = table
+    notebook.add(table, text=name)
+    return table
+
+def show_watchlist(event=None):
+    """Make the selected tab the active watchlist and let it catch up with the latest snapshot."""
+    for name, table in tables.items():
+        if str(table) == notebook.select():
+            break
+    else:
+        return
+    if watchlists.active != name:
+        watchlists.active = name
+        save_watchlists()
+    if table.stale:
+        table.show(latest_rows)
+    coin_list.refresh()
+
+def new_watchlist(selected_symbols):
+    name = simpledialog.askstring("Neue Watchlist", "Name der Watchlist:", parent=root)
+    if not name:
+        return
+    try:
+        watchlists.add(name)
+    except ValueError as e:
+        messagebox.showerror("Fehler", str(e))
+        return
+    save_watchlists()
+    notebook.select(add_watchlist_tab(name.strip()))
+
+def remove_watchlist(selected_symbols):
+    name = watchlists.active
+    if len(watchlists.lists) == 1:
+        messagebox.showinfo("Info", "Die letzte Watchlist kann nicht gelöscht werden.")
+        return
+    if not messagebox.askyesno("Watchlist löschen", f"Watchlist „{name}“ löschen?"):
+        return
+    watchlists.remove(name)
+    tables.pop(name).destroy()
+    save_watchlists()
+    update_selection(selected_symbols)
+    notebook.select(tables[watchlists.active])
+
+def validate_watchlists(selected_symbols):
+    """Check the watchlists against the market cache; typos are fixed, unknown pairs dropped."""
+    changes = watchlists.validate(market_cache.markets)
+    if not changes:
+        return
+    save_watchlists()
+    update_selection(selected_symbols)
+    for table in tables.values():
+        table.stale = True
+    tables[watchlists.active].show(latest_rows)
+    lines = [f"{name}: {symbol} → {replacement or 'entfernt'}"
+             for name, items in changes.items() for symbol, replacement in items]
+    messagebox.showinfo("Watchlisten geprüft", "Nicht gelistete Paare:\n" + "\n".join(lines))
+
+def serve_snapshots(port):
+    """Publish every snapshot locally; symbols asked for by clients join the fetch."""
+    global share_server
+    from crypticker.share import SnapshotServer
+
+    share_server = SnapshotServer(port=port, on_wanted=lambda: pump.post(lambda: update_selection(selected_symbols)))
+    try:
+        share_server.start()
+    except OSError as e:
+        share_server = None
+        messagebox.showerror("Fehler", f"Port {port} kann nicht geöffnet werden: {e}")
+        return
+    atexit.register(share_server.stop)
+    print(f"Snapshots unter {share_server.url}")
+
 def create_gui():
-    global root, tree, interval_var, exchange, selected_symbols
-    exchange = get_exchange()
+    global root, pump, scheduler, core, interval_var, stream_var, selected_symbols
+    global candle_cache, candle_scheduler, coin_list, notebook
+    # The exchange (and with it ccxt) is attached once load_exchange is done
+    core = TickerCore(
+        None,
+        MetricsEngine(window=METRICS_WINDOW, ema_span=METRICS_EMA_SPAN, rolling=METRICS_ROLLING),
+        history,
+        FxService(DISPLAY_CURRENCY, ttl=FX_TTL, max_age=FX_MAX_AGE),
+    )
 
     root = tk.Tk()
     root.title(PROGRAM_TITLE)
@@ -241,17 +867,41 @@ def create_gui():
     # Allow resizing
     root.resizable(True, True)
 
-    # Show loading message
-    message_var = tk.StringVar(value="Bitte warten, lade Coins...")
+    # Worker threads only produce snapshots, the main loop draws them
+    pump = UiPump(root, lambda snapshot: apply_snapshot(snapshot))
+    pump.start()
+    if CONNECT_URL:
+        # Client mode: the rows come from another instance, ccxt is never loaded
+        root.after_idle(lambda: client_ready())
+    else:
+        load_exchange(pump, lambda loaded: exchange_ready(loaded))
+
+    # Cached market metadata is available immediately, a refresh runs in the background
+    market_cache.load()
+    if market_cache.symbols:
+        mark_startup("markets")
+
+    # Shown until the exchange is ready and there are symbols to pick from
+    message_var = tk.StringVar(value="Bitte warten, lade Börse..." if market_cache.symbols else "Bitte warten, lade Coins...")
     loading_label = show_loading_message(root, message_var)
 
-    # Load symbols with caching
-    threading.Thread(target=lambda: list_all_symbols(exchange), daemon=True).start()
-    load_cached_symbols()
-    selected_symbols = ["BTC/USDT", "ETH/USDT", "LTC/USDT", "SOL/USDT", "TRUMP/USDT"]
+    # Restore today's tick history and drop expired days without blocking the window
+    threading.Thread(target=lambda: (history.prune(), history.restore()), daemon=True).start()
+    atexit.register(history.close)
 
-    # Hide loading message after loading
-    root.after(1000, lambda: hide_loading_message(loading_label))
+    # Alerts are checked on the producer side; the popup is handed to the main loop
+    alerts.load(DISPLAY_CURRENCY)
+    alerts.add_sink(lambda alert: pump.post(lambda: show_alert_popup(alert)))
+    alerts.add_sink(LogSink(ALERT_LOG_FILE))
+    if ALERT_WEBHOOK_URL:
+        alerts.add_sink(WebhookSink(ALERT_WEBHOOK_URL))
+    # One deduplicated fetch serves all watchlists; held and alerted symbols are fetched too
+    portfolio.load()
+    watchlists.load()
+    selected_symbols = watchlists.symbols(extra=fetch_extra())
+
+    if SERVE_PORT is not None:
+        serve_snapshots(SERVE_PORT)
 
     # Control panel at the top with logo and branding
     control_frame = tk.Frame(root, bg="#2c2f33")
@@ -261,63 +911,184 @@ def create_gui():
     branding_label = tk.Label(control_frame, text="MegaTux-Crypticker", bg="#2c2f33", fg="white", font=("Arial", 14, "bold"))
     branding_label.pack(side=tk.LEFT, padx=(5, 0))
 
-    # Load and place the logo image while maintaining aspect ratio
-    try:
-        logo = Image.open("logo.png")
-        # Calculate new dimensions while maintaining aspect ratio
-        w, h = logo.size
-        max_width = 100  # Adjust this value based on your space
-        ratio = max_width / float(w)
-        h = int(float(h) * float(ratio))
-        logo = logo.resize((max_width, h), Image.LANCZOS)
-        logo_img = ImageTk.PhotoImage(logo)
-        logo_label = tk.Label(control_frame, image=logo_img, bg="#2c2f33")
-        logo_label.image = logo_img  # Keep a reference to avoid garbage collection
-        logo_label.pack(side=tk.LEFT, padx=5)  # Position the logo after the branding text
-    except Exception as e:
-        print(f"Could not load logo image: {e}")
+    # The logo goes after the branding text; it is filled in once the scaled copy is there
+    logo_label = tk.Label(control_frame, bg="#2c2f33")
+    logo_label.pack(side=tk.LEFT, padx=5)
+    load_logo(logo_label)
 
     interval_var = tk.IntVar(value=5)  # Reduced interval for faster updates
     tk.Label(control_frame, text="Intervall (Sekunden):", bg="#2c2f33", fg="white", font=("Arial", 12)).pack(side=tk.LEFT, padx=5)
     tk.Entry(control_frame, textvariable=interval_var, width=5, font=("Arial", 12)).pack(side=tk.LEFT, padx=5)
 
-    tk.Button(control_frame, text="Start", command=lambda: start_update_process(exchange, selected_symbols, tree, interval_var), bg="#7289da", fg="white").pack(side=tk.LEFT, padx=5)
+    currency_var = tk.StringVar(value=DISPLAY_CURRENCY)
+    tk.Label(control_frame, text="Währung:", bg="#2c2f33", fg="white", font=("Arial", 12)).pack(side=tk.LEFT, padx=5)
+    currency_menu = tk.OptionMenu(control_frame, currency_var, *core.fx.currencies,
+                                  command=lambda currency: change_currency(currency, selected_symbols))
+    currency_menu.config(bg="#7289da", fg="white", highlightthickness=0)
+    currency_menu.pack(side=tk.LEFT, padx=5)
+
+    # These need an exchange of their own, a client only shows what its server fetched
+    exchange_state = tk.DISABLED if CONNECT_URL else tk.NORMAL
+
+    stream_var = tk.BooleanVar(value=False)
+    tk.Checkbutton(
+        control_frame, text="Streaming", variable=stream_var, bg="#2c2f33", fg="white",
+        selectcolor="#7289da", font=("Arial", 12), state=exchange_state
+    ).pack(side=tk.LEFT, padx=5)
+
+    rolling_var = tk.BooleanVar(value=METRICS_ROLLING)
+    tk.Checkbutton(
+        control_frame, text="Rolling-Metriken", variable=rolling_var, command=lambda: toggle_rolling(rolling_var.get()),
+        bg="#2c2f33", fg="white", selectcolor="#7289da", font=("Arial", 12)
+    ).pack(side=tk.LEFT, padx=5)
+
+    depth_var = tk.BooleanVar(value=False)
+    tk.Checkbutton(
+        control_frame, text="Orderbuch", variable=depth_var, command=lambda: toggle_depth(depth_var.get()),
+        bg="#2c2f33", fg="white", selectcolor="#7289da", font=("Arial", 12), state=exchange_state
+    ).pack(side=tk.LEFT, padx=5)
+
+    # Enabled by exchange_ready (or client_ready)
+    start_button = tk.Button(control_frame, text="Start", command=lambda: start_update_process(exchange, selected_symbols, pump, interval_var),
+                             bg="#7289da", fg="white", state=tk.DISABLED)
+    start_button.pack(side=tk.LEFT, padx=5)
     tk.Button(control_frame, text="Stop", command=stop_update_process, bg="#7289da", fg="white").pack(side=tk.LEFT, padx=5)
+    tk.Button(control_frame, text="Alarme", command=lambda: open_alerts_window(selected_symbols), bg="#7289da", fg="white").pack(side=tk.LEFT, padx=5)
+    tk.Button(control_frame, text="Börsenvergleich", command=lambda: open_comparison_window(selected_symbols, interval_var), bg="#7289da", fg="white",
+              state=exchange_state).pack(side=tk.LEFT, padx=5)
+
+    # One tab per watchlist, each with its table and sparkline column
+    tab_bar = tk.Frame(root, bg="#2c2f33")
+    tab_bar.pack(fill=tk.X)
+    tk.Button(tab_bar, text="Watchlist löschen", command=lambda: remove_watchlist(selected_symbols), bg="#7289da", fg="white").pack(side=tk.RIGHT, padx=5)
+    tk.Button(tab_bar, text="Neue Watchlist", command=lambda: new_watchlist(selected_symbols), bg="#7289da", fg="white").pack(side=tk.RIGHT, padx=5)
+    notebook = ttk.Notebook(root)
+    notebook.pack(fill=tk.BOTH, expand=True)
+    candle_cache = CandleCache(None, CANDLE_TIMEFRAME, CANDLE_LIMIT, CANDLE_CACHE_SYMBOLS)
+    for name in watchlists.lists:
+        add_watchlist_tab(name)
+    notebook.select(tables[watchlists.active])
+    notebook.bind("<<NotebookTabChanged>>", show_watchlist)
 
-    # Table
-    tree = ttk.Treeview(root, columns=headers, show="headings", height=5)
-    tree.pack(fill=tk.BOTH, expand=True)
+    def apply_snapshot(snapshot):
+        """Draw the visible tab only; hidden tabs catch up from ``latest_rows`` when shown."""
+        global latest_rows
+        latest_rows = snapshot.rows
+        for table in tables.values():
+            table.stale = True
+        with core.instruments.stage("render"):
+            tables[watchlists.active].show(snapshot.rows)
+        refresh_portfolio()
 
-    for header in headers:
-        tree.heading(header, text=header)
-        tree.column(header, width=150)
+    scheduler = UpdateScheduler(
+        core.fetch_rows,
+        publish_rows,
+        on_error=lambda e: print(f"Fehler beim Abrufen der Daten: {e}"),
+    )
+
+    candle_scheduler = UpdateScheduler(
+        candle_cache.update,
+        lambda changed: pump.post(lambda: apply_candles(changed)),
+        on_error=lambda e: print(f"Fehler beim Abrufen der Kerzen: {e}"),
+        interval=CANDLE_REFRESH_S,
+    )
+
+    budget_var = tk.StringVar()
+    tk.Label(root, textvariable=budget_var, bg="#2c2f33", fg="white", font=("Arial", 10), anchor="w").pack(side=tk.BOTTOM, fill=tk.X, padx=5)
+
+    def refresh_budget():
+        budget_var.set(format_budget(core.limiter, scheduler))
+        root.after(STATUS_REFRESH_MS, refresh_budget)
 
     # Coin menu at the bottom of the GUI
     coin_menu_frame = tk.Frame(root, bg="#2c2f33")
     coin_menu_frame.pack(side=tk.BOTTOM, fill=tk.X, expand=False)
 
+    create_status_panel(root, core.instruments, pump).pack(side=tk.BOTTOM, fill=tk.X)
+    portfolio_panel, refresh_portfolio = create_portfolio_panel(root, selected_symbols)
+    portfolio_panel.pack(side=tk.BOTTOM, fill=tk.X)
+
     search_var = tk.StringVar()
     search_entry = tk.Entry(coin_menu_frame, textvariable=search_var, font=("Arial", 12), bg="#2c2f33", fg="white")
     search_entry.pack(fill=tk.X, padx=5, pady=5)
 
-    canvas = tk.Canvas(coin_menu_frame, bg="#2c2f33", highlightthickness=0)
-    scrollbar = tk.Scrollbar(coin_menu_frame, orient="vertical", command=canvas.yview, width=20)
-    scrollable_frame = tk.Frame(canvas, bg="#2c2f33")
-
-    scrollable_frame.bind(
-        "<Configure>",
-        lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+    # Only the visible rows get widgets, keystrokes are debounced into one query
+    coin_list = VirtualCheckList(
+        coin_menu_frame,
+        is_selected=lambda symbol: symbol in watchlists.active_symbols,
+        on_toggle=lambda symbol, var: toggle_symbol(symbol, var, selected_symbols, pump, exchange, interval_var),
+        height=200,
     )
-    canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-    canvas.configure(yscrollcommand=scrollbar.set)
+    coin_list.pack(fill=tk.X, expand=False)
+
+    search_debouncer = Debouncer(root, 150, lambda: filter_symbols(search_var, coin_list))
+    search_var.trace_add("write", search_debouncer.trigger)
+
+    def symbol_index_built(index):
+        set_symbol_index(index)
+        filter_symbols(search_var, coin_list)
+
+    def markets_updated(index):
+        symbol_index_built(index)
+        validate_watchlists(selected_symbols)
+        mark_startup("markets")
+        check_ready()
+
+    def check_markets():
+        refresh_markets(exchange, pump, markets_updated)
+        root.after(MARKET_CHECK_MS, check_markets)
+
+    def exchange_ready(loaded):
+        global exchange
+        exchange = core.exchange = candle_cache.exchange = loaded
+        # Batches the requests and paces the polling to the exchange's weight limit
+        limiter = None if REPLAY_FILE else RateLimiter.for_exchange(loaded)
+        core.limiter = scheduler.limiter = limiter
+        if limiter is not None:
+            refresh_budget()
+        start_button.config(state=tk.NORMAL)
+        mark_startup("exchange")
+        check_markets()
+        check_ready()
 
-    canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-    scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+    def client_ready():
+        """Client mode: start right away; the symbol list stays the cached one, nothing refreshes it."""
+        start_button.config(state=tk.NORMAL)
+        mark_startup("exchange")
+        mark_startup("markets")
+        check_ready()
 
-    search_var.trace_add("write", lambda *args: filter_symbols(search_var, scrollable_frame, cached_symbols, selected_symbols))
-    filter_symbols(search_var, scrollable_frame, cached_symbols, selected_symbols)
+    def check_ready():
+        """Drop the loading message once the exchange is there and symbols can be picked."""
+        if "exchange" not in startup_times or "markets" not in startup_times:
+            if "exchange" in startup_times:
+                message_var.set("Bitte warten, lade Coins...")
+            return
+        if loading_label.winfo_exists():
+            hide_loading_message(loading_label)
+            mark_startup("ready")
+        if STARTUP_REPORT:
+            print(json.dumps(startup_times))
+            root.destroy()
 
+    if market_cache.symbols:
+        # Indexing a few thousand pairs takes a moment, the first keystroke must not wait for it
+        build_symbol_index(pump, symbol_index_built)
+        root.after_idle(lambda: validate_watchlists(selected_symbols))
+    root.after_idle(lambda: mark_startup("window"))
     root.mainloop()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=PROGRAM_TITLE)
+    parser.add_argument("--record", metavar="DATEI", help="Antworten der Börse in DATEI aufzeichnen")
+    parser.add_argument("--replay", metavar="DATEI", help="Aufzeichnung statt der Börse abspielen")
+    parser.add_argument("--speed", type=float, default=1.0, help="Abspielgeschwindigkeit (0 = so schnell wie möglich)")
+    parser.add_argument("--startup-report", action="store_true", help="Startzeiten als JSON ausgeben und beenden")
+    parser.add_argument("--serve", metavar="PORT", type=int, nargs="?", const=SERVE_DEFAULT_PORT,
+                        help=f"Snapshots für andere Instanzen lokal bereitstellen (Standard-Port {SERVE_DEFAULT_PORT})")
+    parser.add_argument("--connect", metavar="URL", help="Snapshots einer anderen Instanz anzeigen, z. B. http://127.0.0.1:8765")
+    args = parser.parse_args()
+    SERVE_PORT, CONNECT_URL = args.serve, args.connect
+    RECORD_FILE, REPLAY_FILE, REPLAY_SPEED = args.record, args.replay, args.speed
+    STARTUP_REPORT = args.startup_report
     create_gui()
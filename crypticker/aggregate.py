@@ -0,0 +1,135 @@
+"""Fetch the same pairs from several exchanges at once and combine them."""
+
+import collections
+import concurrent.futures
+import time
+
+ASSET_ALIASES = {"XBT": "BTC", "XDG": "DOGE"}
+
+VenueStatus = collections.namedtuple("VenueStatus", "ok latency error")
+
+
+def normalize_symbol(symbol):
+    """Map venue-specific spellings onto one symbol, e.g. ``xbt/usdt:USDT`` -> ``BTC/USDT``."""
+    base, _, quote = symbol.upper().split(":")[0].partition("/")
+    return f"{ASSET_ALIASES.get(base, base)}/{ASSET_ALIASES.get(quote, quote)}"
+
+
+def combine(symbols, venue_tickers, venues=None):
+    """Build one row per symbol with best bid/ask across venues and per-venue prices.
+
+    ``venues`` lists the per-venue columns (default: the venues that answered).
+    Rows are sorted by cross-venue spread, lowest (most attractive) first.
+    """
+    rows = []
+    for symbol in symbols:
+        row = {"symbol": symbol, "best_bid": None, "bid_venue": "", "best_ask": None, "ask_venue": "", "spread": None}
+        for venue in venues or venue_tickers:
+            ticker = venue_tickers.get(venue, {}).get(symbol)
+            row[f"last:{venue}"] = ticker.get("last") if ticker else None
+            if not ticker:
+                continue
+            bid, ask = ticker.get("bid"), ticker.get("ask")
+            if bid and (row["best_bid"] is None or bid > row["best_bid"]):
+                row["best_bid"], row["bid_venue"] = bid, venue
+            if ask and (row["best_ask"] is None or ask < row["best_ask"]):
+                row["best_ask"], row["ask_venue"] = ask, venue
+        if row["best_bid"] and row["best_ask"]:
+            row["spread"] = (row["best_ask"] - row["best_bid"]) / row["best_bid"] * 100
+        rows.append(row)
+    return sorted(rows, key=lambda x: float("inf") if x["spread"] is None else x["spread"])
+
+
+class Aggregator:
+    """Fetch tickers from several exchanges concurrently, each with its own timeout.
+
+    ``exchanges`` maps a venue name to an exchange object or to a factory
+    returning one; factories run in the worker thread so slow imports or
+    market loading never block the caller. A venue that misses the deadline
+    is reported as timed out and not asked again until its request has
+    returned; the next fetch then uses that late result. The other venues'
+    results are used as they are.
+    """
+
+    def __init__(self, exchanges, timeout=3.0):
+        self.timeout = timeout
+        self.status = {}
+        self._sources = dict(exchanges)
+        self._exchanges = {}
+        self._symbol_maps = {}
+        self._pending = {}
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, len(self._sources)))
+
+    @property
+    def venues(self):
+        return list(self._sources)
+
+    def _exchange(self, venue):
+        exchange = self._exchanges.get(venue)
+        if exchange is None:
+            source = self._sources[venue]
+            exchange = source() if callable(source) and not hasattr(source, "fetch_tickers") else source
+            markets = exchange.load_markets()
+            native = {}
+            for symbol in markets:
+                # Prefer spot pairs over derivatives with a settle suffix
+                key = normalize_symbol(symbol)
+                if key not in native or ":" in native[key]:
+                    native[key] = symbol
+            self._symbol_maps[venue] = native
+            self._exchanges[venue] = exchange
+        return exchange
+
+    def _fetch_venue(self, venue, symbols):
+        start = time.monotonic()
+        exchange = self._exchange(venue)
+        native = self._symbol_maps[venue]
+        wanted = {symbol: native[symbol] for symbol in symbols if symbol in native}
+        tickers = exchange.fetch_tickers(list(wanted.values())) if wanted else {}
+        result = {symbol: tickers[venue_symbol] for symbol, venue_symbol in wanted.items() if venue_symbol in tickers}
+        return result, time.monotonic() - start
+
+    def fetch(self, symbols):
+        """Return ``{venue: {symbol: ticker}}`` for all venues that answered in time.
+
+        A venue that missed an earlier deadline contributes the late result
+        of that request once it has arrived, unless the new request answers
+        in time.
+        """
+        symbols = [normalize_symbol(symbol) for symbol in symbols]
+        futures = {}
+        late = {}
+        for venue in self._sources:
+            pending = self._pending.get(venue)
+            if pending is not None and not pending.done():
+                continue  # Still busy with an earlier request
+            if pending is not None:
+                late[venue] = self._pending.pop(venue)
+            futures[venue] = self._pool.submit(self._fetch_venue, venue, symbols)
+
+        concurrent.futures.wait(futures.values(), timeout=self.timeout)
+        results = {}
+        for venue in self._sources:
+            future = futures.get(venue)
+            if future is None:
+                self.status[venue] = VenueStatus(False, None, "busy")
+                continue
+            if not future.done():
+                self._pending[venue] = future
+                future = late.get(venue)
+                if future is None:
+                    self.status[venue] = VenueStatus(False, None, "timeout")
+                    continue
+            if future.exception() is not None:
+                self.status[venue] = VenueStatus(False, None, str(future.exception()))
+            else:
+                tickers, latency = future.result()
+                results[venue] = {symbol: tickers[symbol] for symbol in symbols if symbol in tickers}
+                self.status[venue] = VenueStatus(True, latency, None)
+        return results
+
+    def fetch_rows(self, symbols):
+        return combine([normalize_symbol(symbol) for symbol in symbols], self.fetch(symbols), self.venues)
+
+    def close(self):
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,290 @@
+"""Price, change and volatility alerts evaluated on every snapshot.
+
+Thresholds are kept per (symbol, field, currency) in sorted lists, split
+into armed and fired rules. A tick costs a few bisections per watched symbol
+plus the rules that actually fire or re-arm, however many rules there are. A
+fired rule stays quiet until the value has moved back past the threshold by
+the hysteresis, then it is armed again.
+
+Price rules carry the currency their threshold is in. A rule in the quote
+currency of its pair is checked against the raw ``last`` price, a rule in
+another currency only against rows converted into it with a current rate.
+"""
+
+import bisect
+import collections
+import itertools
+import json
+import queue
+import threading
+import time
+
+from crypticker.market_cache import write_json_atomic
+
+SCHEMA_VERSION = 2  # 2: price rules carry their currency
+FIELDS = {"price": "Preis", "percent_change": "% Change", "volatility": "Volatilität"}
+OPS = {"above": "über", "below": "unter"}
+DEFAULT_HYSTERESIS = 0.01  # Share of the threshold when a rule has none
+
+AlertRule = collections.namedtuple("AlertRule", "id symbol field op threshold hysteresis currency")
+Alert = collections.namedtuple("Alert", "rule value time")
+
+
+def format_alert(alert):
+    return f"{format_rule(alert.rule)} (aktuell {alert.value:g})"
+
+
+def format_rule(rule):
+    unit = f" {rule.currency}" if rule.currency else ""
+    return f"{rule.symbol}: {FIELDS[rule.field]} {OPS[rule.op]} {rule.threshold:g}{unit}"
+
+
+def quote_currency(symbol):
+    return symbol.partition("/")[2].split(":")[0]
+
+
+class _SortedRules:
+    """Rule ids sorted by a trigger level, with the levels in a parallel list for bisect."""
+
+    def __init__(self):
+        self.levels = []
+        self.ids = []
+
+    def add(self, level, rule_id):
+        index = bisect.bisect_right(self.levels, level)
+        self.levels.insert(index, level)
+        self.ids.insert(index, rule_id)
+
+    def remove(self, level, rule_id):
+        index = bisect.bisect_left(self.levels, level)
+        while self.ids[index] != rule_id:
+            index += 1
+        del self.levels[index]
+        del self.ids[index]
+
+    def pop_upto(self, value):
+        """Remove and return the ids with a level <= value."""
+        index = bisect.bisect_right(self.levels, value)
+        ids = self.ids[:index]
+        del self.levels[:index], self.ids[:index]
+        return ids
+
+    def pop_from(self, value):
+        """Remove and return the ids with a level >= value."""
+        index = bisect.bisect_left(self.levels, value)
+        ids = self.ids[index:]
+        del self.levels[index:], self.ids[index:]
+        return ids
+
+    def pop_below(self, value):
+        """Remove and return the ids with a level < value."""
+        index = bisect.bisect_left(self.levels, value)
+        ids = self.ids[:index]
+        del self.levels[:index], self.ids[:index]
+        return ids
+
+    def pop_above(self, value):
+        """Remove and return the ids with a level > value."""
+        index = bisect.bisect_right(self.levels, value)
+        ids = self.ids[index:]
+        del self.levels[index:], self.ids[index:]
+        return ids
+
+
+class _Watch:
+    """Armed and fired rules of one (symbol, field, currency)."""
+
+    def __init__(self):
+        self.above = _SortedRules()  # Armed, keyed by threshold
+        self.below = _SortedRules()
+        self.above_fired = _SortedRules()  # Keyed by the re-arm level
+        self.below_fired = _SortedRules()
+
+
+class AlertEngine:
+    """Alert rules with persistence, evaluation and delivery to sinks.
+
+    ``evaluate(rows)`` is meant for the producer side (scheduler or feed
+    thread); sinks run on that thread and must hand GUI work to the main loop.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.rules = {}
+        self.fired = set()  # Ids of rules waiting to be re-armed
+        self.sinks = []
+        self._watches = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def add(self, symbol, field, op, threshold, hysteresis=None, currency=None):
+        """Add a rule and return it; ``hysteresis`` is in the unit of the field.
+
+        Price rules need the ``currency`` of their threshold; the other fields
+        are percentages and ignore it.
+        """
+        if field not in FIELDS or op not in OPS:
+            raise ValueError(f"unknown alert {field!r} {op!r}")
+        if field != "price":
+            currency = None
+        elif not currency:
+            raise ValueError("price alerts need a currency")
+        threshold = float(threshold)
+        if hysteresis is None:
+            hysteresis = abs(threshold) * DEFAULT_HYSTERESIS
+        with self._lock:
+            rule = AlertRule(next(self._ids), symbol, field, op, threshold, float(hysteresis), currency)
+            self._insert(rule)
+        return rule
+
+    def _insert(self, rule):
+        self.rules[rule.id] = rule
+        watch = self._watches.setdefault((rule.symbol, rule.field, rule.currency), _Watch())
+        (watch.above if rule.op == "above" else watch.below).add(rule.threshold, rule.id)
+
+    def remove(self, rule_id):
+        with self._lock:
+            rule = self.rules.pop(rule_id)
+            key = (rule.symbol, rule.field, rule.currency)
+            watch = self._watches[key]
+            if rule_id in self.fired:
+                self.fired.discard(rule_id)
+                if rule.op == "above":
+                    watch.above_fired.remove(rule.threshold - rule.hysteresis, rule_id)
+                else:
+                    watch.below_fired.remove(rule.threshold + rule.hysteresis, rule_id)
+            else:
+                (watch.above if rule.op == "above" else watch.below).remove(rule.threshold, rule_id)
+            if not any(side.ids for side in vars(watch).values()):
+                del self._watches[key]
+
+    def evaluate(self, rows, currency=None):
+        """Check the rows against the rules, deliver and return the alerts that fired.
+
+        ``currency`` is the one the row prices were converted into. Stale rows
+        (converted with an outdated or missing rate) only feed the rules in the
+        quote currency and on the percentage fields.
+        """
+        now = time.time()
+        alerts = []
+        with self._lock:
+            watches = self._watches
+            for row in rows:
+                symbol = row["symbol"]
+                quote = quote_currency(symbol)
+                values = [
+                    ("percent_change", None, row.get("percent_change")),
+                    ("volatility", None, row.get("volatility")),
+                    ("price", quote, row.get("last") or None),
+                ]
+                if currency and currency != quote and not row.get("stale"):
+                    values.append(("price", currency, row.get("price") or None))
+                for field, unit, value in values:
+                    watch = watches.get((symbol, field, unit))
+                    if watch is not None and value is not None:
+                        self._check(watch, value, now, alerts)
+        for alert in alerts:
+            for sink in self.sinks:
+                try:
+                    sink(alert)
+                except Exception as e:
+                    print(f"Fehler beim Zustellen des Alarms: {e}")
+        return alerts
+
+    def _check(self, watch, value, now, alerts):
+        """Fire and re-arm the rules of one watch for ``value``, collecting the alerts."""
+        rules = self.rules
+        for rule_id in watch.above.pop_upto(value):
+            rule = rules[rule_id]
+            watch.above_fired.add(rule.threshold - rule.hysteresis, rule_id)
+            self.fired.add(rule_id)
+            alerts.append(Alert(rule, value, now))
+        for rule_id in watch.below.pop_from(value):
+            rule = rules[rule_id]
+            watch.below_fired.add(rule.threshold + rule.hysteresis, rule_id)
+            self.fired.add(rule_id)
+            alerts.append(Alert(rule, value, now))
+        for rule_id in watch.above_fired.pop_above(value):
+            self.fired.discard(rule_id)
+            watch.above.add(rules[rule_id].threshold, rule_id)
+        for rule_id in watch.below_fired.pop_below(value):
+            self.fired.discard(rule_id)
+            watch.below.add(rules[rule_id].threshold, rule_id)
+
+    def load(self, currency=None):
+        """Load the rules from ``path``; return False if the file is missing or unreadable.
+
+        Version 1 files kept price thresholds without a currency; they are
+        taken to be in ``currency``, the display currency they were made in.
+        """
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            version = data.get("version")
+            if version not in (1, SCHEMA_VERSION) or (version == 1 and not currency):
+                return False
+            with self._lock:
+                for item in data["rules"]:
+                    unit = item.get("currency", currency) if item["field"] == "price" else None
+                    rule = AlertRule(next(self._ids), item["symbol"], item["field"], item["op"],
+                                     float(item["threshold"]), float(item["hysteresis"]), unit)
+                    self._insert(rule)
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"Fehler beim Laden der Alarme: {e}")
+            return False
+
+    def save(self):
+        with self._lock:
+            rules = [rule._asdict() for rule in self.rules.values()]
+        for rule in rules:
+            del rule["id"]
+        write_json_atomic(self.path, {"version": SCHEMA_VERSION, "rules": rules})
+
+
+class LogSink:
+    """Append every alert as a line to a log file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, alert):
+        line = f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(alert.time))} {format_alert(alert)}\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+class WebhookSink:
+    """POST every alert as JSON to a (local) URL from a background thread."""
+
+    def __init__(self, url, timeout=2.0):
+        self.url = url
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def __call__(self, alert):
+        self._queue.put(alert)
+
+    def _run(self):
+        # Imported on first use, it pulls in http.client and the email package
+        import urllib.request
+
+        while True:
+            alert = self._queue.get()
+            rule = alert.rule
+            body = json.dumps({
+                "symbol": rule.symbol, "field": rule.field, "op": rule.op, "threshold": rule.threshold,
+                "value": alert.value, "time": alert.time, "text": format_alert(alert),
+            }).encode("utf-8")
+            request = urllib.request.Request(self.url, body, {"Content-Type": "application/json"})
+            try:
+                urllib.request.urlopen(request, timeout=self.timeout).close()
+            except Exception as e:
+                print(f"Fehler beim Senden an den Webhook: {e}")
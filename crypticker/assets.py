@@ -0,0 +1,41 @@
+"""Pre-scaled copies of image assets, so the GUI can start without PIL.
+
+The scaled copy is a plain PNG that Tk loads natively. It is rebuilt (with
+PIL, imported only then) when it is missing or older than its source.
+"""
+
+import os
+import tempfile
+
+
+def is_fresh(target, source):
+    """Tell whether ``target`` exists and is not older than ``source``."""
+    try:
+        return os.path.getmtime(target) >= os.path.getmtime(source)
+    except OSError:
+        return False
+
+
+def scale_image(source, target, width):
+    """Resize ``source`` to ``width`` keeping the aspect ratio and save it as PNG at ``target``.
+
+    The copy is written to a temp file and renamed, so a half-written asset is
+    never picked up.
+    """
+    from PIL import Image
+
+    with Image.open(source) as image:
+        w, h = image.size
+        scaled = image.resize((width, max(1, round(h * width / w))), Image.LANCZOS)
+    directory = os.path.dirname(os.path.abspath(target))
+    fd, tmp_path = tempfile.mkstemp(prefix="." + os.path.basename(target) + "-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            scaled.save(f, "PNG")
+        os.replace(tmp_path, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,118 @@
+"""Per-symbol OHLCV cache with incremental fetches and LRU eviction.
+
+Each update only asks the exchange for candles since the newest cached one
+(that candle is fetched again because it may still have been forming). The
+chart widgets read precomputed, downsampled point arrays that are rebuilt
+only when a series actually changed.
+"""
+
+import collections
+import threading
+
+# Index of the fields in a ccxt OHLCV candle
+TIME, OPEN, HIGH, LOW, CLOSE, VOLUME = range(6)
+
+
+def downsample(values, count):
+    """Reduce ``values`` to at most ``count`` points, keeping each bucket's last value."""
+    if len(values) <= count:
+        return list(values)
+    step = len(values) / count
+    return [values[min(len(values) - 1, int((i + 1) * step) - 1)] for i in range(count)]
+
+
+def sparkline_points(values, width, height, pad=2):
+    """Flat ``[x0, y0, x1, y1, ...]`` polyline of ``values`` scaled into ``width`` x ``height``."""
+    values = downsample(values, max(2, width // 2))
+    if len(values) < 2:
+        return []
+    low, high = min(values), max(values)
+    span = (high - low) or 1.0
+    x_step = (width - 2 * pad) / (len(values) - 1)
+    y_scale = (height - 2 * pad) / span
+    points = []
+    for i, value in enumerate(values):
+        points.append(pad + i * x_step)
+        points.append(height - pad - (value - low) * y_scale)
+    return points
+
+
+class CandleSeries:
+    """The cached candles of one symbol; replaced as a whole on every change."""
+
+    def __init__(self, candles=(), version=0):
+        self.candles = list(candles)
+        self.version = version
+        self._points = None  # (width, height, points)
+
+    @property
+    def last_time(self):
+        return self.candles[-1][TIME] if self.candles else None
+
+    def merge(self, new, limit):
+        """Return a new series with ``new`` candles merged in, or None if nothing changed."""
+        if not new:
+            return None
+        candles = self.candles
+        last = self.last_time
+        if last is not None:
+            new = [candle for candle in new if candle[TIME] >= last]
+            if not new or (len(new) == 1 and new[0] == candles[-1]):
+                return None
+            if new[0][TIME] == last:
+                candles = candles[:-1]
+        return CandleSeries((candles + [list(candle) for candle in new])[-limit:], self.version + 1)
+
+    def sparkline(self, width, height):
+        """Close prices as polyline points, cached per size."""
+        cached = self._points
+        if cached is None or cached[0] != width or cached[1] != height:
+            cached = self._points = (width, height, sparkline_points([c[CLOSE] for c in self.candles], width, height))
+        return cached[2]
+
+
+class CandleCache:
+    """OHLCV candles for the most recently used symbols of one exchange."""
+
+    def __init__(self, exchange, timeframe="1m", limit=120, max_symbols=200):
+        self.exchange = exchange
+        self.timeframe = timeframe
+        self.limit = limit  # Candles kept per symbol
+        self.max_symbols = max_symbols
+        self.requests = 0
+        self._series = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, symbol):
+        """The cached series of ``symbol`` (or None); marks it as recently used."""
+        with self._lock:
+            series = self._series.get(symbol)
+            if series is not None:
+                self._series.move_to_end(symbol)
+            return series
+
+    def fetch(self, symbol):
+        """Fetch the candles newer than the cached ones; return True if the series changed."""
+        series = self.get(symbol) or CandleSeries()
+        self.requests += 1
+        new = self.exchange.fetch_ohlcv(symbol, self.timeframe, since=series.last_time, limit=self.limit)
+        merged = series.merge(new, self.limit)
+        if merged is None:
+            return False
+        with self._lock:
+            self._series[symbol] = merged
+            self._series.move_to_end(symbol)
+            while len(self._series) > self.max_symbols:
+                self._series.popitem(last=False)
+        return True
+
+    def update(self, symbols):
+        """Fetch all ``symbols``; return the set of symbols with new candles."""
+        changed = set()
+        for symbol in symbols:
+            try:
+                if self.fetch(symbol):
+                    changed.add(symbol)
+            except Exception as e:
+                print(f"Fehler beim Abrufen der Kerzen für {symbol}: {e}")
+        return changed
@@ -0,0 +1,171 @@
+"""Fetch/compute core shared by the Tk GUI and the headless mode.
+
+Nothing in here (or in the modules it imports) pulls in tkinter or PIL.
+"""
+
+from crypticker.fx import FxService
+from crypticker.instrumentation import Instruments, error_names
+from crypticker.metrics import MetricsEngine
+from crypticker.orderbook import DEPTH_BANDS, depth_key
+from crypticker.replay import RecordingExchange
+
+DEFAULT_SYMBOLS = ["BTC/USDT", "ETH/USDT", "LTC/USDT", "SOL/USDT", "TRUMP/USDT"]
+
+headers = [
+    "Symbol",
+    "Preis (EUR)",
+    "Volatilität (%)",
+    "% Change",
+    "Eröffnungspreis (EUR)",
+    "VWAP (EUR)",
+    "Tageshoch (EUR)",
+    "Tagestief (EUR)",
+    "Realisierte Vol. (%)",
+    "EMA (EUR)",
+    "Z-Score"
+]
+
+# Row dict keys matching the columns above
+row_keys = ["symbol", "price", "volatility", "percent_change", "open_price", "vwap", "high", "low",
+            "realized_vol", "ema", "zscore"]
+
+# Columns of the rolling metrics; only filled while ``MetricsEngine.rolling`` is on
+rolling_headers = headers[-3:]
+rolling_keys = row_keys[-3:]
+
+# Extra columns of the order-book mode
+depth_headers = ["Spread (%)", "Mid (EUR)"] + [
+    header for band in DEPTH_BANDS for header in (f"Tiefe Bid -{band:g}% (EUR)", f"Tiefe Ask +{band:g}% (EUR)")
+]
+depth_keys = ["spread", "mid"] + [
+    key for band in DEPTH_BANDS for key in (f"depth_bid_{depth_key(band)}", f"depth_ask_{depth_key(band)}")
+]
+
+
+def create_exchange(exchange_id="binance"):
+    """Create a ccxt exchange by id."""
+    # Imported here so replays and benchmarks run without ccxt installed
+    import ccxt
+    return getattr(ccxt, exchange_id)()
+
+
+def display_headers(currency, columns=headers):
+    """Column headings for the chosen display currency."""
+    return [header.replace("(EUR)", f"({currency})") for header in columns]
+
+
+def sort_rows(rows):
+    """Sort table rows by volatility (highest first)."""
+    return sorted(rows, key=lambda x: x["volatility"] or 0, reverse=True)
+
+
+class TickerCore:
+    """Fetch tickers and turn them into sorted table rows."""
+
+    def __init__(self, exchange, metrics=None, history=None, fx=None, instruments=None, limiter=None, books=None):
+        self.exchange = exchange
+        self.limiter = limiter  # RateLimiter that batches and accounts the requests
+        self.books = books  # BookManager of the order-book mode, None while it is off
+        self.metrics = metrics or MetricsEngine()
+        self.history = history
+        self.fx = fx or FxService()
+        self.instruments = instruments or Instruments()
+        self._selected = set()
+
+    def select(self, symbols):
+        """Note the current selection; symbols that left it start their rolling metrics afresh."""
+        symbols = set(symbols)
+        for symbol in self._selected - symbols:
+            self.metrics.forget(symbol)
+        self._selected = symbols
+
+    def feed_symbols(self, symbols):
+        """Symbols a streaming feed has to subscribe to, including the FX pair."""
+        pair = self.fx.pair()
+        return list(symbols) + ([pair] if pair and pair not in self.fx.unavailable else [])
+
+    def build_rows(self, all_tickers, symbols):
+        """Build the sorted rows; rows converted with an outdated rate are marked stale."""
+        instruments = self.instruments
+        rate, stale = self.fx.rate()
+        with instruments.stage("metrics"):
+            rows = self.metrics.update(all_tickers, symbols, rate or 0)
+        if stale:
+            instruments.count("fx_stale")
+            for row in rows:
+                row["stale"] = True
+        books = self.books
+        if books is not None:
+            with instruments.stage("depth"):
+                self.add_depth(rows, books, rate or 0)
+        with instruments.stage("sort"):
+            return sort_rows(rows)
+
+    def fetch_rows(self, symbols):
+        """Fetch the tickers (plus the FX pair when its rate is due) and return the sorted rows."""
+        instruments = self.instruments
+        with instruments.tick():
+            request = self.fx.request_symbols(symbols, getattr(self.exchange, "markets", None))
+            try:
+                all_tickers = self._fetch_tickers(request)
+            except Exception as e:
+                if len(request) == len(symbols) or "BadSymbol" not in error_names(e):
+                    raise
+                # The exchange does not list the FX pair: remember that and retry without it
+                self.fx.unavailable.add(request[-1])
+                all_tickers = self._fetch_tickers(list(symbols))
+            self.fx.update_from_tickers(all_tickers)
+            books = self.books
+            if books is not None and not books.streamed:
+                # Streamed books are current already, only snapshot-fed ones are polled
+                self._poll_books(books, symbols)
+            if self.history is not None:
+                with instruments.stage("history"):
+                    self.history.append_tickers(all_tickers)
+            return self.build_rows(all_tickers, symbols)
+
+    def _fetch_tickers(self, symbols):
+        instruments = self.instruments
+        try:
+            with instruments.stage("fetch_tickers"):
+                exchange = self.exchange
+                if self.limiter is None:
+                    instruments.count("requests.fetch_tickers")
+                    return exchange.fetch_tickers(symbols)
+                # The limiter counts the requests, one per batch
+                if isinstance(exchange, RecordingExchange):
+                    # One record per tick however the limiter batches it, a replay runs without limiter
+                    return exchange.record_merged("fetch_tickers", (symbols,),
+                                                  lambda: self.limiter.fetch_tickers(exchange, symbols, instruments))
+                return self.limiter.fetch_tickers(exchange, symbols, instruments)
+        except Exception as e:
+            instruments.error("fetch_tickers", e)
+            raise
+
+    def _poll_books(self, books, symbols):
+        instruments = self.instruments
+        try:
+            with instruments.stage("fetch_order_book"):
+                instruments.count("requests.fetch_order_book", len(symbols))
+                books.poll(symbols)
+        except Exception as e:
+            # The ticker columns are still worth showing without the depth
+            instruments.error("fetch_order_book", e)
+
+    @staticmethod
+    def add_depth(rows, books, rate):
+        """Fill the depth columns from the local order books, converted with ``rate``."""
+        for row in rows:
+            metrics = books.metrics(row["symbol"])
+            for key in depth_keys:
+                row[key] = None
+            if metrics is None:
+                continue
+            for key, value in metrics.items():
+                row[key] = value if key == "spread" else value * rate
+
+    def rows_from_tickers(self, all_tickers, symbols):
+        """Build the rows from a ticker state that contains the FX pair, e.g. a feed snapshot."""
+        with self.instruments.tick():
+            self.fx.update_from_tickers(all_tickers)
+            return self.build_rows(all_tickers, symbols)
@@ -0,0 +1,265 @@
+"""Push-based ticker feeds.
+
+A feed keeps one long-lived connection open and merges incoming tickers into
+an in-memory state. ``CcxtProFeed`` streams from an exchange through ccxt.pro,
+``FakeFeed`` is driven by hand (or from recorded batches) and can stand in for
+the exchange in tests or a local replay. ``BinanceDepthFeed`` streams the
+depth diffs of the order-book mode into the local books.
+"""
+
+import asyncio
+import json
+import threading
+
+
+class TickerFeed:
+    """In-memory ticker state plus subscription handling shared by all feeds."""
+
+    def __init__(self):
+        self.updated = threading.Event()  # Set whenever new tickers arrive
+        self.error = None
+        self._lock = threading.Lock()
+        self._tickers = {}
+        self._symbols = frozenset()
+        self._listeners = []
+
+    @property
+    def symbols(self):
+        return self._symbols
+
+    def subscribe(self, symbols):
+        """Replace the subscribed symbol set; the feed resubscribes by itself."""
+        symbols = frozenset(symbols)
+        with self._lock:
+            if symbols == self._symbols:
+                return
+            self._symbols = symbols
+            self._tickers = {s: t for s, t in self._tickers.items() if s in symbols}
+        self._on_subscription_changed()
+
+    def add_listener(self, callback):
+        """Call ``callback(changed_tickers)`` from the feed thread on every update."""
+        self._listeners.append(callback)
+
+    def snapshot(self):
+        """Return a copy of the current ``{symbol: ticker}`` state."""
+        with self._lock:
+            return dict(self._tickers)
+
+    def publish(self, tickers):
+        """Merge a batch of ``{symbol: ticker}`` updates into the state."""
+        with self._lock:
+            changed = {s: t for s, t in tickers.items() if s in self._symbols}
+            self._tickers.update(changed)
+        if changed:
+            self.updated.set()
+            for callback in self._listeners:
+                callback(changed)
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def _on_subscription_changed(self):
+        pass
+
+
+class CcxtProFeed(TickerFeed):
+    """Stream tickers over a single websocket connection using ccxt.pro."""
+
+    def __init__(self, exchange_id="binance", reconnect_delay=2.0):
+        super().__init__()
+        self.exchange_id = exchange_id
+        self.reconnect_delay = reconnect_delay
+        self._thread = None
+        self._stop = threading.Event()
+        self._loop = None
+        self._changed = None  # asyncio.Event, lives inside the feed loop
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._main()), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake()
+
+    def _on_subscription_changed(self):
+        self._wake()
+
+    def _wake(self):
+        loop, changed = self._loop, self._changed
+        if loop is None or changed is None:
+            return
+        try:
+            loop.call_soon_threadsafe(changed.set)
+        except RuntimeError:
+            pass  # Loop already closed
+
+    async def _wait_changed(self, timeout):
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _main(self):
+        import ccxt.pro as ccxtpro
+
+        self._changed = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        exchange = getattr(ccxtpro, self.exchange_id)()
+        try:
+            while not self._stop.is_set():
+                self._changed.clear()
+                symbols = sorted(self._symbols)
+                if not symbols:
+                    await self._wait_changed(None)
+                    continue
+
+                watch = asyncio.ensure_future(exchange.watch_tickers(symbols))
+                changed = asyncio.ensure_future(self._changed.wait())
+                done, _ = await asyncio.wait({watch, changed}, return_when=asyncio.FIRST_COMPLETED)
+                changed.cancel()
+                if watch not in done:
+                    # Selection changed or stop requested: drop the pending watch and resubscribe
+                    watch.cancel()
+                    continue
+
+                try:
+                    tickers = watch.result()
+                except Exception as e:
+                    self.error = e
+                    await self._wait_changed(self.reconnect_delay)
+                    continue
+                self.error = None
+                self.publish(tickers)
+        finally:
+            self._loop = None
+            await exchange.close()
+
+
+class BinanceDepthFeed(CcxtProFeed):
+    """Stream Binance's raw depth diffs of the subscribed symbols into a ``BookManager``.
+
+    One combined-stream websocket carries the diffs of all subscribed symbols
+    (``<symbol>@depth@100ms``); a changed subscription reconnects with the new
+    stream list. Every diff goes to ``manager.on_diff``, which checks the
+    update sequence. A book that needs a snapshot (new symbol, gap, reconnect)
+    gets it from ``manager.sync_pending`` on a worker thread while the stream
+    keeps being read into its buffer. aiohttp comes with ccxt.pro.
+    """
+
+    STREAM_URL = "wss://stream.binance.com:9443/stream?streams="
+
+    def __init__(self, manager, speed="100ms", reconnect_delay=2.0):
+        super().__init__("binance", reconnect_delay)
+        self.manager = manager
+        self.speed = speed
+        self._syncing = None  # Future of the running sync_pending
+
+    def streams(self, symbols):
+        """Stream name -> symbol, e.g. ``btcusdt@depth@100ms`` -> ``BTC/USDT``."""
+        return {f"{symbol.replace('/', '').lower()}@depth@{self.speed}": symbol for symbol in symbols}
+
+    def on_message(self, streams, text):
+        """Apply one combined-stream message; return False if a book needs a snapshot."""
+        message = json.loads(text)
+        symbol = streams.get(message.get("stream"))
+        if symbol is None:
+            return True
+        return self.manager.on_diff(symbol, message["data"])
+
+    def _sync(self):
+        if self._syncing is None or self._syncing.done():
+            self._syncing = self._loop.run_in_executor(None, self._sync_pending)
+
+    def _sync_pending(self):
+        try:
+            self.manager.sync_pending()
+        except Exception as e:
+            # Retried with the next diff of the book
+            self.error = e
+
+    async def _close_on_change(self, ws):
+        await self._changed.wait()
+        await ws.close()
+
+    async def _read(self, session, streams):
+        import aiohttp
+
+        async with session.ws_connect(self.STREAM_URL + "/".join(streams)) as ws:
+            closer = asyncio.ensure_future(self._close_on_change(ws))
+            try:
+                async for message in ws:
+                    if message.type == aiohttp.WSMsgType.ERROR:
+                        raise ws.exception()
+                    if message.type != aiohttp.WSMsgType.TEXT:
+                        continue
+                    self.error = None
+                    if not self.on_message(streams, message.data):
+                        self._sync()
+            finally:
+                closer.cancel()
+
+    async def _main(self):
+        import aiohttp
+
+        self._changed = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        try:
+            async with aiohttp.ClientSession() as session:
+                while not self._stop.is_set():
+                    self._changed.clear()
+                    streams = self.streams(sorted(self._symbols))
+                    if not streams:
+                        await self._wait_changed(None)
+                        continue
+                    try:
+                        await self._read(session, streams)
+                    except Exception as e:
+                        self.error = e
+                    if not self._changed.is_set():
+                        # Dropped by the exchange: reconnect after a pause, the gap resyncs the books
+                        await self._wait_changed(self.reconnect_delay)
+        finally:
+            self._loop = None
+
+
+class FakeFeed(TickerFeed):
+    """Feed driven by ``push`` or by replaying recorded ``{symbol: ticker}`` batches."""
+
+    def __init__(self, batches=(), delay=0.0):
+        super().__init__()
+        self.batches = list(batches)
+        self.delay = delay
+        self.subscriptions = []  # History of subscribed symbol sets
+        self._thread = None
+        self._stop = threading.Event()
+
+    def push(self, tickers):
+        self.publish(tickers)
+
+    def start(self):
+        if not self.batches or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+
+        def run():
+            for batch in self.batches:
+                if self._stop.wait(self.delay):
+                    return
+                self.publish(batch)
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _on_subscription_changed(self):
+        self.subscriptions.append(self._symbols)
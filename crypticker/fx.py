@@ -0,0 +1,89 @@
+"""Cached conversion of USDT prices into the chosen display currency."""
+
+import threading
+import time
+
+# Display currency -> (ccxt symbol, inverted). Inverted pairs quote the
+# currency in USDT (e.g. EUR/USDT = USDT per EUR), so the rate is 1 / last.
+FX_PAIRS = {
+    "USDT": None,
+    "EUR": ("EUR/USDT", True),
+    "USD": ("USDC/USDT", True),  # USD via USDC
+    "CHF": ("USDT/CHF", False),
+    "BTC": ("BTC/USDT", True),
+}
+
+
+class FxService:
+    """Keep USDT -> display currency rates with a TTL.
+
+    The rate pair is not fetched on its own: ``request_symbols`` adds it to
+    the regular ``fetch_tickers`` batch once the cached rate is older than
+    ``ttl``. A rate older than ``max_age`` (or none at all) is reported as
+    stale instead of silently falling back to a factor of 1.
+    """
+
+    def __init__(self, currency="EUR", ttl=60.0, max_age=300.0, pairs=None, clock=time.monotonic):
+        self.pairs = pairs or FX_PAIRS
+        if currency not in self.pairs:
+            raise ValueError(f"unknown currency: {currency}")
+        self.currency = currency
+        self.ttl = ttl
+        self.max_age = max_age
+        self.clock = clock
+        self.unavailable = set()  # Pairs the exchange does not list
+        self._rates = {}  # currency -> (rate, fetched_at)
+        self._lock = threading.Lock()
+
+    @property
+    def currencies(self):
+        return list(self.pairs)
+
+    def set_currency(self, currency):
+        if currency not in self.pairs:
+            raise ValueError(f"unknown currency: {currency}")
+        self.currency = currency
+
+    def pair(self):
+        pair = self.pairs[self.currency]
+        return pair[0] if pair else None
+
+    def request_symbols(self, symbols, markets=None):
+        """Return ``symbols`` plus the rate pair if the cached rate is due for a refresh."""
+        pair = self.pair()
+        if pair is None or pair in self.unavailable:
+            return list(symbols)
+        if markets and pair not in markets:
+            self.unavailable.add(pair)
+            return list(symbols)
+        with self._lock:
+            cached = self._rates.get(self.currency)
+        if cached is not None and self.clock() - cached[1] < self.ttl:
+            return list(symbols)
+        return list(symbols) + [pair]
+
+    def update_from_tickers(self, tickers):
+        """Take the rate pair out of a ticker batch, if it is in there."""
+        for currency, pair in self.pairs.items():
+            if pair is None:
+                continue
+            ticker = tickers.get(pair[0])
+            last = ticker.get("last") if ticker else None
+            if last:
+                with self._lock:
+                    self._rates[currency] = (1 / last if pair[1] else last, self.clock())
+
+    def set_rate(self, currency, rate):
+        """Take over a rate obtained elsewhere, e.g. from the instance serving the snapshots."""
+        with self._lock:
+            self._rates[currency] = (rate, self.clock())
+
+    def rate(self):
+        """Return ``(rate, stale)``; ``rate`` is None if no rate is known yet."""
+        if self.pairs[self.currency] is None:
+            return 1.0, False
+        with self._lock:
+            cached = self._rates.get(self.currency)
+        if cached is None:
+            return None, True
+        return cached[0], self.clock() - cached[1] > self.max_age
@@ -0,0 +1,282 @@
+"""Headless ticker: the sorted table on stdout, as JSON Lines or in a curses view.
+
+    python3 -m crypticker.headless --symbols BTC/USDT,ETH/USDT --interval 5
+    python3 -m crypticker.headless --format jsonl --ticks 10 > ticks.jsonl
+    python3 -m crypticker.headless --format curses --stream
+    python3 -m crypticker.headless --record session.jsonl.gz
+    python3 -m crypticker.headless --replay session.jsonl.gz --speed 0 --format jsonl
+    python3 -m crypticker.headless --depth --symbols BTC/USDT
+    python3 -m crypticker.headless --serve 8765 --format jsonl > /dev/null
+    python3 -m crypticker.headless --connect http://127.0.0.1:8765
+
+Only the fetch/compute core is imported on this path; tkinter, PIL and the
+logo are never loaded.
+"""
+
+import argparse
+import json
+import queue
+import sys
+import time
+
+from crypticker.alerts import AlertEngine, format_alert
+from crypticker.core import (DEFAULT_SYMBOLS, TickerCore, create_exchange, depth_headers, depth_keys, display_headers,
+                             rolling_keys, row_keys)
+from crypticker.fx import FX_PAIRS, FxService
+from crypticker.metrics import MetricsEngine
+from crypticker.orderbook import BookManager
+from crypticker.ratelimit import RateLimiter
+from crypticker.replay import RecordingExchange, ReplayExchange, ReplayFinished
+from crypticker.scheduler import UpdateScheduler
+from crypticker.view import format_value
+
+SERVE_DEFAULT_PORT = 8765  # --serve without a port, same as crypticker.share.DEFAULT_PORT
+
+
+def table_columns(currency, rolling=False, depth=False):
+    """Return the ``(keys, headers)`` of the shown columns.
+
+    The rolling metrics only show with ``rolling``, the depth columns with ``depth``.
+    """
+    columns = [(key, header) for key, header in zip(row_keys, display_headers(currency))
+               if rolling or key not in rolling_keys]
+    if depth:
+        columns += zip(depth_keys, display_headers(currency, depth_headers))
+    keys, headers = zip(*columns)
+    return list(keys), list(headers)
+
+
+def format_table(rows, columns):
+    """Render rows as aligned text lines, header first; stale rates are marked with ``*``.
+
+    ``columns`` is the ``(keys, headers)`` pair from ``table_columns``.
+    """
+    keys, headers = columns
+    cells = [[str(row[keys[0]]) + (" *" if row.get("stale") else "")]
+             + [format_value(row.get(key)) for key in keys[1:]] for row in rows]
+    widths = [max([len(header)] + [len(line[i]) for line in cells]) for i, header in enumerate(headers)]
+    lines = ["  ".join(header.ljust(width) for header, width in zip(headers, widths))]
+    for line in cells:
+        lines.append("  ".join(cell.rjust(width) if i else cell.ljust(width) for i, (cell, width) in enumerate(zip(line, widths))))
+    return lines
+
+
+def write_table(out, rows, timestamp, columns):
+    if out.isatty():
+        out.write("\x1b[H\x1b[2J")  # Redraw in place on a terminal
+    out.write(time.strftime("%H:%M:%S", time.localtime(timestamp)) + "\n")
+    out.write("\n".join(format_table(rows, columns)) + "\n")
+    if any(row.get("stale") for row in rows):
+        out.write("* Umrechnungskurs veraltet oder nicht verfügbar\n")
+    out.write("\n")
+    out.flush()
+
+
+def write_jsonl(out, rows, timestamp, columns=None):
+    out.write(json.dumps({"ts": round(timestamp, 3), "rows": rows}, separators=(",", ":")) + "\n")
+    out.flush()
+
+
+def next_rows(results, timeout=None):
+    """Wait for rows and skip any older results that piled up in the meantime."""
+    rows = results.get(timeout=timeout)
+    while True:
+        try:
+            rows = results.get_nowait()
+        except queue.Empty:
+            return rows
+
+
+def run_curses(results, args, columns):
+    import curses
+
+    def loop(stdscr):
+        curses.curs_set(0)
+        stdscr.nodelay(True)
+        ticks = 0
+        while not args.ticks or ticks < args.ticks:
+            if stdscr.getch() in (ord("q"), 27):
+                return
+            try:
+                rows = next_rows(results, timeout=0.1)
+            except queue.Empty:
+                continue
+            if rows is None:
+                return
+            ticks += 1
+            height, width = stdscr.getmaxyx()
+            stdscr.erase()
+            stdscr.addnstr(0, 0, f"{time.strftime('%H:%M:%S')}  ({len(rows)} Symbole, q = Beenden)", width - 1)
+            for y, line in enumerate(format_table(rows, columns)[:height - 2], start=1):
+                stdscr.addnstr(y, 0, line, width - 1, curses.A_BOLD if y == 1 else 0)
+            stdscr.refresh()
+
+    curses.wrapper(loop)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m crypticker.headless", description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", default=",".join(DEFAULT_SYMBOLS), help="Kommagetrennte Handelspaare")
+    parser.add_argument("--exchange", default="binance")
+    parser.add_argument("--currency", choices=list(FX_PAIRS), default="EUR", help="Anzeigewährung")
+    parser.add_argument("--interval", type=float, default=5.0, help="Intervall in Sekunden (Polling)")
+    parser.add_argument("--format", choices=("table", "jsonl", "curses"), default="table")
+    parser.add_argument("--ticks", type=int, default=0, help="Nach N Ticks beenden (0 = endlos)")
+    parser.add_argument("--stream", action="store_true", help="WebSocket-Feed statt Polling")
+    parser.add_argument("--depth", action="store_true", help="Orderbuch-Spalten (Spread, Mid, Tiefe) anzeigen")
+    parser.add_argument("--rolling", action="store_true", help="Rolling-Metriken (Realisierte Vol., EMA, Z-Score) anzeigen")
+    parser.add_argument("--book-limit", type=int, default=500, help="Preisstufen je Orderbuch-Snapshot")
+    parser.add_argument("--serve", metavar="PORT", type=int, nargs="?", const=SERVE_DEFAULT_PORT,
+                        help=f"Snapshots für andere Instanzen lokal bereitstellen (Standard-Port {SERVE_DEFAULT_PORT})")
+    parser.add_argument("--connect", metavar="URL", help="Snapshots einer anderen Instanz statt der Börse verwenden")
+    parser.add_argument("--alerts", metavar="DATEI", help="Alarmregeln aus DATEI prüfen, Treffer auf stderr")
+    parser.add_argument("--record", metavar="DATEI", help="Antworten der Börse in DATEI aufzeichnen")
+    parser.add_argument("--replay", metavar="DATEI", help="Aufzeichnung statt der Börse abspielen")
+    parser.add_argument("--speed", type=float, default=1.0, help="Abspielgeschwindigkeit (0 = so schnell wie möglich)")
+    args = parser.parse_args(argv)
+    if args.depth and not args.replay and args.exchange != "binance":
+        parser.error("--depth folgt dem Depth-Stream von Binance und geht nur mit --exchange binance")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    symbols = [symbol.strip() for symbol in args.symbols.split(",") if symbol.strip()]
+    results = queue.Queue()
+    feed = book_feed = scheduler = server = client = None
+    columns = table_columns(args.currency, args.rolling, args.depth)
+    metrics = MetricsEngine(rolling=args.rolling)
+    fx = FxService(args.currency)
+
+    def on_error(e):
+        if isinstance(e, ReplayFinished):
+            results.put(None)
+            return
+        print(f"Fehler beim Abrufen der Daten: {e}", file=sys.stderr)
+
+    alerts = None
+    if args.alerts:
+        alerts = AlertEngine(args.alerts)
+        alerts.load(args.currency)
+        alerts.add_sink(lambda alert: print(f"ALARM {format_alert(alert)}", file=sys.stderr))
+
+    def publish(rows, currency=None):
+        if alerts is not None:
+            alerts.evaluate(rows, currency or fx.currency)
+        results.put(rows)
+        if server is not None:
+            server.publish(rows, fx.currency, fx.rate()[0])
+
+    def on_wanted():
+        # Symbols asked for by clients join the one fetch
+        wanted = list(dict.fromkeys(symbols + server.wanted()))
+        if scheduler is not None:
+            core.select(wanted)
+            scheduler.set_symbols(wanted)
+        elif feed is not None:
+            core.select(wanted)
+            feed.subscribe(core.feed_symbols(wanted))
+        if book_feed is not None:
+            core.books.watch(wanted)
+            book_feed.subscribe(wanted)
+
+    def attach_books(core):
+        """Live books follow the depth diffs; a replay refreshes them from its recorded snapshots."""
+        nonlocal book_feed
+        if args.replay:
+            core.books = BookManager(core.exchange.fetch_order_book, limit=args.book_limit)
+            return
+        from crypticker.feed import BinanceDepthFeed
+
+        # The snapshots come over REST, also when the tickers are streamed
+        exchange = core.exchange or create_exchange(args.exchange)
+        core.books = BookManager(exchange.fetch_order_book, limit=args.book_limit, streamed=True)
+        core.books.watch(symbols)
+        book_feed = BinanceDepthFeed(core.books)
+        book_feed.subscribe(symbols)
+        book_feed.start()
+
+    if args.serve is not None:
+        # Imported on use, it pulls in http.server, urllib.request and the email package
+        from crypticker.share import SnapshotServer
+
+        server = SnapshotServer(port=args.serve, on_wanted=on_wanted)
+        server.start()
+        print(f"Snapshots unter {server.url}", file=sys.stderr)
+
+    if args.connect:
+        from crypticker.share import SnapshotClient
+
+        core = TickerCore(None, metrics, fx=fx)
+
+        warned = set()
+
+        def on_rows(rows):
+            if client.currency and client.currency != args.currency and client.currency not in warned:
+                warned.add(client.currency)
+                print(f"Hinweis: {args.connect} liefert Werte in {client.currency}", file=sys.stderr)
+            publish(rows, client.currency)
+
+        client = SnapshotClient(args.connect, on_rows, on_error=on_error)
+        client.set_symbols(symbols)
+        client.start()
+    elif args.stream and not args.replay:
+        from crypticker.feed import CcxtProFeed
+
+        core = TickerCore(None, metrics, fx=fx)
+        if args.depth:
+            attach_books(core)
+        feed = CcxtProFeed(args.exchange)
+        feed.add_listener(lambda changed: publish(core.rows_from_tickers(feed.snapshot(), symbols)))
+        feed.subscribe(core.feed_symbols(symbols))
+        feed.start()
+    else:
+        interval = args.interval
+        if args.replay:
+            # The replay paces itself by the recorded timestamps
+            exchange = ReplayExchange(args.replay, speed=args.speed)
+            interval = 0.001
+        else:
+            exchange = create_exchange(args.exchange)
+        if args.record:
+            exchange = RecordingExchange(exchange, args.record)
+        # A capture has no rate limit to respect
+        limiter = None if args.replay else RateLimiter.for_exchange(exchange)
+        core = TickerCore(exchange, metrics, fx=fx, limiter=limiter)
+        if args.depth:
+            attach_books(core)
+        scheduler = UpdateScheduler(core.fetch_rows, publish, on_error=on_error, interval=interval, limiter=limiter)
+        scheduler.set_symbols(symbols)
+        scheduler.start()
+
+    try:
+        if args.format == "curses":
+            run_curses(results, args, columns)
+        else:
+            write = write_jsonl if args.format == "jsonl" else write_table
+            ticks = 0
+            while not args.ticks or ticks < args.ticks:
+                rows = next_rows(results)
+                if rows is None:
+                    break
+                write(sys.stdout, rows, time.time(), columns)
+                ticks += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if scheduler is not None:
+            scheduler.stop()
+        if client is not None:
+            client.stop()
+        if server is not None:
+            server.stop()
+        if feed is not None:
+            feed.stop()
+        if book_feed is not None:
+            book_feed.stop()
+        if isinstance(core.exchange, RecordingExchange):
+            core.exchange.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Per-symbol tick history in compact columnar ring buffers, mirrored to disk.
+
+In memory every symbol has one fixed-size ``array('d')`` per field. On disk
+ticks are appended in chunks to one file per symbol, field and UTC day
+(``<dir>/<day>/<BASE-QUOTE>/<field>.f64``). Reading a day maps the files
+into memory, so loading is a handful of ``mmap`` calls and only the pages
+that are actually touched cost memory.
+"""
+
+import datetime
+import mmap
+import os
+import shutil
+import threading
+import time
+from array import array
+
+FIELDS = ("timestamp", "last", "bid", "ask", "volume")
+ITEM_SIZE = array("d").itemsize
+
+
+def day_of(timestamp):
+    return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).strftime("%Y-%m-%d")
+
+
+def symbol_dir(symbol):
+    return symbol.replace("/", "-").replace(":", "_")
+
+
+class RingBuffer:
+    """Fixed-capacity columnar buffer holding the newest ``capacity`` ticks."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.columns = {field: array("d", bytes(capacity * ITEM_SIZE)) for field in FIELDS}
+        self._next = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, values):
+        i = self._next
+        for field, value in zip(FIELDS, values):
+            self.columns[field][i] = value
+        self._next = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def load(self, columns):
+        """Replace the content with the tails of ``columns`` (field -> sequence of floats)."""
+        size = min(self.capacity, min(len(columns[field]) for field in FIELDS))
+        for field in FIELDS:
+            tail = columns[field][len(columns[field]) - size:]
+            self.columns[field][:size] = array("d", tail.tobytes() if isinstance(tail, memoryview) else tail)
+        self._size = size
+        self._next = size % self.capacity
+
+    def latest(self, field):
+        if not self._size:
+            return None
+        return self.columns[field][self._next - 1]
+
+    def series(self, field):
+        """Return the buffered values of ``field``, oldest first, as a new array."""
+        column = self.columns[field]
+        if self._size < self.capacity:
+            return column[:self._size]
+        return column[self._next:] + column[:self._next]
+
+
+class DayHistory:
+    """Memory-mapped, read-only columns of one symbol for one day."""
+
+    def __init__(self, directory):
+        self._maps = []
+        self.columns = {}
+        lengths = []
+        for field in FIELDS:
+            path = os.path.join(directory, f"{field}.f64")
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            size -= size % ITEM_SIZE
+            if size:
+                with open(path, "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps.append(mapped)
+                self.columns[field] = memoryview(mapped)[:size].cast("d")
+            else:
+                self.columns[field] = memoryview(array("d"))
+            lengths.append(len(self.columns[field]))
+        # A crash between two column writes leaves ragged files: cut to the shortest
+        self.length = min(lengths)
+        for field in FIELDS:
+            self.columns[field] = self.columns[field][:self.length]
+
+    def __len__(self):
+        return self.length
+
+    def close(self):
+        for view in self.columns.values():
+            view.release()
+        for mapped in self._maps:
+            mapped.close()
+        self._maps = []
+
+
+class HistoryStore:
+    """Tick history for all symbols, with optional chunked persistence."""
+
+    def __init__(self, directory="history", capacity=3600, flush_interval=5.0, retention_days=7, persist=True):
+        self.directory = directory
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self.persist = persist
+        self._buffers = {}
+        self._pending = {}  # (day, symbol) -> {field: array}
+        self._last_timestamp = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # Keeps concurrent flushes from interleaving the columns
+
+    def symbols(self):
+        return list(self._buffers)
+
+    def buffer(self, symbol):
+        return self._buffers.get(symbol)
+
+    def append(self, symbol, timestamp, last, bid=None, ask=None, volume=None):
+        """Record one tick; a repeated timestamp for a symbol is ignored."""
+        values = (timestamp, last, bid or 0.0, ask or 0.0, volume or 0.0)
+        with self._lock:
+            if self._last_timestamp.get(symbol) == timestamp:
+                return False
+            self._last_timestamp[symbol] = timestamp
+            buffer = self._buffers.get(symbol)
+            if buffer is None:
+                buffer = self._buffers[symbol] = RingBuffer(self.capacity)
+            buffer.append(values)
+            if self.persist:
+                pending = self._pending.get((day_of(timestamp), symbol))
+                if pending is None:
+                    pending = self._pending[(day_of(timestamp), symbol)] = {field: array("d") for field in FIELDS}
+                for field, value in zip(FIELDS, values):
+                    pending[field].append(value)
+        if self.persist and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+        return True
+
+    def append_tickers(self, tickers, now=None):
+        """Record a ``{symbol: ticker}`` batch as returned by ``fetch_tickers``."""
+        now = time.time() if now is None else now
+        for symbol, ticker in tickers.items():
+            if not ticker or ticker.get("last") is None:
+                continue
+            timestamp = ticker["timestamp"] / 1000 if ticker.get("timestamp") else now
+            self.append(symbol, timestamp, ticker["last"], ticker.get("bid"), ticker.get("ask"),
+                        ticker.get("baseVolume"))
+
+    def series(self, symbol, field):
+        with self._lock:
+            buffer = self._buffers.get(symbol)
+            return buffer.series(field) if buffer else array("d")
+
+    def flush(self):
+        """Append the pending ticks to their day files.
+
+        Scheduler and feed threads may both flush; one flush at a time takes
+        the pending ticks and writes all their columns, so the files of a
+        symbol stay aligned.
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._last_flush = time.monotonic()
+            for (day, symbol), columns in pending.items():
+                directory = os.path.join(self.directory, day, symbol_dir(symbol))
+                os.makedirs(directory, exist_ok=True)
+                for field in FIELDS:
+                    with open(os.path.join(directory, f"{field}.f64"), "ab") as f:
+                        columns[field].tofile(f)
+
+    def load_day(self, symbol, day=None):
+        """Map one day of ``symbol`` from disk (default: today, UTC)."""
+        return DayHistory(os.path.join(self.directory, day or day_of(time.time()), symbol_dir(symbol)))
+
+    def restore(self, day=None):
+        """Refill the ring buffers with the newest ticks stored for ``day``."""
+        day_dir = os.path.join(self.directory, day or day_of(time.time()))
+        if not os.path.isdir(day_dir):
+            return
+        for name in os.listdir(day_dir):
+            history = DayHistory(os.path.join(day_dir, name))
+            symbol = name.replace("_", ":").replace("-", "/", 1)
+            buffer = RingBuffer(self.capacity)
+            buffer.load(history.columns)
+            with self._lock:
+                self._buffers.setdefault(symbol, buffer)
+                if len(history):
+                    self._last_timestamp.setdefault(symbol, history.columns["timestamp"][-1])
+            history.close()
+
+    def prune(self, now=None):
+        """Delete day directories older than ``retention_days``."""
+        if not os.path.isdir(self.directory):
+            return
+        cutoff = day_of((time.time() if now is None else now) - self.retention_days * 86400)
+        for day in os.listdir(self.directory):
+            if len(day) == 10 and day < cutoff:
+                shutil.rmtree(os.path.join(self.directory, day), ignore_errors=True)
+
+    def close(self):
+        if self.persist:
+            self.flush()
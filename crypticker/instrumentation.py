@@ -0,0 +1,194 @@
+"""Lightweight instrumentation: per-stage timers, counters and latency histograms.
+
+Stages are timed with ``with instruments.stage("fetch_tickers"): ...`` and end
+up in a fixed-bucket histogram, so recording is O(log buckets) and memory
+stays constant. ``start_profile`` captures cProfile and tracemalloc data for
+the next N ticks.
+"""
+
+import bisect
+import collections
+import contextlib
+import cProfile
+import json
+import threading
+import time
+import tracemalloc
+
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+RATE_LIMIT_ERRORS = {"RateLimitExceeded", "DDoSProtection"}
+
+
+def error_names(exc):
+    """Class names of ``exc`` and its bases, to match ccxt errors without importing ccxt."""
+    return {cls.__name__ for cls in type(exc).__mro__}
+
+
+def is_rate_limit(exc):
+    """Tell whether ``exc`` is a rate-limit error (ccxt class name or an HTTP 429 status)."""
+    return bool(error_names(exc) & RATE_LIMIT_ERRORS) or getattr(exc, "status", None) == 429
+
+
+class Histogram:
+    """Latency histogram with fixed millisecond buckets."""
+
+    def __init__(self, bounds=BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def record(self, ms):
+        self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.last = ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, p):
+        """Upper bound of the bucket that contains the ``p``-th percentile."""
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        seen = 0
+        for bound, count in zip(self.bounds + (self.max,), self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        buckets = {f"<={bound}": count for bound, count in zip(self.bounds, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count if self.count else None,
+            "last_ms": self.last,
+            "max_ms": self.max,
+            "p50_ms": self.percentile(50),
+            "p99_ms": self.percentile(99),
+            "buckets": buckets,
+        }
+
+
+class ProfileCapture:
+    """cProfile and tracemalloc capture over the next ``ticks`` ticks."""
+
+    def __init__(self, ticks, prefix):
+        self.remaining = ticks
+        self.prefix = prefix
+        self.profile = cProfile.Profile()
+        self.files = []
+        self._started_tracemalloc = not tracemalloc.is_tracing()
+        if self._started_tracemalloc:
+            tracemalloc.start()
+
+    def finish(self):
+        self.profile.dump_stats(f"{self.prefix}.prof")
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        with open(f"{self.prefix}.mem.txt", "w") as f:
+            f.write(f"current={current} peak={peak}\n")
+            for stat in snapshot.statistics("lineno")[:30]:
+                f.write(f"{stat}\n")
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        self.files = [f"{self.prefix}.prof", f"{self.prefix}.mem.txt"]
+
+
+class Instruments:
+    """Thread-safe registry of stage timers, counters and errors."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.stages = {}
+        self.counters = collections.Counter()
+        self.errors = collections.Counter()
+        self.last_error = None
+        self.profile = None
+        self.last_profile_files = []
+        self._lock = threading.Lock()
+
+    def record(self, name, ms):
+        with self._lock:
+            histogram = self.stages.get(name)
+            if histogram is None:
+                histogram = self.stages[name] = Histogram()
+            histogram.record(ms)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    @contextlib.contextmanager
+    def tick(self):
+        """Time a whole tick; also drives a running profile capture."""
+        profile = self.profile
+        if profile is not None:
+            profile.profile.enable()
+        try:
+            with self.stage("tick"):
+                yield
+        finally:
+            if profile is not None:
+                profile.profile.disable()
+                profile.remaining -= 1
+                if profile.remaining <= 0:
+                    self.profile = None
+                    profile.finish()
+                    self.last_profile_files = profile.files
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def error(self, stage, exc):
+        with self._lock:
+            self.errors[f"{stage}: {type(exc).__name__}"] += 1
+            self.counters["errors"] += 1
+            if is_rate_limit(exc):
+                self.counters["rate_limited"] += 1
+            self.last_error = f"{stage}: {exc}"
+
+    def start_profile(self, ticks, prefix=None):
+        """Profile the next ``ticks`` ticks; results go to ``<prefix>.prof`` / ``.mem.txt``."""
+        self.profile = ProfileCapture(ticks, prefix or time.strftime("profile-%Y%m%d-%H%M%S"))
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "uptime_s": time.time() - self.started,
+                "stages": {name: histogram.to_dict() for name, histogram in self.stages.items()},
+                "counters": dict(self.counters),
+                "errors": dict(self.errors),
+                "last_error": self.last_error,
+            }
+
+    def dump(self, path, extra=None):
+        data = self.snapshot()
+        if extra:
+            data.update(extra)
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+        return path
+
+    def summary_lines(self):
+        """Short human-readable summary for a status panel."""
+        data = self.snapshot()
+        lines = []
+        for name, stats in sorted(data["stages"].items()):
+            lines.append(f"{name:<14} letzte {stats['last_ms']:7.1f} ms  p50 {stats['p50_ms']:7.1f}  "
+                         f"p99 {stats['p99_ms']:7.1f}  max {stats['max_ms']:7.1f}  n={stats['count']}")
+        counters = data["counters"]
+        if counters:
+            lines.append("  ".join(f"{name}={value}" for name, value in sorted(counters.items())))
+        if data["last_error"]:
+            lines.append(f"Letzter Fehler: {data['last_error'][:200]}")
+        return lines
@@ -0,0 +1,140 @@
+"""Persistent cache of exchange market metadata.
+
+The cache file holds the slimmed ``load_markets`` result together with the
+schema version, the exchange id and the fetch time. It is loaded instantly at
+startup and refreshed in a background thread once the TTL has expired. Writes
+go to a temp file that is renamed over the old one, so a crash never leaves a
+half-written cache behind.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+SCHEMA_VERSION = 1
+DEFAULT_TTL = 24 * 60 * 60
+
+
+def slim_market(market):
+    """Keep only the metadata the GUIs need from a ccxt market structure."""
+    return {
+        "base": market.get("base"),
+        "quote": market.get("quote"),
+        "active": market.get("active"),
+        "precision": market.get("precision") or {},
+    }
+
+
+def write_json_atomic(path, data):
+    """Write ``data`` as JSON to a temp file and rename it over ``path``."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix="." + os.path.basename(path) + "-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class MarketCache:
+    """Market metadata for one exchange, swapped atomically on refresh."""
+
+    def __init__(self, path, exchange_id="binance", quote="USDT", ttl=DEFAULT_TTL):
+        self.path = path
+        self.exchange_id = exchange_id
+        self.quote = quote
+        self.ttl = ttl
+        self.markets = {}
+        self.symbols = []  # Sorted active spot pairs in ``quote``, replaced as a whole
+        self.fetched_at = 0.0
+        self.generation = 0  # Bumped whenever a new market set is swapped in
+        self.error = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def _swap(self, markets, fetched_at):
+        symbols = sorted(
+            symbol for symbol, market in markets.items()
+            if market["quote"] == self.quote and symbol == f"{market['base']}/{market['quote']}"
+            and market["active"] is not False
+        )
+        with self._lock:
+            self.markets = markets
+            self.symbols = symbols
+            self.fetched_at = fetched_at
+            self.generation += 1
+
+    def is_stale(self):
+        return time.time() - self.fetched_at > self.ttl
+
+    def load(self):
+        """Load the cache file; return False if it is missing, corrupt or outdated."""
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            if not isinstance(data, dict) or data.get("version") != SCHEMA_VERSION \
+                    or data.get("exchange") != self.exchange_id:
+                return False
+            self._swap(data["markets"], float(data["fetched_at"]))
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"Fehler beim Laden des Cache: {e}")
+            return False
+
+    def save(self):
+        """Write the cache atomically (temp file + rename)."""
+        data = {
+            "version": SCHEMA_VERSION,
+            "exchange": self.exchange_id,
+            "fetched_at": self.fetched_at,
+            "markets": self.markets,
+        }
+        write_json_atomic(self.path, data)
+
+    def refresh(self, exchange):
+        """Fetch the markets from the exchange, swap them in and persist them."""
+        markets = exchange.load_markets(True)
+        self._swap({symbol: slim_market(market) for symbol, market in markets.items()}, time.time())
+        try:
+            self.save()
+        except Exception as e:
+            print(f"Fehler beim Speichern des Cache: {e}")
+
+    def refresh_async(self, exchange, on_done=None):
+        """Refresh in a background thread; ``on_done(error)`` runs in that thread."""
+        with self._lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+
+        def run():
+            error = None
+            try:
+                self.refresh(exchange)
+            except Exception as e:
+                error = e
+            finally:
+                self.error = error
+                with self._lock:
+                    self._refreshing = False
+            if on_done:
+                on_done(error)
+
+        threading.Thread(target=run, daemon=True).start()
+        return True
+
+    def refresh_if_stale(self, exchange, on_done=None):
+        if self.is_stale():
+            return self.refresh_async(exchange, on_done)
+        return False
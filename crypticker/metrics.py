@@ -0,0 +1,150 @@
+"""Batch metrics engine for the ticker table.
+
+``MetricsEngine.update`` turns a ``fetch_tickers`` result into table rows in
+one pass: currency conversion, % change and the high/low range, plus rolling
+realized volatility, EMA and z-score over the last ``window`` ticks. The
+rolling state of a symbol is one flat list with its running sums and the
+ring buffers of the window, updated in O(1) per new tick instead of being
+recomputed.
+
+The rolling columns are optional (``rolling``). Without them a tick costs
+about what the plain per-dict loop did; with them the state update roughly
+triples that, so they are only kept while they are shown.
+"""
+
+import math
+import threading
+
+
+class MetricsEngine:
+    """Incremental per-symbol metrics over a sliding window of ticks."""
+
+    def __init__(self, window=60, ema_span=20, rolling=True):
+        self.window = window
+        self.alpha = 2.0 / (ema_span + 1)
+        self.rolling = rolling
+        self._state = {}  # Symbol -> [timestamp, last, ema, count, pos, sums..., prices, returns]
+        self._lock = threading.Lock()
+
+    def set_rolling(self, enabled):
+        """Switch the rolling columns; switched back on, every window starts afresh."""
+        with self._lock:
+            if enabled and not self.rolling:
+                self._state.clear()
+            self.rolling = enabled
+
+    def _new_state(self):
+        window = self.window
+        return [0.0, 0.0, 0.0, 0, 0, 0.0, 0.0, 0.0, [0.0] * window, [0.0] * window]
+
+    def update(self, tickers, symbols, rate=1.0):
+        """Feed new tickers and return one row dict per symbol (unsorted).
+
+        ``rate`` converts the quote currency into the display currency; 0 blanks
+        out all price columns (e.g. while no conversion rate is known). Without
+        ``rolling`` the rows have no rolling keys.
+        """
+        with self._lock:
+            if not self.rolling:
+                return self._base_rows(tickers, symbols, rate)
+            return self._rolling_rows(tickers, symbols, rate)
+
+    @staticmethod
+    def _base_rows(tickers, symbols, rate):
+        rows = []
+        append = rows.append
+        for symbol in symbols:
+            ticker = tickers.get(symbol)
+            if not ticker:
+                continue
+            last = ticker.get("last")
+            if not last:
+                continue
+            # Percentages come from the raw prices, so they do not depend on the FX rate
+            high = ticker.get("high") or 0
+            low = ticker.get("low") or 0
+            open_price = ticker.get("open") or 0
+            append({
+                "symbol": symbol,
+                "price": last * rate,
+                "last": last,  # Quote currency price, e.g. for the portfolio
+                "volatility": (high - low) / low * 100 if high and low else None,
+                "percent_change": (last - open_price) / open_price * 100 if open_price else None,
+                "open_price": open_price * rate,
+                "vwap": (ticker.get("vwap") or 0) * rate,
+                "high": high * rate,
+                "low": low * rate,
+            })
+        return rows
+
+    def _rolling_rows(self, tickers, symbols, rate):
+        rows = []
+        append = rows.append
+        window = self.window
+        alpha = self.alpha
+        states = self._state
+        log, sqrt, fsum = math.log, math.sqrt, math.fsum
+
+        for symbol in symbols:
+            ticker = tickers.get(symbol)
+            if not ticker:
+                continue
+            last = ticker.get("last")
+            if not last:
+                continue
+            state = states.get(symbol)
+            if state is None:
+                state = states[symbol] = self._new_state()
+            ts, previous, ema, n, pos, sum_p, sumsq_p, sumsq_r, prices, returns = state
+
+            timestamp = ticker.get("timestamp") or 0
+            if not timestamp or timestamp != ts:
+                # New tick: O(1) update of the rolling window
+                ret = log(last / previous) if n else 0.0
+                if n >= window:
+                    old = prices[pos]
+                    old_ret = returns[pos]
+                    sum_p -= old
+                    sumsq_p -= old * old
+                    sumsq_r -= old_ret * old_ret
+                prices[pos] = last
+                returns[pos] = ret
+                sum_p += last
+                sumsq_p += last * last
+                sumsq_r += ret * ret
+                ema = ema + alpha * (last - ema) if n else last
+                n += 1
+                pos = (pos + 1) % window
+                if pos == 0 and n > window:
+                    # Once per window: recompute the sums to stop floating point drift
+                    sum_p = fsum(prices)
+                    sumsq_p = fsum(p * p for p in prices)
+                    sumsq_r = fsum(r * r for r in returns)
+                state[:8] = timestamp, last, ema, n, pos, sum_p, sumsq_p, sumsq_r
+
+            size = n if n < window else window
+            mean = sum_p / size
+            variance = sumsq_p / size - mean * mean
+            high = ticker.get("high") or 0
+            low = ticker.get("low") or 0
+            open_price = ticker.get("open") or 0
+            append({
+                "symbol": symbol,
+                "price": last * rate,
+                "last": last,
+                "volatility": (high - low) / low * 100 if high and low else None,
+                "percent_change": (last - open_price) / open_price * 100 if open_price else None,
+                "open_price": open_price * rate,
+                "vwap": (ticker.get("vwap") or 0) * rate,
+                "high": high * rate,
+                "low": low * rate,
+                "realized_vol": sqrt(sumsq_r) * 100 if size > 1 else None,
+                "ema": ema * rate,
+                "zscore": (last - mean) / sqrt(variance) if variance > 1e-18 * mean * mean else None,
+            })
+        return rows
+
+    def forget(self, symbol):
+        """Drop the rolling state of ``symbol``; it starts afresh on its next tick."""
+        with self._lock:
+            self._state.pop(symbol, None)
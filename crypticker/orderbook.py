@@ -0,0 +1,279 @@
+"""Local L2 order books with depth metrics for the order-book mode.
+
+A book starts from a REST snapshot and is kept current by incremental diffs
+following Binance's depth stream rules: diffs carry the first (``U``) and
+last (``u``) update id, anything older than the snapshot is dropped and a gap
+in the sequence triggers a resync from a fresh snapshot. Price levels live in
+sorted ``array('d')`` columns, so finding a level is a bisection and the
+depth within a band is a slice.
+
+Live books follow the exchange's raw diffs (``feed.BinanceDepthFeed`` ->
+``BookManager.on_diff``). ``ReplayDiffFeed`` plays recorded diffs the same
+way, e.g. to exercise the sequence handling offline; replays without diffs
+refresh the books from the recorded snapshots on every tick
+(``BookManager.poll``).
+"""
+
+import bisect
+import gzip
+import json
+import threading
+import time
+from array import array
+
+DEPTH_BANDS = (0.5, 1.0)  # Percent around the mid price
+
+
+class OutOfSync(Exception):
+    """A diff does not continue the book's update sequence."""
+
+
+class PriceLevels:
+    """Price levels of one side, ascending by price."""
+
+    def __init__(self):
+        self.prices = array("d")
+        self.sizes = array("d")
+
+    def __len__(self):
+        return len(self.prices)
+
+    def clear(self):
+        self.prices = array("d")
+        self.sizes = array("d")
+
+    def load(self, levels):
+        levels = sorted((float(price), float(size)) for price, size, *_ in levels if float(size))
+        self.prices = array("d", (price for price, _ in levels))
+        self.sizes = array("d", (size for _, size in levels))
+
+    def set(self, price, size):
+        """Set the size at ``price``; a size of 0 removes the level."""
+        prices = self.prices
+        i = bisect.bisect_left(prices, price)
+        if i < len(prices) and prices[i] == price:
+            if size:
+                self.sizes[i] = size
+            else:
+                del prices[i]
+                del self.sizes[i]
+        elif size:
+            prices.insert(i, price)
+            self.sizes.insert(i, size)
+
+    def notional(self, low, high):
+        """Quote-currency volume of the levels with ``low <= price <= high``."""
+        prices = self.prices
+        i = bisect.bisect_left(prices, low)
+        j = bisect.bisect_right(prices, high)
+        sizes = self.sizes
+        return sum(prices[k] * sizes[k] for k in range(i, j))
+
+
+class OrderBook:
+    """Bids and asks of one symbol plus the id of the last applied update."""
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.bids = PriceLevels()
+        self.asks = PriceLevels()
+        self.update_id = None  # None until a snapshot was loaded
+        self.diffs_applied = False
+
+    @property
+    def synced(self):
+        return self.update_id is not None
+
+    def reset(self):
+        self.bids.clear()
+        self.asks.clear()
+        self.update_id = None
+        self.diffs_applied = False
+
+    def apply_snapshot(self, snapshot):
+        """Load a ccxt (``nonce``) or raw Binance (``lastUpdateId``) snapshot."""
+        self.bids.load(snapshot["bids"])
+        self.asks.load(snapshot["asks"])
+        update_id = snapshot.get("nonce", snapshot.get("lastUpdateId"))
+        self.update_id = int(update_id) if update_id is not None else 0
+        self.diffs_applied = False
+
+    def apply_diff(self, diff):
+        """Apply a depth diff; return False if it is older than the book.
+
+        Raises ``OutOfSync`` if the diff leaves a gap after the current state.
+        """
+        first, last = diff["U"], diff["u"]
+        if last <= self.update_id:
+            return False
+        if self.diffs_applied:
+            if first != self.update_id + 1:
+                raise OutOfSync(f"{self.symbol}: erwartet {self.update_id + 1}, erhalten {first}")
+        elif not first <= self.update_id + 1 <= last:
+            raise OutOfSync(f"{self.symbol}: Snapshot {self.update_id} passt nicht zu {first}-{last}")
+        for price, size in diff["b"]:
+            self.bids.set(float(price), float(size))
+        for price, size in diff["a"]:
+            self.asks.set(float(price), float(size))
+        self.update_id = last
+        self.diffs_applied = True
+        return True
+
+    def metrics(self, bands=DEPTH_BANDS):
+        """Spread (%), mid price and bid/ask depth (quote currency) within each band."""
+        if not self.bids or not self.asks:
+            return None
+        best_bid = self.bids.prices[-1]
+        best_ask = self.asks.prices[0]
+        mid = (best_bid + best_ask) / 2
+        result = {"spread": (best_ask - best_bid) / mid * 100, "mid": mid}
+        for band in bands:
+            key = depth_key(band)
+            result[f"depth_bid_{key}"] = self.bids.notional(mid * (1 - band / 100), mid)
+            result[f"depth_ask_{key}"] = self.asks.notional(mid, mid * (1 + band / 100))
+        return result
+
+
+def depth_key(band):
+    """Row key suffix of a band: 0.5 -> "05", 1.0 -> "1"."""
+    return f"{band:g}".replace(".", "")
+
+
+class BookManager:
+    """Order books of the watched symbols, synced from snapshots and diffs.
+
+    ``fetch_snapshot(symbol, limit)`` is usually ``exchange.fetch_order_book``.
+    Diffs for a book without a snapshot are buffered; ``sync_pending`` fetches
+    the snapshots and replays the buffer. A sequence gap drops the book and
+    starts over. ``streamed`` books are kept current by a diff feed and are
+    not polled on every tick.
+    """
+
+    def __init__(self, fetch_snapshot, limit=500, bands=DEPTH_BANDS, streamed=False):
+        self.fetch_snapshot = fetch_snapshot
+        self.streamed = streamed
+        self.limit = limit
+        self.bands = bands
+        self.books = {}
+        self.resyncs = 0
+        self.diffs = 0
+        self._buffers = {}  # Symbol -> diffs waiting for a snapshot
+        self._lock = threading.Lock()
+
+    def watch(self, symbols):
+        """Track exactly ``symbols`` (books of other symbols are dropped)."""
+        with self._lock:
+            symbols = set(symbols)
+            for symbol in list(self.books):
+                if symbol not in symbols:
+                    del self.books[symbol]
+                    self._buffers.pop(symbol, None)
+            for symbol in symbols - self.books.keys():
+                self.books[symbol] = OrderBook(symbol)
+                self._buffers[symbol] = []
+
+    def poll(self, symbols):
+        """Snapshot mode: refresh the books of ``symbols`` from the REST endpoint."""
+        self.watch(symbols)
+        for symbol in symbols:
+            snapshot = self.fetch_snapshot(symbol, self.limit)
+            with self._lock:
+                book = self.books.get(symbol)
+                if book is not None:
+                    book.apply_snapshot(snapshot)
+
+    def on_diff(self, symbol, diff):
+        """Apply (or buffer) a diff of the depth stream; return False if the book needs a snapshot."""
+        with self._lock:
+            book = self.books.get(symbol)
+            if book is None:
+                return True
+            self.diffs += 1
+            if not book.synced:
+                self._buffers[symbol].append(diff)
+                return False
+            try:
+                book.apply_diff(diff)
+            except OutOfSync:
+                self._resync(book, diff)
+                return False
+            return True
+
+    def _resync(self, book, diff):
+        self.resyncs += 1
+        book.reset()
+        self._buffers[book.symbol] = [diff]
+
+    @property
+    def pending(self):
+        """Symbols waiting for a snapshot."""
+        with self._lock:
+            return [symbol for symbol, book in self.books.items() if not book.synced]
+
+    def sync_pending(self):
+        """Fetch snapshots for unsynced books and replay their buffered diffs."""
+        for symbol in self.pending:
+            snapshot = self.fetch_snapshot(symbol, self.limit)
+            with self._lock:
+                book = self.books.get(symbol)
+                if book is None or book.synced:
+                    continue
+                book.apply_snapshot(snapshot)
+                snapshot_id = book.update_id
+                buffered, self._buffers[symbol] = self._buffers[symbol], []
+                try:
+                    for diff in buffered:
+                        book.apply_diff(diff)
+                except OutOfSync:
+                    # The snapshot is older than the buffered diffs: try again later
+                    book.reset()
+                    self._buffers[symbol] = [d for d in buffered if d["u"] > snapshot_id]
+
+    def metrics(self, symbol):
+        with self._lock:
+            book = self.books.get(symbol)
+            return book.metrics(self.bands) if book is not None and book.synced else None
+
+
+class ReplayDiffFeed:
+    """Play ``depth_diff`` records of a capture into a ``BookManager``.
+
+    Records look like ``{"t": ..., "m": "depth_diff", "a": [symbol], "r": diff}``;
+    the snapshots come from the manager's ``fetch_snapshot`` (for instance a
+    ``ReplayExchange`` with recorded ``fetch_order_book`` calls).
+    """
+
+    def __init__(self, path, manager, speed=1.0, on_update=None):
+        self.path = path
+        self.manager = manager
+        self.speed = speed
+        self.on_update = on_update  # Called with the symbol after each applied diff
+        self.finished = threading.Event()
+        self._stop = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self):
+        start = time.monotonic()
+        manager = self.manager
+        with gzip.open(self.path, "rt") as f:
+            for line in f:
+                if self._stop.is_set():
+                    break
+                record = json.loads(line)
+                if record["m"] != "depth_diff":
+                    continue
+                if self.speed:
+                    delay = start + record["t"] / self.speed - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                symbol = record["a"][0]
+                if not manager.on_diff(symbol, record["r"]):
+                    manager.sync_pending()
+                if self.on_update:
+                    self.on_update(symbol)
+        self.finished.set()
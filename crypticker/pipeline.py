@@ -0,0 +1,102 @@
+"""Hand-off of table snapshots from worker threads to the Tk main loop.
+
+Worker threads never touch widgets. They build an immutable ``Snapshot`` and
+submit it; ``UiPump`` polls from the main loop via ``after`` and draws only
+the newest snapshot, coalescing any that piled up in between.
+"""
+
+import collections
+import itertools
+import threading
+import time
+from types import MappingProxyType
+
+Snapshot = collections.namedtuple("Snapshot", "seq created rows")
+
+_seq = itertools.count(1)
+
+
+def make_snapshot(rows):
+    """Freeze ``rows`` (a list of row dicts) into a read-only snapshot."""
+    return Snapshot(next(_seq), time.time(), tuple(MappingProxyType(dict(row)) for row in rows))
+
+
+class SnapshotQueue:
+    """Bounded, thread-safe snapshot queue that keeps the newest entries."""
+
+    def __init__(self, maxsize=4):
+        self.maxsize = maxsize
+        self.produced = 0
+        self.dropped = 0    # Evicted because the queue was full
+        self.coalesced = 0  # Skipped by the consumer in favour of a newer one
+        self.applied = 0
+        self._items = collections.deque()
+        self._lock = threading.Lock()
+
+    def put(self, snapshot):
+        with self._lock:
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(snapshot)
+            self.produced += 1
+
+    def take_latest(self):
+        """Return the newest snapshot (or None) and discard the older ones."""
+        with self._lock:
+            if not self._items:
+                return None
+            latest = self._items.pop()
+            self.coalesced += len(self._items)
+            self._items.clear()
+            return latest
+
+    def stats(self):
+        return {
+            "produced": self.produced,
+            "applied": self.applied,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
+
+
+class UiPump:
+    """Apply snapshots and posted callbacks on the Tk main loop."""
+
+    def __init__(self, widget, apply, interval_ms=50, maxsize=4):
+        self.widget = widget
+        self.apply = apply
+        self.interval_ms = interval_ms
+        self.snapshots = SnapshotQueue(maxsize)
+        self._callbacks = collections.deque()
+        self._job = None
+
+    def submit(self, rows):
+        """Called from any thread: queue a snapshot of ``rows`` for drawing."""
+        snapshot = make_snapshot(rows)
+        self.snapshots.put(snapshot)
+        return snapshot
+
+    def post(self, callback):
+        """Called from any thread: run ``callback()`` on the main loop."""
+        self._callbacks.append(callback)
+
+    def start(self):
+        if self._job is None:
+            self._job = self.widget.after(self.interval_ms, self._tick)
+
+    def stop(self):
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+
+    def _tick(self):
+        try:
+            while self._callbacks:
+                self._callbacks.popleft()()
+            snapshot = self.snapshots.take_latest()
+            if snapshot is not None:
+                self.apply(snapshot)
+                self.snapshots.applied += 1
+        finally:
+            self._job = self.widget.after(self.interval_ms, self._tick)
@@ -0,0 +1,243 @@
+"""Holdings with live position value and P&L.
+
+Positions are kept in the quote currency (USDT) and priced from the same
+rows the ticker table gets. ``update(rows)`` only touches the positions in
+those rows and adjusts the portfolio totals by the difference, so a tick
+costs O(rows) however many positions there are. Holdings are entered in the
+GUI or built from a trades CSV (average cost method) and saved to JSON.
+"""
+
+import csv
+import json
+import re
+import threading
+
+from crypticker.market_cache import write_json_atomic
+
+SCHEMA_VERSION = 1
+RECOMPUTE_EVERY = 1000  # Updates between exact recomputations of the totals
+
+
+class Position:
+    """Quantity and cost basis of one symbol plus its last valuation."""
+
+    __slots__ = ("symbol", "quantity", "cost", "realized", "price", "value")
+
+    def __init__(self, symbol, quantity=0.0, cost=0.0, realized=0.0):
+        self.symbol = symbol
+        self.quantity = quantity
+        self.cost = cost  # Total cost basis
+        self.realized = realized  # P&L of sold quantities
+        self.price = None
+        self.value = 0.0
+
+    @property
+    def average_price(self):
+        return self.cost / self.quantity if self.quantity else None
+
+    @property
+    def pnl(self):
+        return self.value - self.cost if self.price is not None else None
+
+    @property
+    def pnl_percent(self):
+        return (self.value - self.cost) / self.cost * 100 if self.price is not None and self.cost else None
+
+
+class Portfolio:
+    """Positions by symbol with incrementally maintained totals."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.positions = {}
+        self.value = 0.0  # Sum over the priced positions
+        self.priced_cost = 0.0  # Cost basis of the priced positions
+        self.generation = 0  # Bumped when positions are added, changed or removed
+        self._dirty = set()  # Symbols revalued since the last ``take_dirty``
+        self._updates = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pnl(self):
+        return self.value - self.priced_cost
+
+    @property
+    def realized(self):
+        return sum(position.realized for position in self.positions.values())
+
+    def _unprice(self, position):
+        if position.price is not None:
+            self.value -= position.value
+            self.priced_cost -= position.cost
+
+    def _price(self, position, price):
+        if position.price is None:
+            self.priced_cost += position.cost
+        value = position.quantity * price
+        self.value += value - position.value if position.price is not None else value
+        position.price = price
+        position.value = value
+
+    def set_position(self, symbol, quantity, cost):
+        """Add or replace a holding; ``cost`` is the total cost basis."""
+        with self._lock:
+            old = self.positions.get(symbol)
+            position = Position(symbol, float(quantity), float(cost), old.realized if old else 0.0)
+            if old is not None:
+                self._unprice(old)
+                if old.price is not None:
+                    self._price(position, old.price)
+            self.positions[symbol] = position
+            self.generation += 1
+        return position
+
+    def remove(self, symbol):
+        with self._lock:
+            position = self.positions.pop(symbol, None)
+            if position is not None:
+                self._unprice(position)
+                self.generation += 1
+
+    def update(self, rows):
+        """Revalue the positions in ``rows`` (their ``last`` quote price); return the changed symbols."""
+        changed = []
+        with self._lock:
+            positions = self.positions
+            for row in rows:
+                position = positions.get(row["symbol"])
+                price = row.get("last")
+                if position is None or not price or price == position.price:
+                    continue
+                self._price(position, price)
+                changed.append(position.symbol)
+            self._dirty.update(changed)
+            self._updates += 1
+            if self._updates % RECOMPUTE_EVERY == 0:
+                self._recompute()
+        return changed
+
+    def take_dirty(self):
+        """Symbols revalued since the last call, e.g. to redraw only those rows."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        return dirty
+
+    def rows(self, symbols=None, rate=1.0):
+        """Display rows (sorted by symbol), converted with ``rate`` from the quote currency."""
+        with self._lock:
+            positions = [self.positions[s] for s in symbols if s in self.positions] if symbols is not None \
+                else sorted(self.positions.values(), key=lambda position: position.symbol)
+            return [{
+                "symbol": p.symbol,
+                "quantity": p.quantity,
+                "average_price": p.average_price * rate if p.average_price is not None else None,
+                "price": p.price * rate if p.price is not None else None,
+                "value": p.value * rate if p.price is not None else None,
+                "pnl": p.pnl * rate if p.price is not None else None,
+                "pnl_percent": p.pnl_percent,
+            } for p in positions]
+
+    def _recompute(self):
+        """Exact totals, to stop floating point drift of the running sums."""
+        priced = [position for position in self.positions.values() if position.price is not None]
+        self.value = sum(position.value for position in priced)
+        self.priced_cost = sum(position.cost for position in priced)
+
+    def apply_trade(self, symbol, side, quantity, price, fee=0.0):
+        """Book a trade with the average cost method; ``fee`` is in the quote currency."""
+        with self._lock:
+            self._apply_trade(symbol, side, quantity, price, fee)
+            self.generation += 1
+
+    def _apply_trade(self, symbol, side, quantity, price, fee):
+        position = self.positions.get(symbol)
+        if position is None:
+            position = self.positions[symbol] = Position(symbol)
+        self._unprice(position)
+        last_price, position.price, position.value = position.price, None, 0.0
+        if side == "buy":
+            position.quantity += quantity
+            position.cost += quantity * price + fee
+        else:
+            quantity = min(quantity, position.quantity)
+            average = position.cost / position.quantity if position.quantity else 0.0
+            position.realized += quantity * (price - average) - fee
+            position.cost -= quantity * average
+            position.quantity -= quantity
+        if last_price is not None:
+            self._price(position, last_price)
+
+    def import_trades(self, path):
+        """Book the trades of a CSV export; return the number of imported trades.
+
+        Understood columns (case-insensitive): ``symbol``/``pair``/``market``,
+        ``side``/``type``, ``price``, ``quantity``/``executed``/``amount`` and an
+        optional ``fee`` in the quote currency. Pairs like ``BTCUSDT`` are
+        written as ``BTC/USDT``. The whole file is checked before the first
+        trade is booked, so a bad line leaves the positions untouched.
+        """
+        trades = []
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            for record in reader:
+                record = {key.strip().lower(): (value or "").strip() for key, value in record.items() if key}
+                symbol = record.get("symbol") or record.get("pair") or record.get("market")
+                side = (record.get("side") or record.get("type") or "").lower()
+                quantity = record.get("quantity") or record.get("executed") or record.get("amount")
+                try:
+                    if not symbol or side not in ("buy", "sell", "kauf", "verkauf") or not quantity:
+                        raise ValueError("Symbol, Seite oder Menge fehlt")
+                    if "/" not in symbol and symbol.upper().endswith("USDT"):
+                        symbol = symbol[:-4] + "/USDT"
+                    trades.append((symbol.upper(), "buy" if side in ("buy", "kauf") else "sell",
+                                   parse_number(quantity), parse_number(record.get("price") or ""),
+                                   parse_number(record.get("fee") or "0")))
+                except ValueError as e:
+                    raise ValueError(f"Ungültige Zeile {reader.line_num}: {e}") from None
+        with self._lock:
+            for trade in trades:
+                self._apply_trade(*trade)
+            if trades:
+                self.generation += 1
+        return len(trades)
+
+    def load(self):
+        """Load the holdings from ``path``; return False if the file is missing or unreadable."""
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            if data.get("version") != SCHEMA_VERSION:
+                return False
+            with self._lock:
+                for item in data["positions"]:
+                    symbol = item["symbol"]
+                    self.positions[symbol] = Position(symbol, float(item["quantity"]), float(item["cost"]),
+                                                      float(item.get("realized", 0.0)))
+                self.generation += 1
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"Fehler beim Laden des Portfolios: {e}")
+            return False
+
+    def save(self):
+        with self._lock:
+            positions = [
+                {"symbol": p.symbol, "quantity": p.quantity, "cost": p.cost, "realized": p.realized}
+                for p in self.positions.values()
+            ]
+        write_json_atomic(self.path, {"version": SCHEMA_VERSION, "positions": positions})
+
+
+def parse_number(text):
+    """Parse ``1234.5``, ``1,234.5`` or ``1234,5``, ignoring a trailing unit like ``0.5BTC``."""
+    match = re.match(r"[-+]?[\d.,]+", text.strip())
+    if match is None:
+        raise ValueError(f"Keine Zahl: {text!r}")
+    text = match.group()
+    if "," in text and "." in text:
+        text = text.replace(",", "")
+    else:
+        text = text.replace(",", ".")
+    return float(text)
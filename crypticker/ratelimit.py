@@ -0,0 +1,235 @@
+"""Request-weight budget, batch planning and backoff for exchange polling.
+
+``RateLimiter`` sits between ``TickerCore`` and the exchange: it splits a
+symbol set into the cheapest ``fetch_tickers`` requests, keeps track of the
+weight used in the current window (from ``x-mbx-used-weight-1m`` when the
+exchange sends it, otherwise from its own estimate) and tells the
+``UpdateScheduler`` how long to wait before the next tick.
+"""
+
+import collections
+import math
+import random
+import threading
+import time
+
+from crypticker.instrumentation import is_rate_limit
+
+# Exchange id -> (weight limit per window, window in seconds, weight header,
+# ticker tiers). A tier (size, weight) means "up to ``size`` symbols per request
+# for ``weight``"; size None is the all-tickers call.
+PROFILES = {
+    "binance": (6000, 60.0, "x-mbx-used-weight-1m", ((20, 2), (100, 40), (None, 80))),
+}
+# Exchanges without a known weight model: one request per fetch, one weight
+# each, limited by ccxt's ``rateLimit`` (milliseconds between requests)
+DEFAULT_PROFILE = (60, 60.0, None, ())
+
+
+def header(headers, name):
+    """Case-insensitive lookup in a response header mapping."""
+    if not headers or not name:
+        return None
+    name = name.lower()
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def plan_batches(symbols, tiers):
+    """Split ``symbols`` into the requests with the lowest total weight.
+
+    Returns ``(batches, weight)``; a batch of None stands for the all-tickers
+    call. Ties go to the plan with fewer requests. Without tiers all symbols
+    go into one request.
+    """
+    symbols = list(symbols)
+    if not tiers:
+        return [symbols], 1
+    best = None
+    for size, weight in tiers:
+        if size is None:
+            plan = ([None], weight)
+        else:
+            count = math.ceil(len(symbols) / size)
+            plan = ([symbols[i * size:(i + 1) * size] for i in range(count)], count * weight)
+        if best is None or (plan[1], len(plan[0])) < (best[1], len(best[0])):
+            best = plan
+    return best
+
+
+class WeightBudget:
+    """Weight used in the exchange's rolling window.
+
+    The exchange's own count (``observe``) wins over the local estimate;
+    weight spent after the last observation is added on top.
+    """
+
+    def __init__(self, limit, window=60.0, clock=time.monotonic):
+        self.limit = limit
+        self.window = window
+        self.clock = clock
+        self._spent = collections.deque()  # (time, weight) of local estimates
+        self._observed = None  # (time, used weight) reported by the exchange
+        self._lock = threading.Lock()
+
+    def spend(self, weight):
+        with self._lock:
+            self._spent.append((self.clock(), weight))
+
+    def observe(self, used):
+        """Take over the used weight reported by the exchange."""
+        with self._lock:
+            now = self.clock()
+            self._observed = (now, used)
+            self._spent.clear()
+
+    def _expire(self, now):
+        while self._spent and self._spent[0][0] <= now - self.window:
+            self._spent.popleft()
+        if self._observed and self._observed[0] <= now - self.window:
+            self._observed = None
+
+    @property
+    def used(self):
+        with self._lock:
+            self._expire(self.clock())
+            observed = self._observed[1] if self._observed else 0
+            return observed + sum(weight for _, weight in self._spent)
+
+    @property
+    def remaining(self):
+        return max(0, self.limit - self.used)
+
+    def wait_time(self, weight, headroom=1.0):
+        """Seconds until ``weight`` more fits into ``headroom`` of the limit."""
+        with self._lock:
+            now = self.clock()
+            self._expire(now)
+            allowed = self.limit * headroom - weight
+            events = ([self._observed] if self._observed else []) + list(self._spent)
+            used = sum(value for _, value in events)
+            if used <= allowed or weight > self.limit * headroom:
+                return 0.0
+            for at, value in events:
+                used -= value
+                if used <= allowed:
+                    return max(0.0, at + self.window - now)
+            return 0.0
+
+
+class Backoff:
+    """Exponential backoff with jitter; a ``Retry-After`` hint is a lower bound."""
+
+    def __init__(self, base=1.0, factor=2.0, max_delay=300.0, jitter=0.5, rng=None):
+        self.base = base
+        self.factor = factor
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.rng = rng or random.Random()
+        self.failures = 0
+
+    def failure(self, retry_after=None):
+        """Count a failure and return the delay before the next attempt."""
+        delay = min(self.max_delay, self.base * self.factor ** self.failures)
+        self.failures += 1
+        delay *= 1 - self.jitter * self.rng.random()
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def success(self):
+        self.failures = 0
+
+
+class RateLimiter:
+    """Plan, account and pace ticker requests for one exchange."""
+
+    def __init__(self, exchange_id="binance", headroom=0.8, backoff=None, clock=time.monotonic):
+        limit, window, weight_header, tiers = PROFILES.get(exchange_id, DEFAULT_PROFILE)
+        self.budget = WeightBudget(limit, window, clock)
+        self.weight_header = weight_header
+        self.tiers = tiers
+        self.headroom = headroom  # Share of the limit the polling may use on average
+        self.backoff = backoff or Backoff()
+        self.clock = clock
+        self.tick_weight = 0  # Weight spent since the last ``next_delay``
+        self.last_tick_weight = 0
+        self.backoff_until = None
+        self.rate_limited = 0
+        self._retry_after = None
+
+    @classmethod
+    def for_exchange(cls, exchange, **kwargs):
+        """Limiter for a ccxt exchange, using its ``rateLimit`` when there is no profile."""
+        exchange_id = getattr(exchange, "id", None)
+        limiter = cls(exchange_id, **kwargs)
+        rate_limit = getattr(exchange, "rateLimit", None)
+        if exchange_id not in PROFILES and rate_limit:
+            limiter.budget.limit = max(1, int(limiter.budget.window * 1000 / rate_limit))
+        return limiter
+
+    def fetch_tickers(self, exchange, symbols, instruments=None):
+        """Fetch ``symbols`` with the cheapest batches and account for their weight.
+
+        Every request sent is counted as ``requests.fetch_tickers`` in ``instruments``.
+        """
+        batches, _ = plan_batches(symbols, self.tiers)
+        tickers = {}
+        for batch in batches:
+            if instruments is not None:
+                instruments.count("requests.fetch_tickers")
+            try:
+                result = exchange.fetch_tickers(batch)
+            except Exception:
+                self._retry_after = header(getattr(exchange, "last_response_headers", None), "Retry-After")
+                raise
+            self._account(exchange, batch)
+            if batch is None:
+                wanted = set(symbols)
+                result = {symbol: ticker for symbol, ticker in result.items() if symbol in wanted}
+            tickers.update(result)
+        return tickers
+
+    def _account(self, exchange, batch):
+        weight = plan_batches(batch, self.tiers)[1] if batch is not None else self.tiers[-1][1]
+        self.tick_weight += weight
+        used = header(getattr(exchange, "last_response_headers", None), self.weight_header)
+        if used is not None:
+            self.budget.observe(int(used))
+        else:
+            self.budget.spend(weight)
+
+    def min_interval(self, weight=None):
+        """Shortest polling interval that keeps the average use below the headroom."""
+        weight = self.last_tick_weight if weight is None else weight
+        return weight * self.budget.window / (self.budget.limit * self.headroom)
+
+    def next_delay(self, interval, error=None):
+        """Seconds until the next tick, given the configured interval and the tick outcome."""
+        weight, self.tick_weight = self.tick_weight, 0
+        if weight:
+            self.last_tick_weight = weight
+        if error is not None:
+            if is_rate_limit(error):
+                self.rate_limited += 1
+            retry_after, self._retry_after = self._retry_after, None
+            try:
+                retry_after = float(retry_after) if retry_after is not None else None
+            except (TypeError, ValueError):
+                retry_after = None
+            delay = self.backoff.failure(retry_after)
+            self.backoff_until = self.clock() + delay
+            return delay
+        self.backoff.success()
+        self.backoff_until = None
+        return max(interval, self.min_interval(),
+                   self.budget.wait_time(self.last_tick_weight, self.headroom))
+
+    def backoff_remaining(self):
+        """Seconds left of the current backoff (0 when not backing off)."""
+        if self.backoff_until is None:
+            return 0.0
+        return max(0.0, self.backoff_until - self.clock())
+
@@ -0,0 +1,162 @@
+"""Record raw exchange responses and replay them offline.
+
+A capture is a gzip-compressed JSON Lines file with one record per call:
+``{"t": seconds since start, "m": method, "a": args, "r": result}``. The
+bulky raw ``info`` payloads of ccxt structures are dropped.
+"""
+
+import collections
+import gzip
+import json
+import threading
+import time
+
+RECORDED_METHODS = ("load_markets", "fetch_tickers", "fetch_ticker", "fetch_ohlcv", "fetch_order_book")
+PER_SYMBOL_METHODS = ("fetch_ticker", "fetch_ohlcv", "fetch_order_book")  # Also replayed per symbol
+
+
+class ReplayFinished(Exception):
+    """The capture has no more responses for the requested method."""
+
+
+def strip_info(value):
+    """Drop the raw ``info`` payload from ccxt structures, recursively."""
+    if isinstance(value, dict):
+        return {key: strip_info(item) for key, item in value.items() if key != "info"}
+    if isinstance(value, list):
+        return [strip_info(item) for item in value]
+    return value
+
+
+class RecordingExchange:
+    """Wrap an exchange and append the result of every recorded call to ``path``.
+
+    A replay serves one record per call, so a fetch that a ``RateLimiter``
+    splits into several requests is recorded as one call (``record_merged``).
+    """
+
+    def __init__(self, exchange, path):
+        self._exchange = exchange
+        self._file = gzip.open(path, "wt")
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+        self._merging = threading.local()
+
+    def __getattr__(self, name):
+        attr = getattr(self._exchange, name)
+        if name not in RECORDED_METHODS:
+            return attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if not getattr(self._merging, "active", False):
+                self.write(name, args, result)
+            return result
+
+        return call
+
+    def record_merged(self, method, args, fetch):
+        """Return ``fetch()`` and record its result as a single ``method(*args)`` call.
+
+        The requests ``fetch`` makes on this thread are not recorded on their own.
+        """
+        self._merging.active = True
+        try:
+            result = fetch()
+        finally:
+            self._merging.active = False
+        self.write(method, args, result)
+        return result
+
+    def write(self, method, args, result):
+        record = {"t": round(time.monotonic() - self._start, 3), "m": method, "a": list(args), "r": strip_info(result)}
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def write_capture(path, records):
+    """Write ``(t, method, args, result)`` records, e.g. to build synthetic captures."""
+    with gzip.open(path, "wt") as f:
+        for t, method, args, result in records:
+            f.write(json.dumps({"t": t, "m": method, "a": list(args), "r": result}, separators=(",", ":")) + "\n")
+
+
+class ReplayExchange:
+    """Serve a capture: each call returns the next recorded response of that method.
+
+    ``speed`` scales the recorded timing (1 = real time, 10 = ten times
+    faster, 0 = as fast as possible). With ``loop`` the capture starts over
+    once a method runs out of responses.
+    """
+
+    def __init__(self, path, speed=1.0, loop=False):
+        self.id = "replay"
+        self.speed = speed
+        self.loop = loop
+        self.markets = None
+        self._records = collections.defaultdict(list)
+        with gzip.open(path, "rt") as f:
+            for line in f:
+                record = json.loads(line)
+                self._records[record["m"]].append((record["t"], record["r"]))
+                if record["m"] in PER_SYMBOL_METHODS and record["a"]:
+                    self._records[f"{record['m']}:{record['a'][0]}"].append((record["t"], record["r"]))
+        self._positions = collections.Counter()
+        self._rounds = collections.Counter()
+        self._duration = max((t for records in self._records.values() for t, _ in records), default=0.0)
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _next(self, method):
+        with self._lock:
+            records = self._records.get(method)
+            if not records:
+                raise ReplayFinished(method)
+            position = self._positions[method]
+            if position >= len(records):
+                if not self.loop:
+                    raise ReplayFinished(method)
+                position = 0
+                self._rounds[method] += 1
+            self._positions[method] = position + 1
+            t, result = records[position]
+            t += self._rounds[method] * self._duration
+        if self.speed:
+            delay = self._start + t / self.speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return result
+
+    def load_markets(self, reload=False):
+        if self.markets is None or reload:
+            self.markets = self._records["load_markets"][-1][1] if self._records.get("load_markets") else {}
+        return self.markets
+
+    @property
+    def symbols(self):
+        return list(self.load_markets())
+
+    def fetch_tickers(self, symbols=None):
+        tickers = self._next("fetch_tickers")
+        if symbols is None:
+            return tickers
+        return {symbol: tickers[symbol] for symbol in symbols if symbol in tickers}
+
+    def _next_for(self, method, symbol):
+        key = f"{method}:{symbol}"
+        return self._next(key if key in self._records else method)
+
+    def fetch_ticker(self, symbol):
+        return self._next_for("fetch_ticker", symbol)
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None):
+        return self._next_for("fetch_ohlcv", symbol)
+
+    def fetch_order_book(self, symbol, limit=None):
+        return self._next_for("fetch_order_book", symbol)
@@ -0,0 +1,135 @@
+"""Single-flight update scheduler with a drift-free cadence."""
+
+import threading
+import time
+
+
+class UpdateScheduler:
+    """Own exactly one worker thread that calls ``fetch(symbols)`` periodically.
+
+    Selection changes are coalesced and trigger an immediate fetch. Ticks
+    follow a monotonic deadline, so the time spent fetching does not add to
+    the interval. ``stop`` takes effect right away: a sleeping worker wakes up
+    and a result that is still in flight is discarded.
+
+    With a ``RateLimiter`` the limiter has the last word on the pause after
+    each tick: it stretches the interval to stay within the exchange's weight
+    budget and backs off after errors. Immediate fetches wait for a running
+    backoff to end.
+    """
+
+    def __init__(self, fetch, on_result, on_error=None, interval=5.0, clock=time.monotonic, limiter=None):
+        self.fetch = fetch
+        self.on_result = on_result
+        self.on_error = on_error
+        self.clock = clock
+        self.limiter = limiter
+        self.ticks = 0
+        self.missed = 0  # Deadlines skipped because a fetch overran the interval
+        self._interval = float(interval)
+        self.effective_interval = self._interval  # Pause chosen after the last tick
+        self._symbols = ()
+        self._running = False
+        self._due_now = False
+        self._generation = 0
+        self._thread = None
+        self._cond = threading.Condition()
+
+    @property
+    def running(self):
+        return self._running
+
+    @property
+    def interval(self):
+        return self._interval
+
+    def set_symbols(self, symbols):
+        """Replace the symbol set; a running scheduler fetches it immediately."""
+        symbols = tuple(symbols)
+        with self._cond:
+            if symbols == self._symbols:
+                return
+            self._symbols = symbols
+            self._generation += 1
+            self._due_now = True
+            self._cond.notify()
+
+    def trigger(self):
+        """Fetch right away (if running), e.g. after a setting changed."""
+        with self._cond:
+            if self._running:
+                self._due_now = True
+                self._cond.notify()
+
+    def set_interval(self, seconds):
+        if seconds <= 0:
+            raise ValueError("interval must be positive")
+        with self._cond:
+            self._interval = float(seconds)
+            self._cond.notify()
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._due_now = True
+            # A worker that is still finishing a cancelled fetch is reused
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._generation += 1
+            self._cond.notify()
+
+    def _run(self):
+        deadline = self.clock()
+        while True:
+            with self._cond:
+                while self._running:
+                    if self._due_now:
+                        remaining = self.limiter.backoff_remaining() if self.limiter else 0
+                    else:
+                        remaining = deadline - self.clock()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if not self._running:
+                    self._thread = None
+                    return
+                if self._due_now:
+                    self._due_now = False
+                    deadline = self.clock()
+                symbols, generation = self._symbols, self._generation
+
+            start = deadline
+            error = None
+            if symbols:
+                try:
+                    result = self.fetch(symbols)
+                except Exception as e:
+                    error = e
+                    if self.on_error and generation == self._generation:
+                        self.on_error(e)
+                else:
+                    if generation == self._generation:
+                        self.ticks += 1
+                        self.on_result(result)
+
+            deadline += self._interval
+            now = self.clock()
+            if self.limiter is not None and symbols:
+                delay = self.limiter.next_delay(self._interval, error)
+                self.effective_interval = delay
+                # Backoff counts from now, a stretched interval from the tick's start
+                deadline = max(deadline, now + delay if error is not None else start + delay)
+                if deadline > now:
+                    continue
+            if deadline <= now:
+                skipped = int((now - deadline) // self._interval) + 1
+                self.missed += skipped
+                deadline += skipped * self._interval
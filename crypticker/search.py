@@ -0,0 +1,70 @@
+"""Prebuilt n-gram index for the coin picker search."""
+
+from collections import defaultdict
+
+NGRAM_MAX = 3
+
+
+def _ngrams(text, n):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class SymbolIndex:
+    """Index trading pairs by 1- to 3-grams and rank matches.
+
+    Results for queries of up to three characters are ranked once while the
+    index is built, so they are a single dictionary lookup. Longer queries
+    intersect the trigram sets and rank the few remaining candidates. Order:
+    exact base asset, base prefix, quote prefix, any other substring.
+    """
+
+    def __init__(self, symbols, cache_size=256):
+        self.symbols = symbols
+        self.cache_size = cache_size
+        self._lower = [symbol.lower() for symbol in symbols]
+        self._cache = {}
+        postings = defaultdict(set)
+        for i, text in enumerate(self._lower):
+            for n in range(1, NGRAM_MAX + 1):
+                for gram in _ngrams(text, n):
+                    postings[gram].add(i)
+        self._grams = postings
+        self._ranked = {gram: self._sorted(ids, gram) for gram, ids in postings.items()}
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def _rank(self, i, query):
+        text = self._lower[i]
+        base, _, quote = text.partition("/")
+        if base == query or text == query:
+            return 0
+        if text.startswith(query):
+            return 1
+        if quote.startswith(query):
+            return 2
+        return 3
+
+    def _sorted(self, ids, query):
+        symbols = self.symbols
+        return [symbols[i] for i in sorted(
+            ids, key=lambda i: (self._rank(i, query), len(symbols[i]), symbols[i])
+        )]
+
+    def search(self, text, limit=None):
+        """Return the symbols containing ``text`` (case-insensitive), best first."""
+        query = text.strip().lower()
+        if not query:
+            return []
+        results = self._ranked.get(query) if len(query) <= NGRAM_MAX else self._cache.get(query)
+        if results is None:
+            if len(query) <= NGRAM_MAX:
+                results = []
+            else:
+                sets = sorted((self._grams.get(gram, set()) for gram in _ngrams(query, NGRAM_MAX)), key=len)
+                candidates = [i for i in sets[0].intersection(*sets[1:]) if query in self._lower[i]]
+                results = self._sorted(candidates, query)
+                if len(self._cache) >= self.cache_size:
+                    self._cache.clear()
+                self._cache[query] = results
+        return results[:limit] if limit else results
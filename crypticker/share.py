@@ -0,0 +1,305 @@
+"""Share one exchange fetch between instances through a local snapshot endpoint.
+
+The instance that talks to the exchange publishes every computed snapshot
+(the sorted table rows) on a local HTTP endpoint; other GUI or headless
+instances run as clients against it instead of polling the exchange. Rows go
+over the wire as arrays in a shared key order, and after the first full
+snapshot a client only receives the rows that changed since the sequence
+number it already has. Sequence numbers restart with the server, so every
+message carries the server's epoch; a client that sees a new one starts over
+from a full snapshot. Clients long-poll, so an update reaches them as soon
+as it is published. JSON is the default; msgpack is used when both sides
+have it installed.
+
+    GET /snapshot                       full snapshot
+    GET /updates?since=N&epoch=E&wait=S&symbols=A,B
+                                        delta since N of epoch E (full if
+                                        either is unknown), 204 if nothing
+                                        new arrived within S
+"""
+
+import collections
+import http.server
+import json
+import threading
+import time
+import urllib.parse
+import urllib.request
+import uuid
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+DEFAULT_PORT = 8765
+HISTORY = 32  # Snapshots kept as delta bases
+MAX_WAIT = 30.0  # Longest long-poll the server accepts, in seconds
+WANT_TTL = 120.0  # Seconds the symbols a client asked for stay in the fetch set
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+
+
+def encode(message, content_type=JSON):
+    if content_type == MSGPACK:
+        return msgpack.packb(message)
+    return json.dumps(message, separators=(",", ":")).encode("utf-8")
+
+
+def decode(body, content_type=JSON):
+    if content_type.startswith(MSGPACK):
+        return msgpack.unpackb(body)
+    return json.loads(body)
+
+
+class SnapshotServer:
+    """Keep the latest snapshots and serve them as full or delta messages.
+
+    ``publish(rows)`` is called by the producer for every new snapshot.
+    Symbols requested by clients are collected in ``wanted()`` so the
+    producer can add them to its fetch; ``on_wanted()`` is called from a
+    server thread when a new one shows up.
+    """
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, on_wanted=None, clock=time.monotonic):
+        self.host = host
+        self.port = port
+        self.on_wanted = on_wanted
+        self.clock = clock
+        self.epoch = uuid.uuid4().hex[:12]  # Tells the snapshots of this run from an earlier one's
+        self.seq = 0
+        self.requests = 0
+        self.bytes_sent = 0
+        self._keys = []
+        self._currency = None
+        self._rate = None
+        self._history = collections.OrderedDict()  # seq -> (symbol -> row tuple, symbol order)
+        self._deltas = {}  # Base seq -> delta message to the newest seq
+        self._wanted = {}  # Symbol -> time it was last asked for
+        self._cond = threading.Condition()
+        self._httpd = None
+
+    def publish(self, rows, currency=None, rate=None):
+        """Store a snapshot of ``rows`` (row dicts in display order, converted into ``currency`` with ``rate``)."""
+        keys = list(self._keys)
+        for row in rows:
+            for key in row:
+                if key not in keys:
+                    keys.append(key)
+        encoded = {row["symbol"]: tuple(row.get(key) for key in keys) for row in rows}
+        order = [row["symbol"] for row in rows]
+        with self._cond:
+            if keys != self._keys:
+                # Older rows have fewer columns, start over with full snapshots
+                self._keys = keys
+                self._history.clear()
+            self._currency = currency
+            self._rate = rate
+            self.seq += 1
+            self._history[self.seq] = (encoded, order)
+            while len(self._history) > HISTORY:
+                self._history.popitem(last=False)
+            self._deltas = {}
+            self._cond.notify_all()
+
+    def message(self, since=None):
+        """The newest snapshot, as a delta from ``since`` if that one is still known."""
+        with self._cond:
+            if not self._history:
+                return None
+            seq = self.seq
+            rows, order = self._history[seq]
+            message = {"epoch": self.epoch, "seq": seq, "ts": round(time.time(), 3), "currency": self._currency,
+                       "rate": self._rate, "keys": self._keys}
+            base = self._history.get(since)
+            if base is None or since == seq:
+                message["rows"] = [list(rows[symbol]) for symbol in order]
+                return message
+            cached = self._deltas.get(since)
+            if cached is not None:
+                return cached
+            base_rows, base_order = base
+            message["base"] = since
+            message["changed"] = [list(row) for symbol, row in rows.items() if base_rows.get(symbol) != row]
+            message["removed"] = [symbol for symbol in base_rows if symbol not in rows]
+            if order != base_order:
+                message["order"] = order
+            self._deltas[since] = message
+            return message
+
+    def wait(self, since, timeout):
+        """Block until a snapshot newer than ``since`` exists; return False on timeout."""
+        with self._cond:
+            if since > self.seq:
+                return True  # The client follows an earlier run of this server
+            return self._cond.wait_for(lambda: self.seq > since, timeout)
+
+    def want(self, symbols):
+        now = self.clock()
+        new = False
+        with self._cond:
+            for symbol in symbols:
+                new = new or symbol not in self._wanted
+                self._wanted[symbol] = now
+        if new and self.on_wanted is not None:
+            self.on_wanted()
+
+    def wanted(self):
+        """Symbols clients asked for within the last ``WANT_TTL`` seconds."""
+        now = self.clock()
+        with self._cond:
+            for symbol in [s for s, at in self._wanted.items() if now - at > WANT_TTL]:
+                del self._wanted[symbol]
+            return list(self._wanted)
+
+    def start(self):
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urllib.parse.urlsplit(self.path)
+                query = urllib.parse.parse_qs(url.query)
+                if url.path == "/snapshot":
+                    message = server.message()
+                elif url.path == "/updates":
+                    try:
+                        since = int(query.get("since", ["0"])[0])
+                        wait = min(float(query.get("wait", ["0"])[0]), MAX_WAIT)
+                    except ValueError:
+                        self.send_error(400)
+                        return
+                    if query.get("epoch", [server.epoch])[0] != server.epoch:
+                        since = 0  # The client's sequence numbers belong to an earlier run
+                    symbols = [s for s in query.get("symbols", [""])[0].split(",") if s]
+                    if symbols:
+                        server.want(symbols)
+                    message = server.message(since) if server.wait(since, wait) else None
+                else:
+                    self.send_error(404)
+                    return
+                server.requests += 1
+                if message is None:
+                    self.send_response(204)
+                    self.end_headers()
+                    return
+                content_type = MSGPACK if msgpack is not None and MSGPACK in self.headers.get("Accept", "") else JSON
+                body = encode(message, content_type)
+                server.bytes_sent += len(body)
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = http.server.ThreadingHTTPServer((self.host, self.port), Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]  # The actual port when 0 was asked for
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+
+class SnapshotClient:
+    """Follow a ``SnapshotServer`` and hand the rows of ``symbols`` to ``on_rows(rows)``.
+
+    The symbols are also sent to the server, which adds them to its fetch.
+    ``on_rows`` runs on the client thread, like the scheduler's ``on_result``.
+    """
+
+    def __init__(self, url, on_rows, on_error=None, wait=25.0, retry=2.0):
+        self.url = url.rstrip("/")
+        self.on_rows = on_rows
+        self.on_error = on_error
+        self.wait = wait
+        self.retry = retry
+        self.epoch = None  # Epoch of the server run ``seq`` belongs to
+        self.seq = 0
+        self.currency = None
+        self.rate = None  # Quote -> display currency rate the rows were converted with
+        self.bytes_received = 0
+        self._symbols = ()
+        self._keys = []
+        self._rows = {}  # Symbol -> row list
+        self._order = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def set_symbols(self, symbols):
+        self._symbols = tuple(symbols)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def apply(self, message):
+        """Apply a full or delta message and return the rows as dicts in display order.
+
+        A delta from another server run than the rows were built from is
+        dropped (None is returned) and the next poll asks for a full snapshot.
+        """
+        if "base" in message and message.get("epoch") != self.epoch:
+            self.epoch = None
+            self.seq = 0
+            return None
+        keys = self._keys = message["keys"]
+        symbol_index = keys.index("symbol")
+        self.currency = message.get("currency")
+        self.rate = message.get("rate")
+        if "base" not in message:
+            self._rows = {row[symbol_index]: row for row in message["rows"]}
+            self._order = list(self._rows)
+        else:
+            for row in message["changed"]:
+                self._rows[row[symbol_index]] = row
+            for symbol in message["removed"]:
+                self._rows.pop(symbol, None)
+            if "order" in message:
+                self._order = message["order"]
+        self.epoch = message.get("epoch")
+        self.seq = message["seq"]
+        wanted = set(self._symbols)
+        return [dict(zip(keys, self._rows[symbol])) for symbol in self._order
+                if symbol in self._rows and (not wanted or symbol in wanted)]
+
+    def poll(self):
+        """One long-poll; return the new rows or None if nothing changed."""
+        query = {"since": self.seq, "wait": self.wait, "symbols": ",".join(self._symbols)}
+        if self.epoch is not None:
+            query["epoch"] = self.epoch
+        query = urllib.parse.urlencode(query)
+        request = urllib.request.Request(f"{self.url}/updates?{query}",
+                                         headers={"Accept": MSGPACK if msgpack is not None else JSON})
+        with urllib.request.urlopen(request, timeout=self.wait + 10) as response:
+            if response.status == 204:
+                return None
+            body = response.read()
+            self.bytes_received += len(body)
+            return self.apply(decode(body, response.headers.get("Content-Type", JSON)))
+
+    def run(self):
+        while not self._stop.is_set():
+            try:
+                rows = self.poll()
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(e)
+                self._stop.wait(self.retry)
+                continue
+            if rows is not None and not self._stop.is_set():
+                self.on_rows(rows)
@@ -0,0 +1,79 @@
+"""Offline stand-in for a ccxt exchange, e.g. for tests and benchmarks."""
+
+import random
+import time
+
+TIMEFRAME_MS = {"1m": 60000, "5m": 300000, "15m": 900000, "1h": 3600000}
+
+
+class StubExchange:
+    """Serve generated tickers with an optional delay or failure."""
+
+    def __init__(self, id="stub", symbols=("BTC/USDT", "ETH/USDT"), delay=0.0, error=None, seed=None):
+        self.id = id
+        self.symbols = list(symbols)
+        self.delay = delay
+        self.error = error
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._prices = {symbol: self._random.uniform(0.01, 1000) for symbol in self.symbols}
+
+    def load_markets(self, reload=False):
+        markets = {}
+        for symbol in self.symbols:
+            base, _, quote = symbol.partition("/")
+            markets[symbol] = {"symbol": symbol, "base": base, "quote": quote.split(":")[0],
+                               "active": True, "precision": {"price": 8, "amount": 8}}
+        return markets
+
+    def _ticker(self, symbol):
+        price = self._prices[symbol] = self._prices[symbol] * self._random.uniform(0.995, 1.005)
+        spread = price * 0.0005
+        return {
+            "symbol": symbol, "timestamp": int(time.time() * 1000),
+            "last": price, "bid": price - spread, "ask": price + spread,
+            "open": price * 0.98, "high": price * 1.04, "low": price * 0.95,
+            "vwap": price * 0.99, "baseVolume": self._random.uniform(1, 1e6),
+        }
+
+    def fetch_tickers(self, symbols=None):
+        self.requests += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return {s: self._ticker(s) for s in (symbols or self.symbols) if s in self._prices}
+
+    def fetch_ticker(self, symbol):
+        return self.fetch_tickers([symbol])[symbol]
+
+    def fetch_order_book(self, symbol, limit=None):
+        self.requests += 1
+        if self.error:
+            raise self.error
+        price = self._prices[symbol]
+        tick = price * 0.0001
+        levels = range(1, (limit or 100) + 1)
+        return {
+            "symbol": symbol, "nonce": self.requests,
+            "bids": [[price - i * tick, self._random.uniform(0.1, 5)] for i in levels],
+            "asks": [[price + i * tick, self._random.uniform(0.1, 5)] for i in levels],
+        }
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None):
+        self.requests += 1
+        if self.error:
+            raise self.error
+        step = TIMEFRAME_MS[timeframe]
+        now = int(time.time() * 1000) // step * step
+        start = now - ((limit or 100) - 1) * step
+        if since is not None:
+            start = max(start, since // step * step)
+        candles = []
+        for t in range(start, now + 1, step):
+            rng = random.Random(f"{symbol}{t}")
+            close = self._prices[symbol] * rng.uniform(0.97, 1.03)
+            open_ = close * rng.uniform(0.99, 1.01)
+            candles.append([t, open_, max(open_, close) * rng.uniform(1, 1.01),
+                            min(open_, close) * rng.uniform(0.99, 1), close, rng.uniform(1, 1e4)])
+        return candles
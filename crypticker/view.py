@@ -0,0 +1,131 @@
+"""Row-keyed Treeview model that only touches what changed between ticks."""
+
+import bisect
+
+
+def format_value(value):
+    """Format a numeric cell the way the ticker table shows it."""
+    return f"{value:.6f}" if value else "N/A"
+
+
+def _increasing_run(positions):
+    """Indices of a longest strictly increasing subsequence of ``positions``."""
+    tails = []  # Smallest tail position of an increasing run of each length
+    tail_index = []
+    previous = [-1] * len(positions)
+    for i, position in enumerate(positions):
+        length = bisect.bisect_left(tails, position)
+        if length == len(tails):
+            tails.append(position)
+            tail_index.append(i)
+        else:
+            tails[length] = position
+            tail_index[length] = i
+        previous[i] = tail_index[length - 1] if length else -1
+    keep = set()
+    i = tail_index[-1] if tail_index else -1
+    while i >= 0:
+        keep.add(i)
+        i = previous[i]
+    return keep
+
+
+class TableView:
+    """Keep one stable Treeview item per symbol and update it incrementally.
+
+    ``columns`` are the Treeview column ids, ``keys`` the matching row dict
+    keys. The first key identifies the row and becomes the item id; keys
+    missing from a row show as "N/A".
+    ``tags(row)`` may return Treeview tags for a row (e.g. to grey it out).
+    """
+
+    def __init__(self, tree, columns, keys, formatters=None, tags=None):
+        self.tree = tree
+        self.columns = list(columns)
+        self.keys = list(keys)
+        self.formatters = formatters or {}
+        self.tags = tags
+        self._values = {}  # item id -> tuple of formatted cells
+        self._tags = {}    # item id -> tuple of tags
+        self._order = []   # item ids in displayed order
+        self.cell_updates = 0
+        self.moves = 0
+
+    def format_row(self, row):
+        return tuple(
+            self.formatters.get(key, format_value)(row.get(key)) if i else str(row[key])
+            for i, key in enumerate(self.keys)
+        )
+
+    def apply(self, rows):
+        """Bring the Treeview in line with ``rows`` (already in display order)."""
+        tree = self.tree
+        values = {}
+        tags = {}
+        order = []
+        for row in rows:
+            iid = str(row[self.keys[0]])
+            values[iid] = self.format_row(row)
+            tags[iid] = tuple(self.tags(row)) if self.tags else ()
+            order.append(iid)
+
+        for iid in self._values.keys() - values.keys():
+            tree.delete(iid)
+
+        displayed = [iid for iid in self._order if iid in values]
+        for iid in order:
+            old = self._values.get(iid)
+            new = values[iid]
+            if old is None:
+                tree.insert("", "end", iid=iid, values=new, tags=tags[iid])
+                displayed.append(iid)
+                continue
+            if old != new:
+                for column, before, after in zip(self.columns, old, new):
+                    if before != after:
+                        tree.set(iid, column, after)
+                        self.cell_updates += 1
+            if self._tags.get(iid) != tags[iid]:
+                tree.item(iid, tags=tags[iid])
+
+        # Reorder only when the ranking actually changed. The longest run of
+        # rows that are already in the right relative order stays put; the
+        # others are detached and reattached at their index, which is exact
+        # once every row before them is in place.
+        if displayed != order:
+            position = {iid: index for index, iid in enumerate(displayed)}
+            keep = _increasing_run([position[iid] for iid in order])
+            moved = [(index, iid) for index, iid in enumerate(order) if index not in keep]
+            tree.detach(*(iid for _, iid in moved))
+            for index, iid in moved:
+                tree.move(iid, "", index)
+            self.moves += len(moved)
+
+        self._values = values
+        self._tags = tags
+        self._order = order
+
+    def update_rows(self, rows):
+        """Update only the given rows in place; order and all other rows stay as they are."""
+        tree = self.tree
+        for row in rows:
+            iid = str(row[self.keys[0]])
+            new = self.format_row(row)
+            old = self._values.get(iid)
+            if old is None:
+                tree.insert("", "end", iid=iid, values=new)
+                self._order.append(iid)
+                self._tags[iid] = ()
+            elif old != new:
+                for column, before, after in zip(self.columns, old, new):
+                    if before != after:
+                        tree.set(iid, column, after)
+                        self.cell_updates += 1
+            self._values[iid] = new
+
+    def clear(self):
+        for iid in self._order:
+            self.tree.delete(iid)
+        self._values = {}
+        self._tags = {}
+        self._order = []
@@ -0,0 +1,129 @@
+"""Named watchlists, each shown as a tab of the ticker table.
+
+All lists are served by one fetch: ``symbols()`` is the deduplicated union
+the scheduler (or feed) asks the exchange for, and every tab only picks its
+rows out of the shared result. The lists are saved to JSON and checked
+against the market cache, which also repairs typos like ``PEPE/USTD``.
+"""
+
+import difflib
+import json
+import threading
+
+from crypticker.market_cache import write_json_atomic
+
+SCHEMA_VERSION = 1
+DEFAULT_NAME = "Standard"
+
+
+class Watchlists:
+    """Ordered ``name -> symbols`` lists plus the name of the active one."""
+
+    def __init__(self, path=None, default_symbols=()):
+        self.path = path
+        self.lists = {DEFAULT_NAME: list(default_symbols)}
+        self.active = DEFAULT_NAME
+        self.generation = 0  # Bumped on every change of a list
+        self._lock = threading.Lock()
+
+    @property
+    def active_symbols(self):
+        return self.lists[self.active]
+
+    def symbols(self, extra=()):
+        """Union of all lists (and ``extra``) in first-seen order, each symbol once."""
+        with self._lock:
+            seen = dict.fromkeys(symbol for symbols in self.lists.values() for symbol in symbols)
+        seen.update(dict.fromkeys(extra))
+        return list(seen)
+
+    def add(self, name, symbols=()):
+        name = name.strip()
+        if not name or name in self.lists:
+            raise ValueError(f"Ungültiger oder doppelter Name: {name!r}")
+        with self._lock:
+            self.lists[name] = list(dict.fromkeys(symbols))
+            self.generation += 1
+
+    def remove(self, name):
+        """Delete a list; the last one cannot be removed."""
+        with self._lock:
+            if name not in self.lists or len(self.lists) == 1:
+                return False
+            del self.lists[name]
+            if self.active == name:
+                self.active = next(iter(self.lists))
+            self.generation += 1
+            return True
+
+    def set_selected(self, name, symbol, selected):
+        with self._lock:
+            symbols = self.lists[name]
+            if selected and symbol not in symbols:
+                symbols.append(symbol)
+            elif not selected and symbol in symbols:
+                symbols.remove(symbol)
+            else:
+                return
+            self.generation += 1
+
+    def validate(self, markets):
+        """Drop symbols the exchange does not list, replacing obvious typos by the listed pair.
+
+        ``markets`` is a collection of valid symbols. Returns ``{name: [(symbol,
+        replacement or None), ...]}`` for the lists that changed.
+        """
+        markets = set(markets)
+        if not markets:
+            return {}
+        changes = {}
+        with self._lock:
+            for name, symbols in self.lists.items():
+                fixed = []
+                for symbol in symbols:
+                    if symbol in markets:
+                        fixed.append(symbol)
+                        continue
+                    replacement = closest_symbol(symbol, markets)
+                    changes.setdefault(name, []).append((symbol, replacement))
+                    if replacement is not None:
+                        fixed.append(replacement)
+                if name in changes:
+                    symbols[:] = dict.fromkeys(fixed)
+            if changes:
+                self.generation += 1
+        return changes
+
+    def load(self):
+        """Load the lists from ``path``; return False if the file is missing or unreadable."""
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            if data.get("version") != SCHEMA_VERSION or not data["lists"]:
+                return False
+            with self._lock:
+                self.lists = {item["name"]: list(dict.fromkeys(item["symbols"])) for item in data["lists"]}
+                self.active = data.get("active") if data.get("active") in self.lists else next(iter(self.lists))
+                self.generation += 1
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"Fehler beim Laden der Watchlisten: {e}")
+            return False
+
+    def save(self):
+        with self._lock:
+            lists = [{"name": name, "symbols": list(symbols)} for name, symbols in self.lists.items()]
+            active = self.active
+        write_json_atomic(self.path, {"version": SCHEMA_VERSION, "active": active, "lists": lists})
+
+
+def closest_symbol(symbol, markets):
+    """The listed pair with the same base that ``symbol`` was most likely meant to be, or None."""
+    base, _, quote = symbol.upper().partition("/")
+    candidates = [market for market in markets if market.partition("/")[0] == base]
+    if f"{base}/{quote}" in markets:
+        return f"{base}/{quote}"
+    match = difflib.get_close_matches(f"{base}/{quote}", candidates, n=1, cutoff=0.8)
+    return match[0] if match else None
@@ -0,0 +1,278 @@
+"""Tk widgets and helpers shared by the GUIs."""
+
+import tkinter as tk
+from tkinter import ttk
+
+from crypticker.view import TableView
+
+
+class Debouncer:
+    """Run ``callback`` once, ``delay_ms`` after the last of a burst of triggers."""
+
+    def __init__(self, widget, delay_ms, callback):
+        self.widget = widget
+        self.delay_ms = delay_ms
+        self.callback = callback
+        self._job = None
+
+    def trigger(self, *args):
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+        self._job = self.widget.after(self.delay_ms, self._fire)
+
+    def _fire(self):
+        self._job = None
+        self.callback()
+
+
+class VirtualCheckList(tk.Frame):
+    """Scrollable checkbox list that only creates widgets for the visible rows.
+
+    ``is_selected(item)`` tells whether a row is ticked, ``on_toggle(item, var)``
+    is called when the user clicks one. The widgets are pooled and re-bound
+    to other items while scrolling.
+    """
+
+    def __init__(self, master, is_selected, on_toggle, row_height=24, bg="#2c2f33",
+                 selected_bg="#36393f", font=("Arial", 10), **kwargs):
+        super().__init__(master, bg=bg, **kwargs)
+        self.pack_propagate(False)  # Rows are placed, keep the requested height
+        self.is_selected = is_selected
+        self.on_toggle = on_toggle
+        self.row_height = row_height
+        self.bg = bg
+        self.selected_bg = selected_bg
+        self.font = font
+        self.items = []
+        self._first = 0
+        self._pool = []  # (checkbutton, BooleanVar)
+
+        self.viewport = tk.Frame(self, bg=bg)
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self._on_scroll, width=20)
+        self.viewport.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.viewport.bind("<Configure>", lambda e: self.refresh())
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.viewport.bind(sequence, self._on_wheel)
+
+    def set_items(self, items):
+        self.items = items
+        self._first = 0
+        self.refresh()
+
+    def visible_count(self):
+        return max(1, self.viewport.winfo_height() // self.row_height)
+
+    def _scroll_to(self, first):
+        max_first = max(0, len(self.items) - self.visible_count())
+        self._first = min(max(0, first), max_first)
+        self.refresh()
+
+    def _on_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self._scroll_to(int(round(float(amount) * len(self.items))))
+        else:
+            step = self.visible_count() if unit == "pages" else 1
+            self._scroll_to(self._first + int(amount) * step)
+
+    def _on_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self._scroll_to(self._first - 3)
+        else:
+            self._scroll_to(self._first + 3)
+
+    def _make_row(self):
+        var = tk.BooleanVar()
+        checkbutton = tk.Checkbutton(
+            self.viewport, variable=var, fg="white", selectcolor="#7289da", font=self.font,
+            anchor="w", relief="flat", highlightthickness=0,
+        )
+        checkbutton.config(command=lambda: self._toggled(checkbutton, var))
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            checkbutton.bind(sequence, self._on_wheel)
+        self._pool.append((checkbutton, var))
+
+    def _toggled(self, checkbutton, var):
+        self.on_toggle(checkbutton.item, var)
+        self.refresh()
+
+    def refresh(self):
+        """Re-bind the pooled rows to the items currently in view."""
+        visible = self.visible_count()
+        while len(self._pool) < visible:
+            self._make_row()
+
+        for row, (checkbutton, var) in enumerate(self._pool):
+            index = self._first + row
+            if row < visible and index < len(self.items):
+                item = self.items[index]
+                selected = self.is_selected(item)
+                checkbutton.item = item
+                var.set(selected)
+                checkbutton.config(text=item, bg=self.selected_bg if selected else self.bg)
+                checkbutton.place(x=0, y=row * self.row_height, relwidth=1, height=self.row_height)
+            else:
+                checkbutton.place_forget()
+
+        total = len(self.items)
+        if total:
+            self.scrollbar.set(self._first / total, min(1.0, (self._first + visible) / total))
+        else:
+            self.scrollbar.set(0, 1)
+
+
+class SparklineColumn(tk.Canvas):
+    """One canvas beside a Treeview with a sparkline for every visible row.
+
+    ``series(iid)`` returns an object with ``version`` and
+    ``sparkline(width, height)`` (or None). Each row has one pooled line item:
+    its points are only recomputed when the series or the size changed,
+    scrolling and reordering just move it.
+    """
+
+    def __init__(self, master, tree, series, width=120, scrollbar=None, bg="#23272a",
+                 up="#43b581", down="#f04747", **kwargs):
+        super().__init__(master, width=width, bg=bg, highlightthickness=0, **kwargs)
+        self.tree = tree
+        self.series = series
+        self.scrollbar = scrollbar
+        self.up = up
+        self.down = down
+        self._lines = {}  # iid -> [line id, y, version, width, height]
+        self._pending = None
+        tree.configure(yscrollcommand=self._on_yscroll)
+        tree.bind("<Configure>", lambda e: self.schedule(), add="+")
+        self.bind("<Configure>", lambda e: self.schedule())
+
+    def _on_yscroll(self, first, last):
+        if self.scrollbar is not None:
+            self.scrollbar.set(first, last)
+        self.schedule()
+
+    def schedule(self):
+        """Refresh once the event loop is idle (coalesces bursts of changes)."""
+        if self._pending is None:
+            self._pending = self.after_idle(self.refresh)
+
+    def refresh(self):
+        self._pending = None
+        tree = self.tree
+        width = self.winfo_width()
+        children = tree.get_children()
+        start = max(0, int(tree.yview()[0] * len(children)) - 1)
+        seen = set()
+        for iid in children[start:]:
+            box = tree.bbox(iid)
+            if not box:
+                if seen:
+                    break
+                continue
+            seen.add(iid)
+            _, y, _, height = box
+            series = self.series(iid)
+            points = series.sparkline(width, height) if series is not None else None
+            entry = self._lines.get(iid)
+            if not points:
+                if entry is not None:
+                    self.delete(entry[0])
+                    del self._lines[iid]
+                continue
+            if entry is None or entry[2:] != [series.version, width, height]:
+                coords = [value + y if i % 2 else value for i, value in enumerate(points)]
+                color = self.up if points[-1] <= points[1] else self.down
+                if entry is None:
+                    self._lines[iid] = [self.create_line(*coords, fill=color), y, series.version, width, height]
+                else:
+                    self.coords(entry[0], *coords)
+                    self.itemconfigure(entry[0], fill=color)
+                    entry[1:] = [y, series.version, width, height]
+            elif entry[1] != y:
+                self.move(entry[0], 0, y - entry[1])
+                entry[1] = y
+        for iid in [iid for iid in self._lines if iid not in seen]:
+            self.delete(self._lines.pop(iid)[0])
+
+
+class CandleChart(tk.Canvas):
+    """Candlestick chart of ccxt OHLCV candles, redrawn on new data or resize."""
+
+    def __init__(self, master, bg="#23272a", up="#43b581", down="#f04747", axis_width=80, **kwargs):
+        super().__init__(master, bg=bg, highlightthickness=0, **kwargs)
+        self.up = up
+        self.down = down
+        self.axis_width = axis_width
+        self.candles = []
+        self.bind("<Configure>", lambda e: self.redraw())
+
+    def set_candles(self, candles):
+        self.candles = candles
+        self.redraw()
+
+    def redraw(self):
+        self.delete("all")
+        width = self.winfo_width() - self.axis_width
+        height = self.winfo_height()
+        # At least 3 pixels per candle, the newest candles win
+        candles = self.candles[-max(1, width // 3):]
+        if not candles or width < 20 or height < 20:
+            return
+        pad = 10
+        low = min(candle[3] for candle in candles)
+        high = max(candle[2] for candle in candles)
+        span = (high - low) or 1.0
+        scale = (height - 2 * pad) / span
+        slot = width / len(candles)
+        body = max(1.0, slot * 0.6)
+
+        for i in range(5):
+            price = low + span * i / 4
+            y = pad + (high - price) * scale
+            self.create_line(0, y, width, y, fill="#36393f", dash=(2, 4))
+            self.create_text(width + 4, y, text=f"{price:.6g}", anchor="w", fill="white", font=("Arial", 8))
+
+        for i, (_, open_, high_, low_, close, _) in enumerate(candles):
+            x = i * slot + slot / 2
+            color = self.up if close >= open_ else self.down
+            top = pad + (high - max(open_, close)) * scale
+            bottom = max(top + 1, pad + (high - min(open_, close)) * scale)
+            self.create_line(x, pad + (high - high_) * scale, x, pad + (high - low_) * scale, fill=color)
+            self.create_rectangle(x - body / 2, top, x + body / 2, bottom, fill=color, outline=color)
+
+
+class TickerTable(tk.Frame):
+    """Ticker Treeview with its sparkline column, showing the rows of one watchlist.
+
+    ``columns`` are all column ids, ``visible`` the ones shown by default and
+    ``keys`` the matching row keys. ``show(rows)`` draws the rows of
+    ``symbols``; the table only redraws while it is on screen and otherwise
+    just remembers that it has to catch up (``stale``).
+    """
+
+    def __init__(self, master, symbols, columns, visible, keys, series, on_open=None, sparkline_width=120,
+                 bg="#2c2f33", **kwargs):
+        super().__init__(master, bg=bg, **kwargs)
+        self.symbols = symbols
+        self.stale = True  # The rows shown are older than the latest snapshot
+        self.tree = ttk.Treeview(self, columns=columns, displaycolumns=visible, show="headings", height=5)
+        self.sparklines = SparklineColumn(self, self.tree, series, width=sparkline_width)
+        self.sparklines.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        for column in columns:
+            self.tree.column(column, width=150)
+        if on_open is not None:
+            self.tree.bind("<Double-1>", lambda e: self.tree.identify_row(e.y) and on_open(self.tree.identify_row(e.y)))
+        # Rows converted with an outdated (or missing) rate are greyed out
+        self.tree.tag_configure("stale", foreground="gray")
+        self.view = TableView(self.tree, columns, keys, tags=lambda row: ("stale",) if row.get("stale") else ())
+
+    def set_headings(self, columns, texts):
+        for column, text in zip(columns, texts):
+            self.tree.heading(column, text=text)
+
+    def show(self, rows):
+        """Draw the rows of this watchlist out of ``rows`` (in display order)."""
+        symbols = set(self.symbols)
+        self.view.apply([row for row in rows if row["symbol"] in symbols])
+        self.sparklines.schedule()
+        self.stale = False
@@ -6,6 +6,7 @@ from tkinter import messagebox
 import threading
 import time
 import sys
+from crypticker.pipeline import UiPump
 
 def get_exchange():
     """Initialisiere die Binance-Börse mit ccxt."""
@@ -40,15 +41,10 @@ def calculate_volatility(high, low):
         return (high - low) / low * 100
     return None
 
-def update_table(exchange, selected_symbols, table_frame, frequency_var, is_running):
-    """Aktualisiere die Tabelle mit Kryptowährungsdaten und sortiere nach Volatilität."""
+def update_table(exchange, selected_symbols, frequency, is_running, pump):
+    """Hole die Kryptowährungsdaten im Hintergrund und übergebe sie sortiert an den GUI-Thread."""
     try:
-        frequency = int(frequency_var.get())
         while is_running[0]:  # Solange is_running True ist, weiter aktualisieren
-            for widget in table_frame.winfo_children():
-                if widget.grid_info()["row"] > 0:  # Behalte die Header in Zeile 0
-                    widget.destroy()
-
             # Liste für die sortierten Daten
             data_list = []
 
@@ -69,32 +65,43 @@ def update_table(exchange, selected_symbols, table_frame, frequency_var, is_runn
 
             # Daten nach Volatilität sortieren (höchste zuerst)
             sorted_data = sorted(data_list, key=lambda x: x["volatility"] or 0, reverse=True)
+            if is_running[0]:
+                pump.submit(sorted_data)
 
-            # Sortierte Daten in die Tabelle schreiben
-            for row, data in enumerate(sorted_data, start=1):
-                table_data = [
-                    data["symbol"],
-                    f"{data['price_usd']:.6f} USD" if data["price_usd"] else "N/A",
-                    f"{data['volatility']:.6f} %" if data["volatility"] else "N/A",
-                    f"{data['high']:.6f} USD" if data["high"] else "N/A",
-                    f"{data['low']:.6f} USD" if data["low"] else "N/A",
-                ]
-
-                for col, value in enumerate(table_data):
-                    tk.Label(
-                        table_frame, text=value, bg="#23272a", fg="white", font=("Arial", 12)
-                    ).grid(row=row, column=col, padx=5, pady=5, sticky="nsew")
-            
             time.sleep(frequency)
-    except ValueError:
-        messagebox.showerror("Fehler", "Bitte geben Sie eine gültige Zahl für die Wiederholungsfrequenz ein.")
     except Exception as e:
-        messagebox.showerror("Fehler", f"Fehler beim Abrufen der Daten: {e}")
-
-def start_ticker(exchange, selected_symbols, table_frame, frequency_var, is_running):
+        pump.post(lambda e=e: messagebox.showerror("Fehler", f"Fehler beim Abrufen der Daten: {e}"))
+
+def render_table(table_frame, snapshot):
+    """Schreibe die sortierten Daten in die Tabelle (nur im GUI-Thread aufrufen)."""
+    for widget in table_frame.winfo_children():
+        if widget.grid_info()["row"] > 0:  # Behalte die Header in Zeile 0
+            widget.destroy()
+
+    for row, data in enumerate(snapshot.rows, start=1):
+        table_data = [
+            data["symbol"],
+            f"{data['price_usd']:.6f} USD" if data["price_usd"] else "N/A",
+            f"{data['volatility']:.6f} %" if data["volatility"] else "N/A",
+            f"{data['high']:.6f} USD" if data["high"] else "N/A",
+            f"{data['low']:.6f} USD" if data["low"] else "N/A",
+        ]
+
+        for col, value in enumerate(table_data):
+            tk.Label(
+                table_frame, text=value, bg="#23272a", fg="white", font=("Arial", 12)
+            ).grid(row=row, column=col, padx=5, pady=5, sticky="nsew")
+
+def start_ticker(exchange, selected_symbols, frequency_var, is_running, pump):
     """Starte den Ticker in einem separaten Thread."""
+    try:
+        frequency = int(frequency_var.get())  # Tk-Variablen nur im GUI-Thread lesen
+    except ValueError:
+        messagebox.showerror("Fehler", "Bitte geben Sie eine gültige Zahl für die Wiederholungsfrequenz ein.")
+        return False
     is_running[0] = True
-    threading.Thread(target=update_table, args=(exchange, selected_symbols, table_frame, frequency_var, is_running), daemon=True).start()
+    threading.Thread(target=update_table, args=(exchange, selected_symbols, frequency, is_running, pump), daemon=True).start()
+    return True
 
 def stop_ticker(is_running, submit_button, stop_button):
     """Stoppe den Ticker-Update-Prozess und reaktiviere den Absenden-Button."""
@@ -102,14 +109,15 @@ def stop_ticker(is_running, submit_button, stop_button):
     submit_button.config(state=tk.NORMAL)  # Absenden-Button wieder aktivieren
     stop_button.config(state=tk.DISABLED)  # Stop-Button deaktivieren
 
-def on_submit(exchange, all_symbols, checkboxes, table_frame, frequency_var, is_running, submit_button, stop_button):
+def on_submit(exchange, all_symbols, checkboxes, pump, frequency_var, is_running, submit_button, stop_button):
     """Verarbeite die Benutzereingabe und starte den Ticker."""
     stop_ticker(is_running, submit_button, stop_button)  # Stoppe den aktuellen Ticker-Prozess
     
     selected_symbols = [symbol for symbol, var in checkboxes.items() if var.get()]
     
     if selected_symbols:
-        start_ticker(exchange, selected_symbols, table_frame, frequency_var, is_running)
+        if not start_ticker(exchange, selected_symbols, frequency_var, is_running, pump):
+            return
         submit_button.config(state=tk.DISABLED)  # Absenden-Button deaktivieren
         stop_button.config(state=tk.NORMAL)     # Stop-Button aktivieren
     else:
@@ -153,7 +161,7 @@ def create_gui():
     canvas.bind_all("<MouseWheel>", on_mouse_wheel)
 
     checkboxes = {}  # Zustandsbehaftete Speicherung der Checkboxen
-    default_selected = ['BTC/USDT', 'LTC/USDT', 'TRUMP/USDT', 'SOL/USDT', 'ETH/USDT','PEPE/USTD','MEME/USTD']  # Standard-Auswahl
+    default_selected = ['BTC/USDT', 'LTC/USDT', 'TRUMP/USDT', 'SOL/USDT', 'ETH/USDT','PEPE/USDT','MEME/USDT']  # Standard-Auswahl
     for symbol in all_symbols:
         var = tk.BooleanVar(value=(symbol in default_selected))  # Standardmäßig auswählen, falls im default_selected
         checkboxes[symbol] = var
@@ -186,7 +194,7 @@ def create_gui():
     tk.Entry(control_frame, textvariable=frequency_var, width=5, font=("Arial", 12)).pack(side=tk.LEFT, padx=5)
 
     submit_button = tk.Button(
-        control_frame, text="Absenden", command=lambda: on_submit(exchange, all_symbols, checkboxes, table_frame, frequency_var, is_running, submit_button, stop_button), **button_style
+        control_frame, text="Absenden", command=lambda: on_submit(exchange, all_symbols, checkboxes, pump, frequency_var, is_running, submit_button, stop_button), **button_style
     )
     submit_button.pack(side=tk.LEFT, padx=5)
 
@@ -206,6 +214,10 @@ def create_gui():
             table_frame, text=header, **header_style
         ).grid(row=0, column=col, padx=5, pady=5, sticky="nsew")
 
+    # Der Worker-Thread liefert nur Daten, gezeichnet wird im GUI-Thread
+    pump = UiPump(root, lambda snapshot: render_table(table_frame, snapshot))
+    pump.start()
+
     # Globaler Ticker-Status
     is_running = [False]  # Liste, um den Wert zu ändern
 
@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+from crypticker.aggregate import Aggregator, combine, normalize_symbol
+from crypticker.stub import StubExchange
+
+
+@pytest.fixture
+def make_aggregator():
+    aggregators = []
+
+    def make(exchanges, timeout=1.0):
+        aggregator = Aggregator(exchanges, timeout=timeout)
+        aggregators.append(aggregator)
+        return aggregator
+
+    yield make
+    for aggregator in aggregators:
+        aggregator.close()
+
+
+def test_normalize_symbol():
+    assert normalize_symbol("xbt/usdt:USDT") == "BTC/USDT"
+    assert normalize_symbol("XDG/USDT") == "DOGE/USDT"
+    assert normalize_symbol("ETH/USDT") == "ETH/USDT"
+
+
+def test_venue_symbols_are_normalized_and_prefer_spot(make_aggregator):
+    kraken = StubExchange("kraken", symbols=("XBT/USDT", "ETH/USDT:USDT", "ETH/USDT"), seed=1)
+    aggregator = make_aggregator({"kraken": kraken})
+    tickers = aggregator.fetch(["btc/usdt", "ETH/USDT", "SOL/USDT"])["kraken"]
+    assert set(tickers) == {"BTC/USDT", "ETH/USDT"}
+    assert tickers["BTC/USDT"]["symbol"] == "XBT/USDT"
+    assert tickers["ETH/USDT"]["symbol"] == "ETH/USDT"
+
+
+def test_failing_venue_does_not_block_the_others(make_aggregator):
+    aggregator = make_aggregator({
+        "good": StubExchange("good", seed=1),
+        "bad": StubExchange("bad", error=RuntimeError("down"), seed=2),
+    })
+    results = aggregator.fetch(["BTC/USDT"])
+    assert list(results) == ["good"]
+    assert aggregator.status["good"].ok
+    assert aggregator.status["bad"] == (False, None, "down")
+    rows = aggregator.fetch_rows(["BTC/USDT"])
+    assert rows[0]["last:bad"] is None and rows[0]["last:good"] is not None
+
+
+def test_slow_venue_contributes_its_late_result(make_aggregator):
+    slow = StubExchange("slow", delay=0.3, seed=1)
+    aggregator = make_aggregator({"fast": StubExchange("fast", seed=2), "slow": slow}, timeout=0.05)
+
+    assert list(aggregator.fetch(["BTC/USDT"])) == ["fast"]
+    assert aggregator.status["slow"].error == "timeout"
+    assert list(aggregator.fetch(["BTC/USDT"])) == ["fast"]
+    assert aggregator.status["slow"].error == "busy"
+    assert slow.requests == 1
+
+    time.sleep(0.4)
+    results = aggregator.fetch(["BTC/USDT"])
+    assert set(results) == {"fast", "slow"}
+    assert aggregator.status["slow"].ok and aggregator.status["slow"].latency >= 0.3
+    assert slow.requests == 2  # Asked again, the late answer was used meanwhile
+
+
+def test_combine_picks_best_bid_and_ask():
+    tickers = {
+        "a": {"BTC/USDT": {"last": 100, "bid": 99, "ask": 101}},
+        "b": {"BTC/USDT": {"last": 100, "bid": 100, "ask": 102}},
+    }
+    row = combine(["BTC/USDT"], tickers)[0]
+    assert (row["best_bid"], row["bid_venue"], row["best_ask"], row["ask_venue"]) == (100, "b", 101, "a")
+    assert row["spread"] == pytest.approx(1.0)
@@ -0,0 +1,75 @@
+import json
+
+from crypticker.alerts import AlertEngine
+from crypticker.core import TickerCore
+from crypticker.fx import FxService
+
+
+def tickers(last, eur=None):
+    batch = {"BTC/USDT": {"symbol": "BTC/USDT", "timestamp": 1, "last": last, "open": last, "high": last, "low": last}}
+    if eur is not None:
+        batch["EUR/USDT"] = {"symbol": "EUR/USDT", "timestamp": 1, "last": eur}
+    return batch
+
+
+def test_price_rule_waits_for_an_fx_rate():
+    core = TickerCore(None, fx=FxService("EUR"))
+    engine = AlertEngine()
+    engine.add("BTC/USDT", "price", "below", 50000, currency="EUR")
+
+    rows = core.rows_from_tickers(tickers(60000.0), ["BTC/USDT"])
+    assert rows[0]["price"] == 0 and rows[0]["stale"]
+    assert engine.evaluate(rows, "EUR") == []
+
+    rows = core.rows_from_tickers(tickers(52000.0, eur=1.2), ["BTC/USDT"])
+    alerts = engine.evaluate(rows, "EUR")
+    assert [round(alert.value) for alert in alerts] == [43333]
+
+
+def test_quote_currency_rule_uses_the_raw_price():
+    core = TickerCore(None, fx=FxService("EUR"))
+    engine = AlertEngine()
+    engine.add("BTC/USDT", "price", "above", 55000, currency="USDT")
+    rows = core.rows_from_tickers(tickers(60000.0), ["BTC/USDT"])
+    assert [alert.value for alert in engine.evaluate(rows, "EUR")] == [60000.0]
+
+
+def test_rules_keep_their_currency_when_the_display_changes():
+    engine = AlertEngine()
+    engine.add("BTC/USDT", "price", "above", 55000, currency="EUR")
+    row = {"symbol": "BTC/USDT", "price": 60000.0, "last": 50000.0}
+    assert engine.evaluate([row], "CHF") == []
+    assert len(engine.evaluate([row], "EUR")) == 1
+
+
+def test_percentage_rules_ignore_the_currency():
+    engine = AlertEngine()
+    rule = engine.add("BTC/USDT", "percent_change", "above", 5, currency="EUR")
+    assert rule.currency is None
+    row = {"symbol": "BTC/USDT", "price": 0, "last": 1.0, "percent_change": 6.0, "stale": True}
+    assert len(engine.evaluate([row], "EUR")) == 1
+
+
+def test_hysteresis_rearms_the_rule():
+    engine = AlertEngine()
+    engine.add("BTC/USDT", "price", "above", 100, hysteresis=5, currency="USDT")
+    values = [101, 102, 96, 101, 94, 101]
+    fired = [bool(engine.evaluate([{"symbol": "BTC/USDT", "last": v}])) for v in values]
+    assert fired == [True, False, False, False, False, True]
+
+
+def test_round_trip_and_version_1_migration(tmp_path):
+    path = tmp_path / "alerts.json"
+    engine = AlertEngine(str(path))
+    engine.add("BTC/USDT", "price", "above", 1, currency="CHF")
+    engine.add("BTC/USDT", "volatility", "below", 2)
+    engine.save()
+    loaded = AlertEngine(str(path))
+    assert loaded.load("EUR")
+    assert sorted((r.field, r.currency) for r in loaded.rules.values()) == [("price", "CHF"), ("volatility", None)]
+
+    path.write_text(json.dumps({"version": 1, "rules": [
+        {"symbol": "BTC/USDT", "field": "price", "op": "above", "threshold": 1, "hysteresis": 0.01}]}))
+    old = AlertEngine(str(path))
+    assert old.load("EUR")
+    assert [r.currency for r in old.rules.values()] == ["EUR"]
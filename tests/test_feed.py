@@ -0,0 +1,48 @@
+from crypticker.feed import FakeFeed
+
+
+def ticker(last):
+    return {"last": last}
+
+
+def test_publish_only_merges_subscribed_symbols():
+    feed = FakeFeed()
+    feed.subscribe(["BTC/USDT", "ETH/USDT"])
+    feed.push({"BTC/USDT": ticker(1), "XRP/USDT": ticker(2)})
+    feed.push({"ETH/USDT": ticker(3), "BTC/USDT": ticker(4)})
+    assert feed.snapshot() == {"BTC/USDT": ticker(4), "ETH/USDT": ticker(3)}
+    assert feed.updated.is_set()
+
+
+def test_resubscribe_drops_unsubscribed_state():
+    feed = FakeFeed()
+    feed.subscribe(["BTC/USDT", "ETH/USDT"])
+    feed.push({"BTC/USDT": ticker(1), "ETH/USDT": ticker(2)})
+    feed.subscribe(["ETH/USDT", "SOL/USDT"])
+    assert feed.snapshot() == {"ETH/USDT": ticker(2)}
+    assert feed.subscriptions == [frozenset({"BTC/USDT", "ETH/USDT"}), frozenset({"ETH/USDT", "SOL/USDT"})]
+
+
+def test_unchanged_subscription_does_not_resubscribe():
+    feed = FakeFeed()
+    feed.subscribe(["BTC/USDT"])
+    feed.subscribe(["BTC/USDT"])
+    assert len(feed.subscriptions) == 1
+
+
+def test_listeners_get_only_the_changed_subscribed_tickers():
+    feed = FakeFeed()
+    feed.subscribe(["BTC/USDT"])
+    seen = []
+    feed.add_listener(seen.append)
+    feed.push({"BTC/USDT": ticker(1), "ETH/USDT": ticker(2)})
+    feed.push({"ETH/USDT": ticker(3)})
+    assert seen == [{"BTC/USDT": ticker(1)}]
+
+
+def test_replays_recorded_batches():
+    feed = FakeFeed([{"BTC/USDT": ticker(1)}, {"BTC/USDT": ticker(2)}])
+    feed.subscribe(["BTC/USDT"])
+    feed.start()
+    feed._thread.join(2)
+    assert feed.snapshot() == {"BTC/USDT": ticker(2)}
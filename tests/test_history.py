@@ -0,0 +1,25 @@
+import threading
+
+from crypticker.history import HistoryStore
+
+
+def test_concurrent_flushes_keep_the_columns_aligned(tmp_path):
+    history = HistoryStore(str(tmp_path), flush_interval=0.0)
+    start = 1700000000.0
+
+    def produce(offset):
+        for i in range(500):
+            timestamp = start + offset + i * 2
+            history.append("BTC/USDT", timestamp, timestamp)
+
+    threads = [threading.Thread(target=produce, args=(offset,)) for offset in (0, 1)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    history.close()
+
+    day = history.load_day("BTC/USDT", "2023-11-14")
+    assert len(day) == 1000
+    assert day.columns["last"].tolist() == day.columns["timestamp"].tolist()
+    day.close()
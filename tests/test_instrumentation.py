@@ -0,0 +1,18 @@
+from crypticker.instrumentation import is_rate_limit
+
+
+class RateLimitExceeded(Exception):
+    """Named like the ccxt error class."""
+
+
+class HttpError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+def test_rate_limits_are_told_by_error_class_and_status_only():
+    assert is_rate_limit(RateLimitExceeded("slow down"))
+    assert is_rate_limit(HttpError(429))
+    assert not is_rate_limit(HttpError(500))
+    assert not is_rate_limit(ValueError("binance does not have market symbol 1429/USDT"))
@@ -0,0 +1,54 @@
+import pytest
+
+from crypticker.core import TickerCore
+from crypticker.metrics import MetricsEngine
+
+
+def tickers(price, timestamp):
+    return {"BTC/USDT": {"last": price, "timestamp": timestamp, "open": 100.0, "high": 110.0, "low": 90.0}}
+
+
+def test_rolling_metrics_over_the_window():
+    engine = MetricsEngine(window=3)
+    for timestamp, price in enumerate([100.0, 110.0, 99.0, 101.0], 1):
+        row = engine.update(tickers(price, timestamp), ["BTC/USDT"])[0]
+    assert row["price"] == 101.0
+    assert row["percent_change"] == pytest.approx(1.0)
+    assert row["volatility"] == pytest.approx(20 / 90 * 100)
+    assert row["realized_vol"] is not None
+
+
+def test_same_timestamp_is_not_a_new_tick():
+    engine = MetricsEngine(window=3)
+    engine.update(tickers(100.0, 1), ["BTC/USDT"])
+    row = engine.update(tickers(100.0, 1), ["BTC/USDT"])[0]
+    assert row["realized_vol"] is None
+
+
+def test_symbol_leaving_the_selection_starts_afresh():
+    core = TickerCore(None, metrics=MetricsEngine(window=3))
+    core.select(["BTC/USDT", "ETH/USDT"])
+    for timestamp, price in enumerate([100.0, 120.0], 1):
+        core.metrics.update(tickers(price, timestamp), ["BTC/USDT"])
+    core.select(["ETH/USDT"])
+    core.select(["BTC/USDT", "ETH/USDT"])
+    # Same tick as before it left: must not divide by an empty window
+    row = core.metrics.update(tickers(120.0, 2), ["BTC/USDT"])[0]
+    assert row["realized_vol"] is None and row["ema"] == 120.0
+
+
+def test_base_columns_skip_the_rolling_state():
+    engine = MetricsEngine(window=3, rolling=False)
+    row = engine.update(tickers(101.0, 1), ["BTC/USDT"], rate=2.0)[0]
+    assert row["price"] == 202.0 and row["percent_change"] == pytest.approx(1.0)
+    assert "zscore" not in row and not engine._state
+
+
+def test_rolling_switched_back_on_starts_afresh():
+    engine = MetricsEngine(window=3)
+    engine.update(tickers(100.0, 1), ["BTC/USDT"])
+    engine.set_rolling(False)
+    engine.update(tickers(150.0, 2), ["BTC/USDT"])
+    engine.set_rolling(True)
+    row = engine.update(tickers(120.0, 3), ["BTC/USDT"])[0]
+    assert row["realized_vol"] is None and row["ema"] == 120.0
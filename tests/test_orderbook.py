@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from crypticker.core import TickerCore
+from crypticker.fx import FxService
+from crypticker.orderbook import BookManager, OrderBook, OutOfSync, ReplayDiffFeed
+from crypticker.replay import ReplayExchange, write_capture
+
+
+def snapshot(update_id):
+    return {"nonce": update_id, "bids": [[99.0, 1.0], [98.0, 2.0]], "asks": [[101.0, 1.0], [102.0, 3.0]]}
+
+
+def test_diffs_continue_the_snapshot_and_gaps_raise():
+    book = OrderBook("BTC/USDT")
+    book.apply_snapshot(snapshot(10))
+    assert not book.apply_diff({"U": 5, "u": 9, "b": [], "a": []})
+    assert book.apply_diff({"U": 9, "u": 12, "b": [[99.0, 0.0], [99.5, 4.0]], "a": []})
+    assert list(book.bids.prices) == [98.0, 99.5]
+    with pytest.raises(OutOfSync):
+        book.apply_diff({"U": 14, "u": 15, "b": [], "a": []})
+
+
+def test_gap_resyncs_from_a_fresh_snapshot():
+    snapshots = iter([snapshot(10), snapshot(20)])
+    manager = BookManager(lambda symbol, limit: next(snapshots))
+    manager.watch(["BTC/USDT"])
+    assert not manager.on_diff("BTC/USDT", {"U": 11, "u": 11, "b": [], "a": []})
+    manager.sync_pending()
+    assert manager.on_diff("BTC/USDT", {"U": 12, "u": 12, "b": [], "a": []})
+    assert not manager.on_diff("BTC/USDT", {"U": 21, "u": 21, "b": [], "a": [[101.0, 0.0]]})
+    manager.sync_pending()
+    assert manager.resyncs == 1
+    assert manager.books["BTC/USDT"].update_id == 21
+    assert list(manager.books["BTC/USDT"].asks.prices) == [102.0]
+
+
+def test_depth_stream_messages_fill_the_depth_columns_without_polling():
+    from crypticker.feed import BinanceDepthFeed
+
+    manager = BookManager(lambda symbol, limit: snapshot(1), streamed=True)
+    manager.watch(["BTC/USDT"])
+    feed = BinanceDepthFeed(manager)
+    streams = feed.streams(["BTC/USDT"])
+    assert streams == {"btcusdt@depth@100ms": "BTC/USDT"}
+    message = {"stream": "btcusdt@depth@100ms", "data": {"U": 2, "u": 2, "b": [["99.5", "2.0"]], "a": []}}
+    assert not feed.on_message(streams, json.dumps(message))
+    manager.sync_pending()
+    assert feed.on_message(streams, json.dumps({"stream": "ethusdt@depth@100ms", "data": {}}))
+
+    core = TickerCore(None, fx=FxService("USDT"), books=manager)
+    tickers = {"BTC/USDT": {"symbol": "BTC/USDT", "timestamp": 1, "last": 100.0}}
+    row = core.rows_from_tickers(tickers, ["BTC/USDT"])[0]
+    assert row["mid"] == pytest.approx(100.25) and row["spread"] == pytest.approx(1.5 / 100.25 * 100)
+    assert row["depth_bid_1"] == pytest.approx(99.5 * 2.0)  # 99.0 is outside the 1 % band
+
+
+def test_polling_leaves_streamed_books_alone():
+    from crypticker.stub import StubExchange
+
+    exchange = StubExchange(seed=1)
+    manager = BookManager(exchange.fetch_order_book, streamed=True)
+    core = TickerCore(exchange, fx=FxService("USDT"), books=manager)
+    core.fetch_rows(["BTC/USDT"])
+    assert exchange.requests == 1
+    assert not core.instruments.errors
+
+
+def test_replayed_capture_resyncs_after_a_dropped_diff(tmp_path):
+    bids = {float(price): 1.0 for price in range(90, 100)}
+    asks = {float(price): 1.0 for price in range(101, 111)}
+    diffs, snapshots = [], []
+    for update_id in range(1, 11):
+        diff = {"U": update_id, "u": update_id, "b": [[99.0 - update_id % 5, float(update_id)]],
+                "a": [[101.0 + update_id % 5, 0.0 if update_id % 3 else 2.0]]}
+        for price, size in diff["b"]:
+            bids[price] = size
+        for price, size in diff["a"]:
+            if size:
+                asks[price] = size
+            else:
+                asks.pop(price, None)
+        if update_id != 6:
+            diffs.append((update_id / 1000, "depth_diff", ["BTC/USDT"], diff))
+        if update_id in (2, 8):
+            snapshots.append((0.0, "fetch_order_book", ["BTC/USDT"], {
+                "nonce": update_id, "bids": [[p, q] for p, q in bids.items()], "asks": [[p, q] for p, q in asks.items()],
+            }))
+    capture = str(tmp_path / "depth.jsonl.gz")
+    write_capture(capture, snapshots + diffs)
+
+    manager = BookManager(ReplayExchange(capture, speed=0).fetch_order_book)
+    manager.watch(["BTC/USDT"])
+    ReplayDiffFeed(capture, manager, speed=0).run()
+
+    book = manager.books["BTC/USDT"]
+    assert manager.resyncs == 1
+    assert book.update_id == 10
+    assert list(book.bids.prices) == sorted(bids) and list(book.bids.sizes) == [bids[p] for p in sorted(bids)]
+    assert list(book.asks.prices) == sorted(asks)
@@ -0,0 +1,39 @@
+import pytest
+
+from crypticker.portfolio import Portfolio, parse_number
+
+
+def test_parse_number():
+    assert parse_number("1,234.5") == 1234.5
+    assert parse_number("1234,5") == 1234.5
+    assert parse_number("0.5BTC") == 0.5
+
+
+def test_import_books_trades_with_average_cost(tmp_path):
+    path = tmp_path / "trades.csv"
+    path.write_text("Pair,Side,Price,Executed,Fee\n"
+                    "BTCUSDT,BUY,100,2,1\n"
+                    "BTCUSDT,BUY,200,2,1\n"
+                    "BTCUSDT,SELL,300,1,0\n")
+    portfolio = Portfolio()
+    assert portfolio.import_trades(str(path)) == 3
+    position = portfolio.positions["BTC/USDT"]
+    assert position.quantity == 3
+    assert position.cost == pytest.approx(451.5)
+    assert position.realized == pytest.approx(149.5)
+    portfolio.update([{"symbol": "BTC/USDT", "last": 200.0}])
+    assert portfolio.pnl == pytest.approx(600 - 451.5)
+
+
+def test_bad_line_leaves_the_positions_untouched(tmp_path):
+    path = tmp_path / "trades.csv"
+    path.write_text("symbol,side,price,quantity\n"
+                    "ETH/USDT,buy,10,1\n"
+                    "ETH/USDT,buy,abc,1\n")
+    portfolio = Portfolio()
+    portfolio.set_position("BTC/USDT", 1, 100)
+    generation = portfolio.generation
+    with pytest.raises(ValueError, match="Zeile 3"):
+        portfolio.import_trades(str(path))
+    assert list(portfolio.positions) == ["BTC/USDT"]
+    assert portfolio.generation == generation
@@ -0,0 +1,21 @@
+from crypticker.core import TickerCore
+from crypticker.fx import FxService
+from crypticker.ratelimit import RateLimiter
+from crypticker.replay import RecordingExchange, ReplayExchange
+from crypticker.stub import StubExchange
+
+
+def test_replay_serves_the_batched_ticks_of_a_recording_whole(tmp_path):
+    symbols = [f"C{i:02d}/USDT" for i in range(30)]
+    capture = str(tmp_path / "capture.jsonl.gz")
+    stub = StubExchange("binance", symbols=symbols, seed=1)
+    recorder = RecordingExchange(stub, capture)
+    core = TickerCore(recorder, fx=FxService("USDT"), limiter=RateLimiter("binance"))
+    for _ in range(3):
+        assert len(core.fetch_rows(symbols)) == 30
+    recorder.close()
+    assert stub.requests == 6  # Two batches of at most 20 symbols per tick
+    assert core.instruments.counters["requests.fetch_tickers"] == 6
+
+    replay = TickerCore(ReplayExchange(capture, speed=0), fx=FxService("USDT"))
+    assert [len(replay.fetch_rows(symbols)) for _ in range(3)] == [30, 30, 30]
@@ -0,0 +1,46 @@
+from crypticker.share import SnapshotClient, SnapshotServer
+
+
+def rows(*symbols, price=1.0):
+    return [{"symbol": symbol, "price": price} for symbol in symbols]
+
+
+def test_client_rebuilds_the_rows_from_deltas():
+    server = SnapshotServer(port=0)
+    client = SnapshotClient("http://unused", lambda rows: None)
+    server.publish(rows("A", "B"), "EUR", 0.9)
+    assert client.apply(server.message()) == rows("A", "B")
+    server.publish(rows("B", price=2.0) + rows("C"))
+    message = server.message(client.seq)
+    assert message["base"] == 1 and message["removed"] == ["A"]
+    assert client.apply(message) == rows("B", price=2.0) + rows("C")
+
+
+def test_restarted_server_sends_a_full_snapshot():
+    first = SnapshotServer(port=0)
+    first.start()
+    client = SnapshotClient(first.url, lambda rows: None, wait=0)
+    try:
+        for _ in range(3):
+            first.publish(rows("A", "B"))
+        assert client.poll() == rows("A", "B")
+    finally:
+        first.stop()
+
+    second = SnapshotServer(port=first.port)
+    second.start()
+    try:
+        for price in range(5):
+            second.publish(rows("X", price=float(price)))
+        assert client.poll() == rows("X", price=4.0)
+        assert client.epoch == second.epoch
+    finally:
+        second.stop()
+
+
+def test_delta_of_another_run_is_dropped():
+    client = SnapshotClient("http://unused", lambda rows: None)
+    client.apply({"epoch": "a", "seq": 3, "keys": ["symbol", "price"], "rows": [["A", 1.0]]})
+    delta = {"epoch": "b", "seq": 4, "base": 3, "keys": ["symbol", "price"], "changed": [], "removed": []}
+    assert client.apply(delta) is None
+    assert client.seq == 0 and client.epoch is None
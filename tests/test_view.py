@@ -0,0 +1,75 @@
+import random
+
+from crypticker.view import TableView
+
+
+class MemoryTree:
+    """ttk.Treeview stand-in: ``move`` of a detached item reattaches it at ``index``."""
+
+    def __init__(self):
+        self.items = []
+        self.values = {}
+        self.calls = 0
+
+    def insert(self, parent, index, iid, values, tags=()):
+        self.items.append(iid)
+        self.values[iid] = list(values)
+
+    def delete(self, iid):
+        self.items.remove(iid)
+        del self.values[iid]
+
+    def set(self, iid, column, value):
+        self.values[iid][COLUMNS.index(column)] = value
+
+    def detach(self, *iids):
+        self.calls += 1
+        self.items = [iid for iid in self.items if iid not in iids]
+
+    def move(self, iid, parent, index):
+        assert iid not in self.items, "attached items are only moved after a detach"
+        self.calls += 1
+        self.items.insert(index, iid)
+
+    def item(self, iid, **kwargs):
+        pass
+
+
+COLUMNS = ["Symbol", "Preis"]
+
+
+def rows(symbols):
+    return [{"symbol": symbol, "price": float(i + 1)} for i, symbol in enumerate(symbols)]
+
+
+def make_view():
+    tree = MemoryTree()
+    return tree, TableView(tree, COLUMNS, ["symbol", "price"])
+
+
+def test_falling_row_is_moved_once():
+    tree, view = make_view()
+    symbols = [f"C{i:04d}" for i in range(1000)]
+    view.apply(rows(symbols))
+    symbols.append(symbols.pop(0))
+    view.apply(rows(symbols))
+    assert tree.items == symbols
+    assert view.moves == 1
+
+
+def test_random_reorders_with_inserts_and_deletes():
+    rng = random.Random(7)
+    tree, view = make_view()
+    pool = [f"C{i:03d}" for i in range(200)]
+    for _ in range(50):
+        symbols = rng.sample(pool, rng.randint(0, 120))
+        view.apply(rows(symbols))
+        assert tree.items == symbols
+        assert [tree.values[s][0] for s in symbols] == symbols
+
+
+def test_unchanged_order_does_not_touch_the_tree():
+    tree, view = make_view()
+    view.apply(rows(["A", "B", "C"]))
+    view.apply(rows(["A", "B", "C"]))
+    assert tree.calls == 0 and view.moves == 0